@@ -1,5 +1,10 @@
+import mmap
+import os
 import re
 
+from diagnosticos import Diagnostico, renderizar
+from simbolos import Lexemas
+
 TOKEN_SPEC = [
     ('INICIO_PROGRAMA', r'\bBORA\b'),
     ('FIM_PROGRAMA', r'BIRL!'),
@@ -54,215 +59,419 @@ TOKEN_SPEC = [
 
 token_regex = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPEC))
 
+# Tipos que o analisador atribui a tokens com erro, além dos nomes de TOKEN_SPEC
+TIPOS_ERRO = (
+    'NUM_EXCESSIVO_ERRO', 'STRING_MUITO_LONGA_ERRO', 'ERRO LÉXICO',
+    'ERRO LÉXICO - ASPAS NÃO FECHADAS', 'ERRO LÉXICO - CARACTERE INVÁLIDO',
+)
+
+# Código inteiro (cabe em um byte) de cada tipo de token, usado pelo TokenStream e pelo Parser
+TIPOS_TOKEN = tuple(name for name, _ in TOKEN_SPEC) + TIPOS_ERRO
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+# Tipos cujos lexemas o léxico interna (veja simbolos.Lexemas): identificadores e palavras-chave,
+# que se repetem muito; números, strings e comentários raramente se repetem
+TIPOS_INTERNADOS = frozenset((
+    'INICIO_PROGRAMA', 'FIM_PROGRAMA', 'VARIAVEL', 'ATRIBUICAO', 'PRINT', 'IF', 'ELIF', 'ELSE', 'WHILE',
+    'FUNC', 'CALL', 'BOOLEAN_VERDADEIRO', 'BOOLEAN_FALSO', 'OP_LOGICO', 'PARENTESES_ABRE', 'PARENTESES_FECHA', 'ID',
+))
+
 POTENTIAL_KEYWORD_MISUSE = {
     'If', 'Else', 'While', 'For', 'Def', 'Call' 
 }
 
 
-def analisar_codigo(codigo: str) -> dict:
+# Caracteres tratados como quebra de linha por str.splitlines().
+_CLASSE_QUEBRA = r'\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+# Quebras de linha reconhecidas por str.splitlines(), usadas para dividir a
+# entrada sob demanda sem materializar a lista de linhas.
+_QUEBRA_LINHA = re.compile(rf'\r\n|[{_CLASSE_QUEBRA}]')
+
+
+def _padrao_buffer(nome, padrao, classe_quebra=_CLASSE_QUEBRA):
     """
-    Realiza a análise léxica de um código-fonte BIRL e verifica a estrutura básica,
-    balanceamento de delimitadores, obrigatoriedade de 'MONSTRO' para variáveis,
-    e limites de tamanho para números e strings.
+    Adapta um padrão de TOKEN_SPEC para rodar sobre o código inteiro em vez de uma linha só:
+    '\n' passa a significar qualquer quebra de str.splitlines() (ou as de 'classe_quebra') e
+    '$' passa a ser "fim da linha".
+    """
+    if nome == 'NEWLINE':
+        return rf'\r\n|[{classe_quebra}]'
+    padrao = padrao.replace(r'\n]', classe_quebra + ']')
+    if padrao.endswith('$'):
+        padrao = padrao[:-1] + rf'(?=[{classe_quebra}]|\Z)'
+    return padrao
+
+
+# Versão de token_regex para a varredura do código inteiro em uma única passada.
+# Nenhum padrão além de SKIP e NEWLINE pode começar em espaço, tab ou quebra de linha, então:
+#   - os espaços antes de cada token são absorvidos por um prefixo '[ \t]*' (SKIP só casa
+#     sozinho quando sobram espaços no fim do texto), o que corta pela metade o número de matches;
+#   - NEWLINE pode ir para o início da alternância sem mudar qual padrão vence.
+# O lexema e a coluna vêm do grupo nomeado (match.group(tipo) / match.start(tipo)).
+def _fonte_regex_buffer(classe_quebra=_CLASSE_QUEBRA):
+    return '[ \t]*(?:' + '|'.join(
+        f'(?P<{name}>{_padrao_buffer(name, pattern, classe_quebra)})'
+        for name, pattern in sorted(TOKEN_SPEC, key=lambda spec: spec[0] != 'NEWLINE')
+    ) + ')'
+
+
+token_regex_buffer = re.compile(_fonte_regex_buffer())
+
+
+class _FimDeLinha:
+    """Marcador que a varredura por linhas intercala entre as linhas, imitando um match de NEWLINE."""
+    lastgroup = 'NEWLINE'
+
+    def end(self):
+        return 0
+
+
+_FIM_DE_LINHA = _FimDeLinha()
+
+# Tipos que não contam para a verificação de BORA/BIRL! (mantidos como no pós-processamento original)
+_TIPOS_FORA_DA_SEQUENCIA = frozenset([
+    'SKIP', 'NEWLINE', 'COMENTARIO', 'ERRO LÉXICO',
+    'ERRO LÉXICO - ASPAS NÃO_FECHADAS', 'ERRO LÉXICO - CARACTERE_INVÁLIDO', # Nomes como estavam no pós-processamento original
+    'NUM_EXCESSIVO_ERRO', 'STRING_MUITO_LONGA_ERRO'
+])
+
+# Definir limite de string AQUI
+MAX_STRING_LENGTH = 50 
+
+
+def _linhas(fonte):
+    """
+    Gera as linhas de 'fonte' uma a uma, com as mesmas quebras de str.splitlines().
+
+    Aceita uma string, um arquivo aberto em modo texto ou qualquer iterável de linhas.
+    """
+    if isinstance(fonte, str):
+        inicio = 0
+        for quebra in _QUEBRA_LINHA.finditer(fonte):
+            yield fonte[inicio:quebra.start()]
+            inicio = quebra.end()
+        if inicio < len(fonte):
+            yield fonte[inicio:]
+    else:
+        for pedaco in fonte:
+            # Uma linha de arquivo ainda pode conter quebras "exóticas" (\x0c, \x85...)
+            yield from (pedaco.splitlines() or [''])
+
+
+def _varrer_linhas(fonte, regex=token_regex):
+    """Varredura linha a linha: um finditer por linha, com _FIM_DE_LINHA entre elas."""
+    for linha in _linhas(fonte):
+        yield from regex.finditer(linha)
+        yield _FIM_DE_LINHA
+
+
+def _varrer_buffer(codigo):
+    """Varredura do código inteiro em uma única passada; as quebras de linha viram matches de NEWLINE."""
+    return token_regex_buffer.finditer(codigo)
+
+
+# Motor de casamento padrão: 'regex' (token_regex) ou 'dfa' (tabelas geradas em lexer_dfa.py)
+MOTOR_PADRAO = os.environ.get('BIRL_MOTOR_LEXICO', 'regex')
+
+
+def iter_tokens(fonte, modo='auto', motor=None, orcamento=None, lexemas=None):
+    """
+    Versão em fluxo da análise léxica: gera tokens e erros à medida que o código é varrido.
 
     Args:
-        codigo (str): A string contendo o código BIRL a ser analisado.
+        fonte: O código BIRL como string, arquivo aberto em modo texto ou iterável de linhas.
+               Bytes UTF-8 (bytes, bytearray ou mmap) são varridos em blocos, sem decodificar
+               o texto inteiro, sempre com o motor 'regex' (veja lexer_mmap.py).
+        modo (str): 'linha' casa token_regex linha a linha; 'buffer' varre o código inteiro
+                    de uma vez e calcula linha/coluna pelos offsets (exige o código completo,
+                    arquivos são lidos inteiros). 'auto' usa 'buffer' para strings e 'linha'
+                    para o resto. Os dois modos produzem exatamente a mesma saída.
+        motor (str): 'regex' usa o módulo re; 'dfa' usa o autômato gerado de TOKEN_SPEC
+                     (lexer_dfa.py), que sempre varre linha a linha. Padrão: MOTOR_PADRAO.
+        orcamento (limites.Orcamento): Limites de tamanho, tokens, erros e tempo. Ao atingir um
+                     deles a varredura para (sem as verificações finais, que só fariam sentido
+                     com o código inteiro) e o limite fica em orcamento.estourado.
+        lexemas (simbolos.Lexemas): Tabela onde internar os identificadores e palavras-chave
+                     (para compartilhá-la com o TokenStream); sem ela, uma tabela nova.
+
+    Yields:
+        tuple: ('token', [linha, lexema, tipo, coluna]) para cada token reconhecido ou
+               ('erro', Diagnostico) para cada erro (sem repetições), na ordem em que são detectados.
+               Os erros de estrutura (BORA/BIRL! e delimitadores não fechados) saem ao final.
+    """
+    motor = motor or MOTOR_PADRAO
+    max_caracteres = orcamento.limites.caracteres if orcamento is not None else None
+    if max_caracteres is not None and isinstance(fonte, str) and len(fonte) > max_caracteres:
+        # Analisa só as linhas inteiras que cabem no limite
+        corte = fonte.rfind('\n', 0, max_caracteres + 1)
+        fonte = fonte[:corte if corte > 0 else max_caracteres]
+        orcamento.estourar('caracteres')
+    if modo == 'auto':
+        modo = 'buffer' if isinstance(fonte, str) else 'linha'
+    if modo not in ('linha', 'buffer'):
+        raise ValueError(f"Modo de varredura desconhecido: '{modo}'. Use 'auto', 'linha' ou 'buffer'.")
+
+    if isinstance(fonte, (bytes, bytearray, mmap.mmap)):
+        from lexer_mmap import varrer_bytes # Importado aqui: lexer_mmap depende de TOKEN_SPEC deste módulo
+        matches = varrer_bytes(fonte)
+    elif motor == 'dfa':
+        from lexer_dfa import lexer_padrao # Importado aqui: lexer_dfa depende de TOKEN_SPEC deste módulo
+        matches = _varrer_linhas(fonte, lexer_padrao())
+    elif motor != 'regex':
+        raise ValueError(f"Motor léxico desconhecido: '{motor}'. Use 'regex' ou 'dfa'.")
+    elif modo == 'buffer':
+        if not isinstance(fonte, str):
+            fonte = fonte.read() if hasattr(fonte, 'read') else '\n'.join(_linhas(fonte))
+        matches = _varrer_buffer(fonte)
+    else:
+        matches = _varrer_linhas(fonte)
+
+    estado = EstadoLexico(lexemas)
+    erros_emitidos = set()
+    if orcamento is None:
+        yield from _analisar_matches(matches, estado, erros_emitidos)
+    else:
+        yield from _limitar(_analisar_matches(matches, estado, erros_emitidos), orcamento)
+        if orcamento.estourado is not None:
+            return
+    yield from _verificacoes_finais(estado, erros_emitidos)
+
+
+def _limitar(eventos, orcamento):
+    """Repassa os eventos do léxico até atingir o limite de tokens, de erros ou de tempo do orçamento."""
+    limites = orcamento.limites
+    max_tokens = limites.tokens if limites.tokens is not None else float('inf')
+    max_erros = limites.diagnosticos if limites.diagnosticos is not None else float('inf')
+    tokens = erros = 0
+    for evento in eventos:
+        if evento[0] == 'token':
+            tokens += 1
+            if tokens > max_tokens:
+                orcamento.estourar('tokens')
+                return
+            # O relógio é consultado a cada 1024 tokens
+            if not tokens & 1023 and orcamento.sem_tempo():
+                return
+        else:
+            erros += 1
+            if erros > max_erros:
+                orcamento.estourar('diagnosticos')
+                return
+        yield evento
+
+
+class EstadoLexico:
+    """
+    Estado que a análise léxica leva de uma linha para a seguinte.
 
-    Returns:
-        dict: Um dicionário contendo:
-              - 'tokens': Uma lista de listas, onde cada sub-lista contém [linha, lexema, tipo, coluna].
-              - 'erros_estrutura': Uma lista de mensagens de erro de estrutura básica.
+    Fica fora do laço principal para que uma análise possa continuar a partir de um ponto
+    salvo (o lexer incremental re-analisa só as linhas editadas a partir dele).
     """
-    linhas_codigo = codigo.splitlines()
-    resultado_tokens = []
-    erros_estrutura = [] 
-    
-    delimiters_stack = [] 
-    delimiter_map = {
-        'Tira anilha': 'PARENTESES_ABRE', 
-    }
 
-    found_bora_token = False 
-    found_birl_token = False 
-    
-    declared_variables = set()
+    def __init__(self, lexemas=None):
+        self.num_linha = 1
+        # Lexemas internados (TIPOS_INTERNADOS): todos os tokens de um mesmo identificador
+        # compartilham um único objeto str
+        self.lexemas = lexemas if lexemas is not None else Lexemas()
+        self.declared_variables = set()
+        self.delimiters_stack = []
+        self.previous_meaningful_token_type = None
+        # Tipos do primeiro e do último token significativo (substituem a lista 'meaningful_sequence')
+        self.primeiro_tipo = None
+        self.ultimo_tipo = None
 
-    previous_meaningful_token_type = None 
-    last_meaningful_token_lexema = None 
 
-    # Definir limite de string AQUI
-    MAX_STRING_LENGTH = 50 
+def _analisar_matches(matches, estado, erros_emitidos):
+    """
+    Laço principal da análise léxica sobre os matches de uma varredura, a partir de 'estado'.
 
-    for num_linha, linha in enumerate(linhas_codigo, start=1):
-        pos_coluna = 0 
-        coluna_real = 1 
-        
-        while pos_coluna < len(linha):
-            match = token_regex.match(linha, pos_coluna)
+    Gera os eventos de iter_tokens (exceto as verificações finais) e deixa 'estado' atualizado
+    ao terminar. Erros já presentes em 'erros_emitidos' não são repetidos.
+    """
+    def erro(codigo, num_linha, coluna, *args):
+        diagnostico = Diagnostico(codigo, num_linha, coluna, args)
+        if diagnostico not in erros_emitidos:
+            erros_emitidos.add(diagnostico)
+            return [('erro', diagnostico)]
+        return []
+
+    delimiters_stack = estado.delimiters_stack
+    delimiter_map = {
+        'Tira anilha': 'PARENTESES_ABRE', 
+    }
 
-            if match:
-                tipo = match.lastgroup
-                lexema = match.group(tipo)
+    declared_variables = estado.declared_variables
+    ids_lexemas, textos_lexemas, internar = estado.lexemas.ids, estado.lexemas.textos, estado.lexemas.internar
+
+    def verificar_id_nao_declarado(lexema, num_linha, coluna, seguido_de_atribuicao):
+        # Erros de um ID ainda não declarado, emitidos quando o token seguinte da linha é conhecido
+        if seguido_de_atribuicao:
+            yield from erro('ATRIBUICAO_SEM_DECLARACAO', num_linha, coluna, lexema)
+            declared_variables.add(lexema)
+        if lexema in POTENTIAL_KEYWORD_MISUSE:
+            yield from erro('PALAVRA_CHAVE_INCORRETA', num_linha, coluna, lexema)
+
+    # ID não declarado à espera do próximo token (lookahead de um token, sem revarrer a linha):
+    # se o próximo token da mesma linha for TASAINDODAJAULA, é uma atribuição sem 'MONSTRO'.
+    id_pendente = None
+
+    previous_meaningful_token_type = estado.previous_meaningful_token_type
+    primeiro_tipo = estado.primeiro_tipo
+    ultimo_tipo = estado.ultimo_tipo
+
+    num_linha = estado.num_linha
+    inicio_linha = 0 # Offset do início da linha atual no texto varrido; a coluna sai dele
+
+    for match in matches:
+        tipo = match.lastgroup
+
+        if tipo == 'SKIP':
+            continue
+        if id_pendente is not None:
+            # Comentários e quebras de linha também encerram a espera: não são atribuição
+            yield from verificar_id_nao_declarado(*id_pendente, tipo == 'ATRIBUICAO')
+            id_pendente = None
+
+        if tipo == 'NEWLINE':
+            num_linha += 1
+            inicio_linha = match.end()
+            continue
+
+        lexema = match.group(tipo)
+        coluna_inicial_lexema = match.start(tipo) - inicio_linha + 1
+
+        # --- VALIDAÇÃO DE TAMANHO DE NÚMERO ---
+        if tipo == 'NUM' or tipo == 'NUM_DECIMAL':
+            if len(lexema) > 9 and len(lexema.replace('.', '')) > 9:
+                tipo_original = tipo 
+                tipo = 'NUM_EXCESSIVO_ERRO' 
+                yield from erro('NUMERO_EXCESSIVO', num_linha, coluna_inicial_lexema, lexema, tipo_original)
+
+        # --- VALIDAÇÃO DE TAMANHO DE STRING ---
+        elif tipo == 'STRING':
+            # O lexema inclui as aspas, que não contam para o limite
+            if len(lexema) - 2 > MAX_STRING_LENGTH:
+                tipo_original = tipo
+                tipo = 'STRING_MUITO_LONGA_ERRO' # Novo tipo de erro para string longa
+                yield from erro('STRING_MUITO_LONGA', num_linha, coluna_inicial_lexema, lexema, MAX_STRING_LENGTH)
+
+        if tipo == 'COMENTARIO':
+            yield ('token', [num_linha, lexema, tipo, coluna_inicial_lexema])
+            previous_meaningful_token_type = None 
+        elif tipo == 'MISMATCH':
+            yield from erro('CARACTERE_NAO_RECONHECIDO', num_linha, coluna_inicial_lexema, lexema)
+            yield ('token', [num_linha, lexema, 'ERRO LÉXICO', coluna_inicial_lexema])
+            previous_meaningful_token_type = None 
+        elif tipo == 'ASPAS_NAO_FECHADA':
+            yield from erro('ASPAS_NAO_FECHADAS', num_linha, coluna_inicial_lexema, lexema)
+            yield ('token', [num_linha, lexema, 'ERRO LÉXICO - ASPAS NÃO FECHADAS', coluna_inicial_lexema])
+            # Este tipo não consta em _TIPOS_FORA_DA_SEQUENCIA, então conta como significativo
+            primeiro_tipo = primeiro_tipo or 'ERRO LÉXICO - ASPAS NÃO FECHADAS'
+            ultimo_tipo = 'ERRO LÉXICO - ASPAS NÃO FECHADAS'
+            previous_meaningful_token_type = None 
+        elif tipo == 'CARACTERE_SOLTO_PARENTESES':
+            yield from erro('CARACTERE_INVALIDO', num_linha, coluna_inicial_lexema, lexema)
+            yield ('token', [num_linha, lexema, 'ERRO LÉXICO - CARACTERE INVÁLIDO', coluna_inicial_lexema])
+            primeiro_tipo = primeiro_tipo or 'ERRO LÉXICO - CARACTERE INVÁLIDO'
+            ultimo_tipo = 'ERRO LÉXICO - CARACTERE INVÁLIDO'
+            previous_meaningful_token_type = None 
+        else:
+            if tipo in TIPOS_INTERNADOS:
+                simbolo = ids_lexemas.get(lexema)
+                lexema = textos_lexemas[simbolo if simbolo is not None else internar(lexema)]
+            # Adiciona o token (cujo tipo pode ter sido alterado para erro de tamanho)
+            yield ('token', [num_linha, lexema, tipo, coluna_inicial_lexema])
+            if tipo not in _TIPOS_FORA_DA_SEQUENCIA:
+                primeiro_tipo = primeiro_tipo or tipo
+                ultimo_tipo = tipo
+
+            if tipo == 'ID':
+                # --- Lógica de Validação MONSTRO ---
+                if previous_meaningful_token_type == 'VARIAVEL':
+                    declared_variables.add(lexema) 
                 
-                coluna_inicial_lexema = coluna_real 
-
-                # --- VALIDAÇÃO DE TAMANHO DE NÚMERO ---
-                if tipo in ['NUM', 'NUM_DECIMAL']:
-                    digits_only_lexeme = lexema.replace('.', '')
-                    if len(digits_only_lexeme) > 9:
-                        tipo_original = tipo 
-                        tipo = 'NUM_EXCESSIVO_ERRO' 
-                        erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_inicial_lexema}: Número '{lexema}' excede o limite de 9 dígitos. Tipo original: {tipo_original}.")
-                # --- FIM DA VALIDAÇÃO DE TAMANHO DE NÚMERO ---
-
-                # --- NOVO: VALIDAÇÃO DE TAMANHO DE STRING ---
-                if tipo == 'STRING':
-                    # O lexema inclui as aspas, então removemos para contar o conteúdo
-                    string_content = lexema[1:-1] 
-                    if len(string_content) > MAX_STRING_LENGTH:
-                        tipo_original = tipo
-                        tipo = 'STRING_MUITO_LONGA_ERRO' # Novo tipo de erro para string longa
-                        erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_inicial_lexema}: String '{lexema}' excede o limite de {MAX_STRING_LENGTH} caracteres.")
-                # --- FIM DA VALIDAÇÃO DE TAMANHO DE STRING ---
-
-
-                if tipo == 'SKIP':
-                    coluna_real += len(lexema) 
-                    pass 
-                elif tipo == 'NEWLINE': 
-                    coluna_real = 1
-                    pass
-                elif tipo == 'COMENTARIO':
-                    resultado_tokens.append([num_linha, lexema, tipo, coluna_inicial_lexema])
-                    previous_meaningful_token_type = None 
-                    last_meaningful_token_lexema = None
-                    coluna_real += len(lexema)
-                elif tipo == 'MISMATCH':
-                    erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_inicial_lexema}: Caractere não reconhecido '{lexema}'.")
-                    resultado_tokens.append([num_linha, lexema, 'ERRO LÉXICO', coluna_inicial_lexema]) 
-                    previous_meaningful_token_type = None 
-                    last_meaningful_token_lexema = None
-                    coluna_real += len(lexema)
-                elif tipo == 'ASPAS_NAO_FECHADA':
-                    erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_inicial_lexema}: Aspas não fechadas em '{lexema}'.")
-                    resultado_tokens.append([num_linha, lexema, 'ERRO LÉXICO - ASPAS NÃO FECHADAS', coluna_inicial_lexema])
-                    previous_meaningful_token_type = None 
-                    last_meaningful_token_lexema = None
-                    coluna_real += len(lexema)
-                elif tipo == 'CARACTERE_SOLTO_PARENTESES':
-                    erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_inicial_lexema}: Caractere inválido '{lexema}'. Utilize 'Coloca anilha' e 'Tira anilha'.")
-                    resultado_tokens.append([num_linha, lexema, 'ERRO LÉXICO - CARACTERE INVÁLIDO', coluna_inicial_lexema])
-                    previous_meaningful_token_type = None 
-                    last_meaningful_token_lexema = None
-                    coluna_real += len(lexema)
-                else:
-                    # Adiciona o token (cujo tipo pode ter sido alterado para erro de tamanho)
-                    resultado_tokens.append([num_linha, lexema, tipo, coluna_inicial_lexema]) 
-                    
-                    # --- Lógica de Validação MONSTRO ---
-                    if tipo == 'ID' and previous_meaningful_token_type == 'VARIAVEL':
-                        declared_variables.add(lexema) 
-                    
-                    if tipo == 'ID' and lexema not in declared_variables:
-                        temp_pos = pos_coluna + len(lexema) 
-                        next_is_assignment = False
-                        temp_col_for_next = coluna_real + len(lexema) 
-                        while temp_pos < len(linha):
-                            next_match = token_regex.match(linha, temp_pos)
-                            if next_match:
-                                next_tipo = next_match.lastgroup
-                                if next_tipo == 'ATRIBUICAO':
-                                    next_is_assignment = True
-                                    break 
-                                elif next_tipo in ['SKIP', 'NEWLINE', 'COMENTARIO']:
-                                    temp_pos += len(next_match.group(next_tipo))
-                                    temp_col_for_next += len(next_match.group(next_tipo))
-                                else: 
-                                    break 
-                                
-                            else: 
-                                break
-                        
-                        if next_is_assignment: 
-                            erros_estrutura.append(f"Erro de Inicialização na linha {num_linha}, coluna {coluna_inicial_lexema}: Variável '{lexema}' utilizada com atribuição ('TASAINDODAJAULA') sem declaração com 'MONSTRO'.")
-                            declared_variables.add(lexema) 
-                            
+                if lexema not in declared_variables:
+                    # Os erros deste ID (inclusive o de palavra-chave) saem quando o próximo token for lido
+                    id_pendente = (lexema, num_linha, coluna_inicial_lexema)
+                elif lexema in POTENTIAL_KEYWORD_MISUSE:
                     # --- Lógica de Detecção de Uso Incorreto de Palavras (tipo 'If', 'Else') ---
-                    if tipo == 'ID' and lexema in POTENTIAL_KEYWORD_MISUSE:
-                        erros_estrutura.append(f"Erro de Palavra-Chave na linha {num_linha}, coluna {coluna_inicial_lexema}: Uso incorreto da palavra '{lexema}'. Utilize as palavras-chave BIRL! para controle de fluxo (ex: CONFERE_AI, OU_NAO).")
-                    
-                    # --- Lógica de Validação BORA/BIRL! ---
-                    if tipo == 'INICIO_PROGRAMA':
-                        found_bora_token = True
-                    elif tipo == 'FIM_PROGRAMA':
-                        found_birl_token = True
-
-                    # Lógica para verificação de balanceamento (usando a pilha)
-                    if tipo == 'PARENTESES_ABRE': 
-                        delimiters_stack.append((lexema, num_linha, tipo, coluna_inicial_lexema)) 
-                    elif tipo == 'PARENTESES_FECHA': 
-                        if not delimiters_stack:
-                            erros_estrutura.append(f"Erro de Balanceamento na linha {num_linha}, coluna {coluna_inicial_lexema}: '{lexema}' encontrado sem delimitador de abertura correspondente.")
-                        else:
-                            last_open_delimiter_info = delimiters_stack.pop()
-                            last_open_lexema = last_open_delimiter_info[0]
-                            last_open_line = last_open_delimiter_info[1]
-                            last_open_type = last_open_delimiter_info[2]
-                            last_open_col = last_open_delimiter_info[3] 
-                            
-                            if delimiter_map.get(lexema) != last_open_type: 
-                                erros_estrutura.append(f"Erro de Balanceamento na linha {num_linha}, coluna {coluna_inicial_lexema}: '{lexema}' encontrado, mas esperava fechamento para '{last_open_lexema}' (aberto na linha {last_open_line}, coluna {last_open_col}).")
-                                        
-                    # previous_meaningful_token_type deve refletir o tipo para contextos (ID, VARIAVEL, etc.)
-                    # Se o token atual é um erro léxico de tamanho, usamos o tipo ORIGINAL para o contexto.
-                    if tipo == 'NUM_EXCESSIVO_ERRO':
-                        previous_meaningful_token_type = tipo_original # Usa o tipo original (NUM/NUM_DECIMAL)
-                    elif tipo == 'STRING_MUITO_LONGA_ERRO':
-                        previous_meaningful_token_type = tipo_original # Usa o tipo original (STRING)
-                    else:
-                        previous_meaningful_token_type = tipo 
-                    last_meaningful_token_lexema = lexema
-                    coluna_real += len(lexema)
-
-
-                pos_coluna += len(lexema) 
+                    yield from erro('PALAVRA_CHAVE_INCORRETA', num_linha, coluna_inicial_lexema, lexema)
+
+            # Lógica para verificação de balanceamento (usando a pilha)
+            elif tipo == 'PARENTESES_ABRE': 
+                delimiters_stack.append((lexema, num_linha, tipo, coluna_inicial_lexema)) 
+            elif tipo == 'PARENTESES_FECHA': 
+                if not delimiters_stack:
+                    yield from erro('FECHAMENTO_SEM_ABERTURA', num_linha, coluna_inicial_lexema, lexema)
+                else:
+                    last_open_lexema, last_open_line, last_open_type, last_open_col = delimiters_stack.pop()
+                    if delimiter_map.get(lexema) != last_open_type: 
+                        yield from erro('FECHAMENTO_TROCADO', num_linha, coluna_inicial_lexema, lexema, last_open_lexema, last_open_line, last_open_col)
+                                    
+            # previous_meaningful_token_type deve refletir o tipo para contextos (ID, VARIAVEL, etc.)
+            # Se o token atual é um erro léxico de tamanho, usamos o tipo ORIGINAL para o contexto.
+            if tipo == 'NUM_EXCESSIVO_ERRO' or tipo == 'STRING_MUITO_LONGA_ERRO':
+                previous_meaningful_token_type = tipo_original
             else:
-                erros_estrutura.append(f"Erro Léxico na linha {num_linha}, coluna {coluna_real}: Caractere não reconhecido '{linha[pos_coluna]}'.")
-                resultado_tokens.append([num_linha, linha[pos_coluna], 'ERRO LÉXICO', coluna_real])
-                previous_meaningful_token_type = None 
-                last_meaningful_token_lexema = None
-                coluna_real += 1 
-                pos_coluna += 1 
+                previous_meaningful_token_type = tipo 
         
-    # --- Verificações Finais de Estrutura (Pós-Processamento) ---
-    
-    # 1. Validação de BORA e BIRL! 
-    meaningful_sequence = [
-        t for t in resultado_tokens 
-        if t[2] not in [
-            'SKIP', 'NEWLINE', 'COMENTARIO', 'ERRO LÉXICO', 
-            'ERRO LÉXICO - ASPAS NÃO_FECHADAS', 'ERRO LÉXICO - CARACTERE_INVÁLIDO', # Corrigi nomes aqui, verificar no app.py
-            'NUM_EXCESSIVO_ERRO', 'STRING_MUITO_LONGA_ERRO' 
-        ]
-    ]
+    if id_pendente is not None:
+        yield from verificar_id_nao_declarado(*id_pendente, False)
 
-    bora_line = meaningful_sequence[0][0] if meaningful_sequence and meaningful_sequence[0][2] == 'INICIO_PROGRAMA' else "N/A"
-    bora_col = meaningful_sequence[0][3] if meaningful_sequence and meaningful_sequence[0][2] == 'INICIO_PROGRAMA' else "N/A"
-    birl_line = meaningful_sequence[-1][0] if meaningful_sequence and meaningful_sequence[-1][2] == 'FIM_PROGRAMA' else "N/A"
-    birl_col = meaningful_sequence[-1][3] if meaningful_sequence and meaningful_sequence[-1][2] == 'FIM_PROGRAMA' else "N/A"
+    estado.num_linha = num_linha
+    estado.previous_meaningful_token_type = previous_meaningful_token_type
+    estado.primeiro_tipo = primeiro_tipo
+    estado.ultimo_tipo = ultimo_tipo
 
 
-    if not meaningful_sequence or meaningful_sequence[0][2] != 'INICIO_PROGRAMA':
-        erros_estrutura.append(f"Erro de Estrutura na linha {bora_line}, coluna {bora_col}: O programa deve começar com 'BORA'.")
+def _verificacoes_finais(estado, erros_emitidos):
+    """Verificações de estrutura feitas depois do último token (BORA/BIRL! e delimitadores abertos)."""
+    def erro(codigo, num_linha, coluna, *args):
+        diagnostico = Diagnostico(codigo, num_linha, coluna, args)
+        if diagnostico not in erros_emitidos:
+            erros_emitidos.add(diagnostico)
+            return [('erro', diagnostico)]
+        return []
 
-    if not meaningful_sequence or meaningful_sequence[-1][2] != 'FIM_PROGRAMA':
-        erros_estrutura.append(f"Erro de Estrutura na linha {birl_line}, coluna {birl_col}: O programa deve terminar com 'BIRL!'.")
+    # 1. Validação de BORA e BIRL! 
+    # (a linha/coluna só seria informada quando o token está certo, caso em que não há erro)
+    if estado.primeiro_tipo != 'INICIO_PROGRAMA':
+        yield from erro('INICIO_SEM_BORA', None, None)
+
+    if estado.ultimo_tipo != 'FIM_PROGRAMA':
+        yield from erro('FIM_SEM_BIRL', None, None)
 
     # 2. Erros de Balanceamento de Delimitadores (qualquer coisa que sobrou na pilha)
+    delimiters_stack = list(estado.delimiters_stack)
     while delimiters_stack:
         unclosed_lexema, unclosed_line, _, unclosed_col = delimiters_stack.pop() 
-        erros_estrutura.append(f"Erro de Balanceamento na linha {unclosed_line}, coluna {unclosed_col}: Delimitador '{unclosed_lexema}' aberto e não fechado.")
+        yield from erro('DELIMITADOR_NAO_FECHADO', unclosed_line, unclosed_col, unclosed_lexema)
+
+
+def analisar_codigo(codigo: str, motor: str = None) -> dict:
+    """
+    Realiza a análise léxica de um código-fonte BIRL e verifica a estrutura básica,
+    balanceamento de delimitadores, obrigatoriedade de 'MONSTRO' para variáveis,
+    e limites de tamanho para números e strings.
+
+    Args:
+        codigo (str): A string contendo o código BIRL a ser analisado.
+        motor (str): Motor de casamento ('regex' ou 'dfa'); veja iter_tokens.
+
+    Returns:
+        dict: Um dicionário contendo:
+              - 'tokens': Uma lista de listas, onde cada sub-lista contém [linha, lexema, tipo, coluna].
+              - 'erros_estrutura': Uma lista de mensagens de erro de estrutura básica.
+    """
+    resultado_tokens = []
+    erros_estrutura = [] 
 
-    erros_estrutura = list(dict.fromkeys(erros_estrutura))
+    adiciona_token = resultado_tokens.append
+    for evento, valor in iter_tokens(codigo, motor=motor):
+        if evento == 'token':
+            adiciona_token(valor)
+        else:
+            erros_estrutura.append(renderizar(valor))
 
-    return {'tokens': resultado_tokens, 'erros_estrutura': erros_estrutura}
\ No newline at end of file
+    return {'tokens': resultado_tokens, 'erros_estrutura': erros_estrutura}
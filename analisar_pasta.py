@@ -0,0 +1,128 @@
+"""
+Analisa todos os programas BIRL! de uma pasta, em paralelo, sem precisar do app Flask.
+
+Grava uma linha JSON por arquivo: {"arquivo": caminho relativo, "resultado": [...]}, com
+"resultado" no mesmo formato da resposta de /analisar (ou {"arquivo": ..., "erro": ...}
+quando o arquivo não pôde ser lido). O progresso e a vazão saem no stderr.
+
+Por padrão os arquivos são analisados sem os limites de limites.py (tamanho, tokens, erros e
+tempo), que protegem o servidor: um arquivo grande ou lento sai completo. Com --limites, valem
+os mesmos limites do app (variáveis BIRL_MAX_*), e os arquivos que passam deles saem truncados.
+
+Uso: python analisar_pasta.py PASTA [-o saida.jsonl] [--workers N] [--padrao '*.py' ...] [--retomar] [--limites]
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+
+from limites import LIMITES
+from lote import normalizar_workers, pool, resultado_json
+
+PADROES_PADRAO = ['*.py', '*.birl']
+
+
+def listar_arquivos(pasta, padroes):
+    """Caminhos relativos (com '/') dos arquivos da pasta e subpastas que casam com algum padrão, em ordem."""
+    arquivos = []
+    for raiz, subpastas, nomes in os.walk(pasta):
+        subpastas[:] = sorted(nome for nome in subpastas if not nome.startswith('.') and nome != '__pycache__')
+        for nome in sorted(nomes):
+            if any(fnmatch.fnmatch(nome, padrao) for padrao in padroes):
+                arquivos.append(os.path.relpath(os.path.join(raiz, nome), pasta).replace(os.sep, '/'))
+    return arquivos
+
+
+def analisar_arquivo(tarefa):
+    """Lê e analisa um arquivo (roda nos processos do pool). Devolve (linha JSONL, bytes lidos)."""
+    pasta, relativo, limites = tarefa
+    try:
+        with open(os.path.join(pasta, relativo), encoding='utf-8') as arquivo:
+            codigo = arquivo.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return json.dumps({'arquivo': relativo, 'erro': str(e)}), 0
+    linha = f'{{"arquivo":{json.dumps(relativo)},"resultado":{resultado_json(codigo, limites)}}}'
+    return linha, len(codigo.encode('utf-8'))
+
+
+def arquivos_ja_analisados(caminho_saida):
+    """
+    Arquivos já presentes em uma saída anterior (para --retomar).
+
+    Uma última linha incompleta (execução interrompida no meio da escrita) é cortada do arquivo.
+    """
+    if not os.path.exists(caminho_saida):
+        return set()
+    with open(caminho_saida, 'rb+') as saida:
+        conteudo = saida.read()
+        fim_completo = conteudo.rfind(b'\n') + 1
+        if fim_completo != len(conteudo):
+            saida.truncate(fim_completo)
+    feitos = set()
+    for linha in conteudo[:fim_completo].splitlines():
+        try:
+            feitos.add(json.loads(linha)['arquivo'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return feitos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pasta')
+    parser.add_argument('-o', '--saida', default='resultados.jsonl', help="Arquivo JSONL de saída ('-' para stdout).")
+    parser.add_argument('--workers', type=int, default=None, help='Processos (padrão: um por CPU).')
+    parser.add_argument('--padrao', nargs='+', default=PADROES_PADRAO, help='Padrões de nome de arquivo.')
+    parser.add_argument('--retomar', action='store_true', help='Pula os arquivos que já estão na saída.')
+    parser.add_argument('--limites', action='store_true', help='Usa os limites do app (BIRL_MAX_*); o padrão é sem limites.')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.pasta):
+        parser.error(f"'{args.pasta}' não é uma pasta.")
+    if args.retomar and args.saida == '-':
+        parser.error("--retomar precisa de um arquivo de saída.")
+
+    arquivos = listar_arquivos(args.pasta, args.padrao)
+    if args.retomar:
+        feitos = arquivos_ja_analisados(args.saida)
+        pulados = sum(1 for relativo in arquivos if relativo in feitos)
+        arquivos = [relativo for relativo in arquivos if relativo not in feitos]
+        print(f"Retomando: {pulados} arquivos já analisados, {len(arquivos)} restantes.", file=sys.stderr)
+
+    workers = normalizar_workers(args.workers)
+    limites = LIMITES if args.limites else None
+    tarefas = [(args.pasta, relativo, limites) for relativo in arquivos]
+    if workers == 1:
+        resultados = map(analisar_arquivo, tarefas)
+    else:
+        resultados = pool(workers).map(analisar_arquivo, tarefas, chunksize=max(1, min(16, len(tarefas) // (workers * 4))))
+
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'a' if args.retomar else 'w', encoding='utf-8')
+    inicio = ultimo_relatorio = time.perf_counter()
+    total_bytes = 0
+    concluidos = 0
+    try:
+        for linha, tamanho in resultados:
+            saida.write(linha + '\n')
+            saida.flush() # Linha inteira no disco antes da próxima: é o que o --retomar aproveita
+            concluidos += 1
+            total_bytes += tamanho
+            agora = time.perf_counter()
+            if agora - ultimo_relatorio >= 0.5:
+                ultimo_relatorio = agora
+                decorrido = agora - inicio
+                print(f"\r{concluidos}/{len(arquivos)} arquivos, {concluidos / decorrido:.1f} arq/s, "
+                      f"{total_bytes / decorrido / 1024 / 1024:.2f} MB/s", end='', file=sys.stderr, flush=True)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    decorrido = time.perf_counter() - inicio
+    vazao = f"{concluidos / decorrido:.1f} arq/s, {total_bytes / decorrido / 1024 / 1024:.2f} MB/s" if decorrido else '-'
+    print(f"\r{concluidos} arquivos analisados em {decorrido:.2f} s ({vazao}) com {workers} processo(s).", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
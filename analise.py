@@ -0,0 +1,327 @@
+"""
+Análise completa de um programa BIRL! (léxico, sintático e semântico) no formato de saída do app.
+
+Não depende do Flask: é usada pelas rotas de app.py, pelos processos da análise em lote e
+pela linha de comando.
+"""
+from analisador import CODIGO_TIPO, iter_tokens
+from diagnosticos import renderizar
+from fluxo_tokens import TokenStream
+from limites import DESCRICAO_LIMITE, Orcamento
+from metricas import NULO
+from semantico import analisar_semantica
+from sintatico import IGNORADO, TIPO_SINTATICO, Parser
+
+# Campos de cada item da saída, na ordem das tuplas de itens_saida
+CAMPOS = ('linha', 'coluna', 'lexema_ou_mensagem', 'tipo', 'categoria')
+
+# Erros do léxico exibidos como 'ERRO DE ESTRUTURA/LÉXICO'; os demais são exibidos como 'ERRO SINTÁTICO'
+CODIGOS_EXIBIDOS_COMO_LEXICO = {'NUMERO_EXCESSIVO', 'STRING_MUITO_LONGA', 'CARACTERE_NAO_RECONHECIDO'}
+
+# Erros do léxico que a análise semântica refaz considerando os escopos: quando ela roda, os do
+# léxico saem. Rodando ou não, são exibidos como 'ERRO SEMÂNTICO'
+CODIGOS_REFEITOS_PELO_SEMANTICO = {'ATRIBUICAO_SEM_DECLARACAO'}
+
+# Linhas de situação das fases (veja _itens_de_situacao)
+_SUCESSO_SINTATICO = (0, 0, "Análise Sintática: NENHUM ERRO SINTÁTICO DETECTADO.", 'SUCESSO SINTÁTICO', 'sucesso')
+_SUCESSO_SEMANTICO = (0, 0, "Análise Semântica: NENHUM ERRO SEMÂNTICO DETECTADO.", 'SUCESSO SEMÂNTICO', 'sucesso')
+
+
+def analisar_programa(codigo: str, limites=None, montar=None, cronometro=NULO):
+    """
+    Analisa o código e devolve a lista de itens de /analisar: erros léxicos/estruturais,
+    erros sintáticos, as linhas de situação (sucesso ou falha do semântico), erros semânticos
+    e os tokens, nessa ordem.
+
+    Com limites (limites.Limites), uma análise que atinge algum deles sai truncada, com um
+    item de aviso no início (veja montar_saida). 'montar' troca o formato da saída
+    (ex.: montar_colunar); o padrão é montar_saida. O tempo de cada fase vai para o
+    'cronometro' (metricas.Cronometro); na passada única, o tempo em que o Parser puxa tokens
+    do léxico conta como 'lexico' e o resto como 'sintatico'.
+    """
+    orcamento = Orcamento(limites) if limites is not None else None
+    montar = montar or montar_saida
+    # 1. Léxico e sintático em uma passada (tokens em um TokenStream compacto); a fase 'lexico'
+    # é medida dentro dela e descontada do 'sintatico'
+    with cronometro.fase('sintatico'):
+        resultado = analisar_em_uma_passada(codigo, orcamento, cronometro=cronometro)
+    cronometro.registrar_tokens(len(resultado['tokens']))
+    return montar(resultado, orcamento, cronometro)
+
+
+def _entrada_sintatica(eventos, fluxo, diagnosticos):
+    # Consome os eventos do léxico montando o TokenStream e a lista de erros léxicos, e gera os
+    # pares (índice no fluxo, tipo para o sintático) que o Parser puxa
+    inicios_linha = fluxo.inicios_linha
+    tipos, inicios, fins = fluxo.tipos, fluxo.inicios, fluxo.fins
+    tipo_sintatico = TIPO_SINTATICO
+    indice = 0
+    for evento, valor in eventos:
+        if evento == 'token':
+            num_linha, lexema, tipo, coluna = valor
+            codigo = CODIGO_TIPO[tipo]
+            inicio = inicios_linha[num_linha - 1] + coluna - 1
+            tipos.append(codigo)
+            inicios.append(inicio)
+            fins.append(inicio + len(lexema))
+            codigo = tipo_sintatico[codigo]
+            if codigo != IGNORADO:
+                yield indice, codigo
+            indice += 1
+        else:
+            diagnosticos.append(valor)
+
+
+def analisar_em_uma_passada(codigo: str, orcamento=None, motor=None, cronometro=NULO) -> dict:
+    """
+    Léxico e sintático em uma passada: o Parser puxa os tokens do gerador do léxico à medida
+    que avança, sem esperar o léxico terminar e sem uma lista intermediária dos tokens que ele
+    vê. O sintático roda mesmo com erros léxicos (veja sintatico.TIPO_SINTATICO).
+
+    O sintático tem limites separados dos do léxico (orcamento.separado()), e o primeiro a
+    atingir um deles o registra em 'orcamento'. Depois de o Parser terminar, o resto do léxico
+    é consumido, para a lista de tokens ficar completa. O tempo do léxico (puxado pelo Parser e
+    o do resto) vai para a fase 'lexico' do cronometro.
+
+    Returns:
+        dict: {'tokens': TokenStream, 'diagnosticos': [Diagnostico] do léxico,
+               'sintaticos': [Diagnostico] do Parser, ou None se o léxico foi truncado (os
+               erros seriam do código cortado), 'arvore': arvore.Arvore montada pelo Parser}:
+              o de analisar_fluxo mais 'sintaticos' e 'arvore'.
+    """
+    fluxo = TokenStream(codigo)
+    diagnosticos = []
+    entrada = _entrada_sintatica(iter_tokens(codigo, motor=motor, orcamento=orcamento, lexemas=fluxo.lexemas), fluxo, diagnosticos)
+    orcamento_sintatico = orcamento.separado() if orcamento is not None else None
+
+    parser = Parser(fluxo, orcamento_sintatico, entrada, cronometro)
+    sintaticos = parser.analisar()
+    with cronometro.fase('lexico'):
+        for _ in entrada:
+            pass
+
+    if orcamento is not None:
+        if orcamento.estourado is not None:
+            sintaticos = None
+        elif orcamento_sintatico.estourado is not None:
+            orcamento.estourar(orcamento_sintatico.estourado)
+    return {'tokens': fluxo, 'diagnosticos': diagnosticos, 'sintaticos': sintaticos, 'arvore': parser.arvore}
+
+
+def _item_aviso(orcamento):
+    limite = orcamento.estourado
+    return (0, 0, f"Análise interrompida: limite de {DESCRICAO_LIMITE[limite]} atingido "
+                  f"({getattr(orcamento.limites, limite)}). O resultado está incompleto.",
+            'ANÁLISE TRUNCADA', 'aviso')
+
+
+def _item_lexico(diagnostico):
+    # Erros LÉXICOS/ESTRUTURAIS/INICIALIZAÇÃO/PALAVRA-CHAVE
+    if diagnostico.codigo in CODIGOS_EXIBIDOS_COMO_LEXICO:
+        display_type = 'ERRO DE ESTRUTURA/LÉXICO'
+    elif diagnostico.codigo in CODIGOS_REFEITOS_PELO_SEMANTICO:
+        display_type = 'ERRO SEMÂNTICO' # O mesmo tipo de quando o semântico o refaz
+    else:
+        display_type = 'ERRO SINTÁTICO'
+    return (diagnostico.linha or 0, diagnostico.coluna or 0, renderizar(diagnostico), display_type, 'erro')
+
+
+def _analisar_sintatico(tokens, orcamento, cronometro=NULO):
+    # O Parser sobre um léxico já terminado: (erros, árvore)
+    with cronometro.fase('sintatico'):
+        parser = Parser(tokens, orcamento)
+        return parser.analisar(), parser.arvore
+
+
+def _analisar_semantica(arvore, sintaticos, orcamento, cronometro=NULO):
+    # A semântica só roda sobre a árvore completa de um programa sem erros sintáticos (None se não rodou)
+    if sintaticos or (orcamento is not None and orcamento.estourado is not None):
+        return None
+    with cronometro.fase('semantico'):
+        return analisar_semantica(arvore)
+
+
+def _item_semantico(diagnostico):
+    return (diagnostico.linha, diagnostico.coluna, renderizar(diagnostico), 'ERRO SEMÂNTICO', 'erro')
+
+
+def _itens_sintaticos(diagnosticos, cronometro=NULO):
+    # Erros SINTÁTICOS (do Parser)
+    with cronometro.fase('classificacao'):
+        return [
+            ("N/A" if diagnostico.linha is None else diagnostico.linha, diagnostico.coluna or 0,
+             f"Erro Sintático: {renderizar(diagnostico)}", 'ERRO SINTÁTICO', 'erro')
+            for diagnostico in diagnosticos
+        ]
+
+
+def _itens_de_situacao(semanticos, outros_erros):
+    # Linhas de situação, quando o semântico rodou (o sintático não achou erros e nada foi
+    # truncado): a falha do semântico, se ele achou erros, ou o sucesso das duas fases, que só
+    # sai se a resposta não tem erro nenhum ('outros_erros': há erros léxicos)
+    if semanticos is None:
+        return []
+    if semanticos:
+        return [(0, 0, f"Análise Semântica: {len(semanticos)} erro(s) semântico(s) encontrado(s).",
+                 'FALHA SEMÂNTICA', 'falha')]
+    return [] if outros_erros else [_SUCESSO_SINTATICO, _SUCESSO_SEMANTICO]
+
+
+def itens_de_mensagem(resultado_lexico, orcamento=None, cronometro=NULO):
+    """
+    Gera os itens das rotas de análise que vêm antes dos tokens (aviso, erros léxicos, erros
+    sintáticos, as linhas de situação e os erros semânticos), como tuplas (linha, coluna,
+    lexema_ou_mensagem, tipo, categoria) (veja CAMPOS).
+
+    Args:
+        resultado_lexico (dict): {'tokens': TokenStream, 'diagnosticos': [Diagnostico]}, como
+                                 devolvido por fluxo_tokens.analisar_fluxo, ou o de
+                                 analisar_em_uma_passada, que já traz os 'sintaticos' e a 'arvore'.
+        orcamento (limites.Orcamento): Limites da análise (os mesmos usados pelo léxico).
+        cronometro (metricas.Cronometro): Recebe os tempos do sintático, do semântico e da
+                                          classificação dos erros.
+
+    Sem 'sintaticos' no resultado, o sintático roda aqui, mesmo que o léxico tenha encontrado
+    erros; um léxico truncado não passa pelo sintático. O semântico só roda se o sintático não
+    encontrou erros, e então substitui os erros do léxico em CODIGOS_REFEITOS_PELO_SEMANTICO
+    (que têm o tipo 'ERRO SEMÂNTICO' nos dois casos). Quando o semântico roda, uma linha de
+    situação diz se ele falhou (categoria 'falha') ou, se não há erro nenhum, que o sintático e
+    o semântico terminaram sem erros (categoria 'sucesso'). O texto das mensagens de erro só é
+    montado aqui, a partir dos diagnósticos. Se algum limite do orçamento foi atingido, o
+    primeiro item é um aviso de categoria 'aviso'.
+    """
+    erros_estrutura_brutos = resultado_lexico['diagnosticos']
+
+    itens_sintaticos = []
+    semanticos = None
+    sintaticos, arvore = resultado_lexico.get('sintaticos'), resultado_lexico.get('arvore')
+    if sintaticos is None and (orcamento is None or orcamento.estourado is None):
+        sintaticos, arvore = _analisar_sintatico(resultado_lexico['tokens'], orcamento, cronometro)
+    if sintaticos is not None:
+        itens_sintaticos = _itens_sintaticos(sintaticos, cronometro)
+        semanticos = _analisar_semantica(arvore, sintaticos, orcamento, cronometro)
+    with cronometro.fase('classificacao'):
+        if semanticos is not None:
+            erros_estrutura_brutos = [
+                diagnostico for diagnostico in erros_estrutura_brutos
+                if diagnostico.codigo not in CODIGOS_REFEITOS_PELO_SEMANTICO
+            ]
+        itens_lexicos = [_item_lexico(diagnostico) for diagnostico in erros_estrutura_brutos]
+        itens_sintaticos.extend(_itens_de_situacao(semanticos, bool(itens_lexicos)))
+        itens_sintaticos.extend(_item_semantico(diagnostico) for diagnostico in semanticos or ())
+
+    if orcamento is not None and orcamento.estourado is not None:
+        yield _item_aviso(orcamento)
+    yield from itens_lexicos
+    yield from itens_sintaticos
+
+
+def itens_em_fluxo(codigo, orcamento=None, motor=None):
+    """
+    Itens da análise na ordem em que ficam prontos, para respostas em fluxo: cada token e cada
+    erro léxico sai assim que o léxico o produz; depois vêm os itens do sintático e do semântico
+    e, se a análise foi truncada, o aviso (com o limite atingido) por último. Os erros léxicos
+    que o semântico pode substituir (CODIGOS_REFEITOS_PELO_SEMANTICO) esperam até se saber se
+    ele roda.
+
+    Os itens são os mesmos de itens_saida, só que em outra ordem (erros léxicos no meio dos tokens).
+    O limite atingido fica em orcamento.estourado.
+    """
+    fluxo = TokenStream(codigo)
+    inicios_linha = fluxo.inicios_linha
+    tipos, inicios, fins = fluxo.tipos, fluxo.inicios, fluxo.fins
+    retidos = []
+    outros_erros = False
+
+    for evento, valor in iter_tokens(codigo, motor=motor, orcamento=orcamento, lexemas=fluxo.lexemas):
+        if evento == 'token':
+            num_linha, lexema, tipo, coluna = valor
+            # O TokenStream é montado junto, para o sintático rodar no fim
+            inicio = inicios_linha[num_linha - 1] + coluna - 1
+            tipos.append(CODIGO_TIPO[tipo])
+            inicios.append(inicio)
+            fins.append(inicio + len(lexema))
+            yield (num_linha, coluna, lexema, tipo, 'token')
+        elif valor.codigo in CODIGOS_REFEITOS_PELO_SEMANTICO:
+            retidos.append(valor)
+        else:
+            outros_erros = True
+            yield _item_lexico(valor)
+
+    semanticos = None
+    itens_sintaticos = []
+    if orcamento is None or orcamento.estourado is None:
+        sintaticos, arvore = _analisar_sintatico(fluxo, orcamento)
+        itens_sintaticos = _itens_sintaticos(sintaticos)
+        semanticos = _analisar_semantica(arvore, sintaticos, orcamento)
+    if semanticos is None:
+        yield from (_item_lexico(diagnostico) for diagnostico in retidos)
+    yield from itens_sintaticos
+    yield from _itens_de_situacao(semanticos, outros_erros)
+    yield from (_item_semantico(diagnostico) for diagnostico in semanticos or ())
+    if orcamento is not None and orcamento.estourado is not None:
+        yield _item_aviso(orcamento)
+
+
+def itens_saida(resultado_lexico, orcamento=None, cronometro=NULO):
+    """Todos os itens das rotas de análise, como tuplas: os de itens_de_mensagem e depois os tokens."""
+    yield from itens_de_mensagem(resultado_lexico, orcamento, cronometro)
+    # Adiciona os tokens LÉXICOS originais
+    for linha, lexema, tipo, coluna in resultado_lexico['tokens']:
+        yield (linha, coluna, lexema, tipo, 'token')
+
+
+def montar_saida(resultado_lexico, orcamento=None, cronometro=NULO):
+    """
+    Lista de itens devolvida pelas rotas de análise: um dicionário por item de itens_saida.
+
+    O aviso de análise truncada traz também 'truncado': True e o nome do limite em 'limite'.
+    """
+    final_output_structured = [
+        {'linha': linha, 'coluna': coluna, 'lexema_ou_mensagem': texto, 'tipo': tipo, 'categoria': categoria}
+        for linha, coluna, texto, tipo, categoria in itens_de_mensagem(resultado_lexico, orcamento, cronometro)
+    ]
+    if orcamento is not None and orcamento.estourado is not None:
+        final_output_structured[0].update(truncado=True, limite=orcamento.estourado)
+
+    # Adiciona os tokens LÉXICOS originais
+    with cronometro.fase('serializacao'):
+        final_output_structured.extend(
+            {'linha': linha, 'coluna': coluna, 'lexema_ou_mensagem': lexema, 'tipo': tipo, 'categoria': 'token'}
+            for linha, lexema, tipo, coluna in resultado_lexico['tokens']
+        )
+    return final_output_structured
+
+
+def montar_colunar(resultado_lexico, orcamento=None, cronometro=NULO):
+    """
+    Os mesmos itens de montar_saida em colunas: uma lista por campo, em vez de um objeto por item.
+
+    'tipo' e 'categoria' trazem índices nas listas 'tipos' e 'categorias' (na ordem em que
+    aparecem), para não repetir os nomes. Se a análise foi truncada, 'truncado' e 'limite'
+    ficam no objeto principal.
+    """
+    linhas, colunas, textos, tipos, categorias = [], [], [], [], []
+    indice_tipo, indice_categoria = {}, {}
+    for linha, coluna, texto, tipo, categoria in itens_saida(resultado_lexico, orcamento, cronometro):
+        linhas.append(linha)
+        colunas.append(coluna)
+        textos.append(texto)
+        indice = indice_tipo.get(tipo)
+        if indice is None:
+            indice = indice_tipo[tipo] = len(indice_tipo)
+        tipos.append(indice)
+        indice = indice_categoria.get(categoria)
+        if indice is None:
+            indice = indice_categoria[categoria] = len(indice_categoria)
+        categorias.append(indice)
+
+    resultado = {
+        'linha': linhas, 'coluna': colunas, 'lexema_ou_mensagem': textos,
+        'tipo': tipos, 'categoria': categorias,
+        'tipos': list(indice_tipo), 'categorias': list(indice_categoria),
+    }
+    if orcamento is not None and orcamento.estourado is not None:
+        resultado['truncado'] = True
+        resultado['limite'] = orcamento.estourado
+    return resultado
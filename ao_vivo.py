@@ -0,0 +1,205 @@
+"""
+Análise ao vivo do editor: cada alteração vai para o servidor e os resultados voltam por
+Server-Sent Events (SSE).
+
+Cada aba do editor é uma SessaoAoVivo. O cliente envia cada alteração como uma revisão numerada
+(POST) e mantém aberto o fluxo de eventos da sessão (GET), e é a thread desse fluxo que analisa.
+A sessão guarda o documento (lexer_incremental.DocumentoIncremental): a primeira revisão leva o
+código completo e as seguintes só as linhas alteradas, como em /analisar/incremental, e o léxico
+de cada revisão só passa pelas linhas alteradas. Além disso:
+  - uma revisão só é analisada depois de ESPERA segundos sem uma revisão mais nova (a digitação
+    parou), e só a última revisão é analisada: as do meio são descartadas sem análise;
+  - uma revisão que chega durante a análise de uma mais velha cancela essa análise
+    (limites.Orcamento.cancelar: o sintático e o semântico param na próxima consulta ao
+    relógio), e o resultado dela não é enviado;
+  - revisões que chegam fora de ordem (número menor ou igual ao da última) são ignoradas;
+  - cada resultado vai com o número da revisão analisada, que só cresce no fluxo.
+
+Não depende do Flask: as rotas ficam em app.py.
+"""
+import json
+import os
+import threading
+import time
+
+from analise import montar_saida
+from lexer_incremental import DocumentoGrandeDemais, DocumentoIncremental
+from limites import LIMITES, Orcamento
+
+ESPERA = float(os.environ.get('BIRL_AO_VIVO_ESPERA_MS', 150)) / 1000 # Pausa na digitação antes de analisar
+PING = 15.0 # Segundos sem eventos até um comentário de keep-alive no fluxo
+# Segundos sem revisões até o fluxo ser encerrado (o EventSource do navegador reconecta sozinho);
+# assim a thread de um fluxo cujo cliente sumiu não fica presa para sempre
+MAX_OCIOSO = float(os.environ.get('BIRL_AO_VIVO_OCIOSO', 300))
+
+_PING = object()
+
+
+class DocumentoDesconhecido(LookupError):
+    """Uma edição chegou a uma sessão sem documento (nova ou descartada): falta o código completo."""
+
+
+class SessaoAoVivo:
+    """
+    As revisões de um editor e a análise em andamento.
+
+    Atributos:
+        revisao (int): Número da última revisão recebida (0: nenhuma).
+        analises (int): Análises iniciadas.
+        canceladas (int): Análises canceladas no meio, ou terminadas com uma revisão mais nova
+                          já na fila (resultado não enviado).
+    """
+
+    def __init__(self, espera=ESPERA, limites=LIMITES):
+        self.espera = espera
+        self.limites = limites
+        self.revisao = 0
+        self.analises = 0
+        self.canceladas = 0
+        self._condicao = threading.Condition()
+        self._documento = None # DocumentoIncremental com o texto da última revisão
+        self._pendente = False # A última revisão ainda não foi analisada
+        self._chegada = 0.0 # Instante (time.monotonic) em que chegou a última revisão
+        self._orcamento = None # Orçamento da análise em andamento
+        self._leitor = 0 # Número do fluxo aberto; abrir ou fechar um fluxo muda o número
+        self._encerrada = False
+
+    def enviar(self, revisao, codigo=None, edicao=None):
+        """
+        Registra uma revisão: o código completo, ou uma edição (linha_inicio, linha_fim, texto)
+        do documento da revisão anterior, com os argumentos de DocumentoIncremental.editar. Se há
+        uma análise em andamento, ela é cancelada.
+
+        Returns:
+            bool: False se a revisão foi ignorada por não ser mais nova que a última recebida
+                  (o documento não muda; o cliente deve mandar o código completo na próxima).
+
+        Raises:
+            DocumentoDesconhecido: Se veio uma edição e a sessão não tem documento.
+            DocumentoGrandeDemais, TypeError, ValueError: Edição recusada por editar (o
+                documento não muda).
+        """
+        documento = None
+        if codigo is not None:
+            # Analisado fora do lock: um documento grande não segura o fluxo aberto
+            if self.limites.caracteres is not None and len(codigo) > self.limites.caracteres:
+                raise DocumentoGrandeDemais(f"O documento passaria do limite de {self.limites.caracteres} caracteres.")
+            documento = DocumentoIncremental(codigo)
+        with self._condicao:
+            if revisao <= self.revisao:
+                return False
+            if documento is None:
+                if self._documento is None:
+                    raise DocumentoDesconhecido()
+                self._documento.editar(*edicao, max_caracteres=self.limites.caracteres)
+            else:
+                self._documento = documento
+            self.revisao = revisao
+            self._pendente = True
+            self._chegada = time.monotonic()
+            if self._orcamento is not None:
+                self._orcamento.cancelar()
+            self._condicao.notify_all()
+        return True
+
+    def encerrar(self):
+        """Encerra o fluxo aberto (a sessão foi descartada)."""
+        with self._condicao:
+            self._encerrada = True
+            self._condicao.notify_all()
+
+    def abrir_fluxo(self):
+        """
+        Abre um fluxo de resultados; o anterior, se ainda aberto, termina.
+
+        Returns:
+            int: O número do fluxo, para resultados() e fechar_fluxo().
+        """
+        with self._condicao:
+            self._trocar_fluxo()
+            return self._leitor
+
+    def fechar_fluxo(self, leitor):
+        """Fecha o fluxo 'leitor' (o cliente desconectou), se ainda é o aberto."""
+        with self._condicao:
+            if self._leitor == leitor:
+                self._trocar_fluxo()
+
+    def _trocar_fluxo(self):
+        # Com o lock: o fluxo aberto termina e a análise em andamento nele é cancelada (a
+        # revisão volta a ficar pendente, para o próximo fluxo)
+        self._leitor += 1
+        if self._orcamento is not None:
+            self._orcamento.cancelar()
+        self._condicao.notify_all()
+
+    def resultados(self, leitor=None, ping=PING, max_ocioso=MAX_OCIOSO):
+        """
+        O fluxo de resultados: gera (revisao, itens no formato de /analisar) para cada revisão
+        analisada até o fim, e None a cada 'ping' segundos sem resultado (para o keep-alive).
+
+        'leitor' é o número devolvido por abrir_fluxo() (None: abre um fluxo aqui). Termina
+        quando o fluxo é fechado, quando outro fluxo da mesma sessão é aberto, quando a sessão
+        é encerrada ou depois de 'max_ocioso' segundos sem revisões.
+        """
+        if leitor is None:
+            leitor = self.abrir_fluxo()
+        aberto = time.monotonic()
+        try:
+            while True:
+                proxima = self._proxima_revisao(leitor, aberto, ping, max_ocioso)
+                if proxima is None:
+                    return
+                if proxima is _PING:
+                    yield None
+                    continue
+                revisao, resultado_lexico, orcamento = proxima
+                itens = montar_saida(resultado_lexico, orcamento)
+                with self._condicao:
+                    if self._orcamento is orcamento:
+                        self._orcamento = None
+                    if self._leitor != leitor:
+                        # O fluxo foi fechado no meio: a revisão fica para o próximo
+                        if revisao == self.revisao:
+                            self._pendente = True
+                        self.canceladas += 1
+                        return
+                    # Uma revisão que chegou logo depois do fim da análise também a torna velha
+                    if orcamento.cancelado or self._pendente:
+                        self.canceladas += 1
+                        continue
+                yield revisao, itens
+        finally:
+            self.fechar_fluxo(leitor)
+
+    def _proxima_revisao(self, leitor, aberto, ping, max_ocioso):
+        # Espera a próxima revisão a analisar e a marca como em andamento: (revisao, resultado
+        # do léxico, orcamento), _PING se passaram 'ping' segundos sem revisão, ou None se o
+        # fluxo acabou. O resultado do léxico é uma cópia: as próximas edições não o mudam
+        with self._condicao:
+            limite_ping = time.monotonic() + ping
+            while True:
+                if self._encerrada or self._leitor != leitor:
+                    return None
+                agora = time.monotonic()
+                if not self._pendente:
+                    if agora - max(self._chegada, aberto) >= max_ocioso:
+                        return None
+                    if agora >= limite_ping:
+                        return _PING
+                    self._condicao.wait(limite_ping - agora)
+                    continue
+                restante = self._chegada + self.espera - agora
+                if restante > 0:
+                    self._condicao.wait(restante)
+                    continue
+                self._pendente = False
+                self._orcamento = Orcamento(self.limites)
+                self.analises += 1
+                return self.revisao, self._documento.fluxo(self._orcamento), self._orcamento
+
+
+def evento_sse(revisao, itens):
+    """Um resultado como evento SSE 'resultado' (id = revisão; dados = {"revisao", "resultado"} em JSON)."""
+    dados = json.dumps({'revisao': revisao, 'resultado': itens}, sort_keys=True, separators=(',', ':'))
+    return f'id: {revisao}\nevent: resultado\ndata: {dados}\n\n'
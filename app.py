@@ -1,130 +1,336 @@
-import re 
+import json
+import os
+import threading
+from collections import OrderedDict
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, abort, request, jsonify
 from flask_cors import CORS
-from analisador import analisar_codigo 
-from sintatico import Parser          
+import analise
+import analisador
+import arvore
+import diagnosticos
+import fluxo_tokens
+import formatos
+import limites
+import metricas
+import semantico
+import simbolos
+import sintatico
+from analise import analisar_programa, itens_em_fluxo, montar_colunar, montar_saida
+from ao_vivo import DocumentoDesconhecido, SessaoAoVivo, evento_sse
+from cache_resultados import CacheResultados, versao_dos_modulos
+from formatos import JSON, NDJSON, comprimir, escolher_codificacao, escolher_formato, ndjson, serializar_colunar
+from lexer_incremental import DocumentoGrandeDemais, DocumentoIncremental
+from limites import LIMITES, Orcamento
+from lote import analisar_lote, normalizar_workers
+from paginas import TABELA_TOKENS, ArquivosEstaticos, Paginas
 
-app = Flask(__name__)
+# Os estáticos são servidos por arquivo_estatico (com cache e versão na URL), não pelo Flask
+app = Flask(__name__, static_folder=None)
 CORS(app)
 
+# Páginas renderizadas uma vez e arquivos de static/ lidos na inicialização (veja paginas.py)
+paginas = Paginas({'tabela_tokens.html': {'tokens': TABELA_TOKENS}})
+arquivos_estaticos = ArquivosEstaticos(os.path.join(app.root_path, 'static'))
+
+# Cache das respostas de /analisar (bytes JSON), pela versão do analisador + hash do código
+cache_resultados = CacheResultados(
+    versao_dos_modulos(analisador, diagnosticos, fluxo_tokens, sintatico, arvore, semantico, simbolos, analise, limites, formatos),
+    max_itens=int(os.environ.get('BIRL_CACHE_ITENS', 1024)),
+    max_bytes=int(float(os.environ.get('BIRL_CACHE_MB', 64)) * 1024 * 1024),
+)
+
 # Rota para a página HOME
 @app.route('/')
 def home():
     print("Servindo index.html (Página Home)...")
-    return render_template('index.html')
+    return paginas.responder('index.html', request)
 
 # Rota para a página do Analisador
 @app.route('/analisador')
 def page_analisador():
     print("Servindo analisador.html (Página do Analisador)...")
-    return render_template('analisador.html')
+    return paginas.responder('analisador.html', request)
 
 # Rota para a página da Tabela de Tokens
 @app.route('/tabela-tokens')
 def page_tabela_tokens():
     print("Servindo tabela_tokens.html (Página da Tabela de Tokens)...")
-    return render_template('tabela_tokens.html')
+    return paginas.responder('tabela_tokens.html', request)
+
+@app.route('/static/<path:filename>', endpoint='static')
+def arquivo_estatico(filename):
+    resposta = arquivos_estaticos.responder(filename, request)
+    if resposta is None:
+        abort(404)
+    return resposta
+
+@app.url_defaults
+def versao_dos_estaticos(endpoint, valores):
+    # url_for('static', ...) leva a versão do arquivo: a URL muda quando o arquivo muda
+    if endpoint == 'static' and 'filename' in valores:
+        versao = arquivos_estaticos.versoes.get(valores['filename'])
+        if versao is not None:
+            valores.setdefault('v', versao)
+
+def _resposta_comprimida(corpo, mimetype, cronometro=metricas.NULO):
+    # Comprime corpos grandes conforme o Accept-Encoding; o formato depende do Accept
+    resposta = Response(corpo, mimetype=mimetype)
+    codificacao = escolher_codificacao(request.accept_encodings, len(corpo))
+    if codificacao:
+        with cronometro.fase('compressao'):
+            resposta.set_data(comprimir(corpo, codificacao))
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.vary.update(('Accept', 'Accept-Encoding'))
+    return resposta
+
+def _com_metricas(rota, resposta, cronometro):
+    # Server-Timing na resposta e tempos nos histogramas de /metrics (nada, com as métricas desligadas)
+    if cronometro.ativo:
+        total = cronometro.total()
+        resposta.headers['Server-Timing'] = cronometro.server_timing(total)
+        metricas.registrar(rota, cronometro, request.content_length or 0, total)
+    return resposta
 
 @app.route('/analisar', methods=['POST'])
 def analisar():
+    """
+    O formato da resposta segue o Accept (veja formatos.py): a lista de objetos de sempre por
+    padrão, ou colunas em JSON/MessagePack. Corpos grandes saem comprimidos se o cliente aceitar.
+    Com 'Accept: application/x-ndjson' a resposta sai em fluxo, um item por linha, enquanto o
+    léxico e o sintático rodam (sem cache nem compressão).
+
+    Com BIRL_METRICAS=1 a resposta traz o tempo de cada fase no cabeçalho Server-Timing (menos
+    em fluxo, em que as fases terminam depois dos cabeçalhos).
+    """
+    cronometro = metricas.novo_cronometro()
     data = request.get_json()
     codigo = data.get('codigo', '')
-    
-    # 1. Chama a função de análise LÉXICA
-    resultado_lexico = analisar_codigo(codigo)
-    
-    tokens_lexico = resultado_lexico['tokens']
-    erros_estrutura_brutos = resultado_lexico['erros_estrutura'] 
-
-    # NOVO: Lista de tipos de erro léxicos que o analisador sintático não deve tentar processar.
-    # Adicionamos 'STRING_MUITO_LONGA_ERRO' aqui.
-    lexical_error_types_to_skip_in_parser = [
-        'SKIP', 'NEWLINE', 'COMENTARIO', 'ERRO LÉXICO', 
-        'ERRO LÉXICO - ASPAS NÃO_FECHADAS', # Assegurar nome correto
-        'ERRO LÉXICO - CARACTERE_INVÁLIDO', # Assegurar nome correto
-        'NUM_EXCESSIVO_ERRO', 
-        'STRING_MUITO_LONGA_ERRO' 
-    ]
-
-    tokens_para_sintatico = [
-        [t[0], t[1], t[2]] for t in tokens_lexico 
-        if t[2] not in lexical_error_types_to_skip_in_parser
-    ]
-
-    raw_erros_sintaticos = [] 
-    
-    if not erros_estrutura_brutos: 
-        parser = Parser(tokens_para_sintatico)
-        raw_erros_sintaticos = parser.parse() 
-
-    final_output_structured = []
-
-    # Adiciona erros LÉXICOS/ESTRUTURAIS/INICIALIZAÇÃO/PALAVRA-CHAVE
-    for erro_msg in erros_estrutura_brutos:
-        linha = 0
-        coluna = 0
-        match_line_col = re.search(r'linha (\d+), coluna (\d+)', erro_msg)
-        if match_line_col:
-            linha = int(match_line_col.group(1))
-            coluna = int(match_line_col.group(2))
-        
-        display_type = 'ERRO DE ESTRUTURA/LÉXICO' 
-
-        # NOVO: Lógica de reclassificação de erros para 'ERRO SINTÁTICO'
-        # Adiciona 'String excede o limite' para ser reclassificado
-        if "Aspas não fechadas" in erro_msg or \
-           "Caractere inválido" in erro_msg or \
-           "Erro de Balanceamento" in erro_msg or \
-           "Erro de Inicialização" in erro_msg or \
-           "Erro de Palavra-Chave" in erro_msg or \
-           "Número excede o limite" in erro_msg or \
-           "String excede o limite" in erro_msg: # Adicionado aqui para reclassificação
-             display_type = 'ERRO SINTÁTICO' 
-        elif "O programa deve começar com" in erro_msg or \
-             "O programa deve terminar com" in erro_msg or \
-             "Tokens extras após 'BIRL!'" in erro_msg:
-             display_type = 'ERRO SINTÁTICO' 
-
-        final_output_structured.append({
-            'linha': linha,
-            'coluna': coluna,
-            'lexema_ou_mensagem': erro_msg,
-            'tipo': display_type, 
-            'categoria': 'erro'
-        })
-    
-    # Adiciona erros SINTÁTICOS (do Parser)
-    if raw_erros_sintaticos:
-        for linha_erro, msg_erro_sintatico in raw_erros_sintaticos:
-            final_output_structured.append({
-                'linha': linha_erro,
-                'coluna': 0, 
-                'lexema_ou_mensagem': f"Erro Sintático: {msg_erro_sintatico}",
-                'tipo': 'ERRO SINTÁTICO',
-                'categoria': 'erro'
-            }) 
-    elif not erros_estrutura_brutos: 
-        final_output_structured.append({
-            'linha': 0, 
-            'coluna': 0,
-            'lexema_ou_mensagem': "Análise Sintática: NENHUM ERRO SINTÁTICO DETECTADO.",
-            'tipo': 'SUCESSO SINTÁTICO',
-            'categoria': 'sucesso'
-        }) 
-
-    # Adiciona os tokens LÉXICOS originais
-    for token_info in tokens_lexico:
-        linha, lexema, tipo, coluna = token_info 
-        final_output_structured.append({
-            'linha': linha,
-            'coluna': coluna,
-            'lexema_ou_mensagem': lexema,
-            'tipo': tipo,
-            'categoria': 'token' 
-        }) 
-
-    return jsonify(final_output_structured)
+    if not isinstance(codigo, str):
+        return jsonify({'erro': "Campo 'codigo' deve ser uma string."}), 400
+    formato = escolher_formato(request.accept_mimetypes)
+
+    if formato == NDJSON:
+        orcamento = Orcamento(LIMITES)
+        resposta = Response(ndjson(itens_em_fluxo(codigo, orcamento), orcamento), mimetype=NDJSON)
+        resposta.vary.add('Accept')
+        return resposta
+
+    # Código já analisado por esta versão: devolve os mesmos bytes, sem recalcular
+    chave = cache_resultados.chave(codigo, '' if formato == JSON else formato)
+    corpo = cache_resultados.obter(chave)
+    if corpo is None:
+        if formato == JSON:
+            resultado = analisar_programa(codigo, LIMITES, cronometro=cronometro)
+            with cronometro.fase('serializacao'):
+                corpo = jsonify(resultado).get_data()
+            limite = resultado[0].get('limite') if resultado else None
+        else:
+            colunas = analisar_programa(codigo, LIMITES, montar=montar_colunar, cronometro=cronometro)
+            with cronometro.fase('serializacao'):
+                corpo = serializar_colunar(colunas, formato)
+            limite = colunas.get('limite')
+        # Um resultado cortado pelo tempo depende da carga do momento: não vai para o cache
+        if limite != 'segundos':
+            cache_resultados.guardar(chave, corpo)
+
+    resposta = _resposta_comprimida(corpo, app.json.mimetype if formato == JSON else formato, cronometro)
+    return _com_metricas('/analisar', resposta, cronometro)
+
+# Contadores do cache de resultados
+@app.route('/analisar/cache', methods=['GET'])
+def estatisticas_cache():
+    return jsonify(cache_resultados.estatisticas())
+
+# Métricas no formato do Prometheus (só com BIRL_METRICAS=1)
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    if not metricas.ATIVO:
+        return jsonify({'erro': 'Métricas desligadas (BIRL_METRICAS=1 liga).'}), 404
+    cache = cache_resultados.estatisticas()
+    extras = []
+    for nome, ajuda, tipo, valor in (
+        ('birl_cache_acertos_total', 'Consultas respondidas pelo cache de resultados.', 'counter', cache['acertos']),
+        ('birl_cache_falhas_total', 'Consultas não respondidas pelo cache de resultados.', 'counter', cache['falhas']),
+        ('birl_cache_bytes', 'Bytes guardados no cache de resultados.', 'gauge', cache['bytes']),
+    ):
+        extras += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}', f'{nome} {valor}']
+    return Response(metricas.texto_prometheus(extras), mimetype='text/plain; version=0.0.4')
+
+# Análise de vários programas de uma vez (ex.: uma turma inteira), em processos paralelos
+MAX_PROGRAMAS_LOTE = int(os.environ.get('BIRL_LOTE_MAX', 1000))
+
+@app.route('/analisar/lote', methods=['POST'])
+def analisar_em_lote():
+    """
+    Corpo JSON: {"programas": [{"nome": ..., "codigo": ...}, ...], "workers": n (opcional)}.
+    Resposta: {"resultados": [{"nome": ..., "resultado": [itens de /analisar]}, ...]},
+    na ordem da entrada.
+    """
+    data = request.get_json()
+    programas = data.get('programas')
+    if not isinstance(programas, list) or not all(
+            isinstance(programa, dict) and isinstance(programa.get('codigo', ''), str) for programa in programas):
+        return jsonify({'erro': "Campo 'programas' deve ser uma lista de objetos {nome, codigo}."}), 400
+    if len(programas) > MAX_PROGRAMAS_LOTE:
+        return jsonify({'erro': f'No máximo {MAX_PROGRAMAS_LOTE} programas por lote.'}), 413
+    try:
+        workers = normalizar_workers(data.get('workers'))
+    except (TypeError, ValueError):
+        return jsonify({'erro': "Campo 'workers' deve ser um inteiro."}), 400
+
+    resultados = analisar_lote([programa.get('codigo', '') for programa in programas], workers)
+
+    # Os resultados já vêm serializados dos processos; aqui só são encaixados na resposta
+    itens = (
+        f'{{"nome":{json.dumps(programa.get("nome"))},"resultado":{resultado}}}'
+        for programa, resultado in zip(programas, resultados)
+    )
+    return Response('{"resultados":[' + ','.join(itens) + ']}\n', mimetype=app.json.mimetype)
+
+# Documentos do editor ao vivo, re-analisados por linhas a cada edição (os menos usados saem primeiro),
+# cada um com o seu lock: _documentos_lock só protege o dicionário
+MAX_DOCUMENTOS_INCREMENTAIS = 256
+_documentos_incrementais = OrderedDict() # id -> (DocumentoIncremental, threading.Lock)
+_documentos_lock = threading.Lock()
+
+@app.route('/analisar/incremental', methods=['POST'])
+def analisar_incremental():
+    """
+    Análise para o editor ao vivo. Corpo JSON:
+        {"documento": id, "codigo": texto}  -> (re)abre o documento com o texto completo;
+        {"documento": id, "edicao": {"linha_inicio": i, "linha_fim": f, "texto": t}}
+            -> substitui as linhas i..f (1-based, inclusivas; f = i - 1 insere; t null remove).
+    A resposta é a mesma de /analisar para o texto resultante. Se o documento não é conhecido
+    (nunca aberto ou descartado), responde 409 e o cliente deve reenviar o código completo.
+
+    Só o léxico é incremental: a cada edição os tokens do documento inteiro são remontados
+    (DocumentoIncremental.fluxo, sem passar o léxico de novo) e o sintático, o semântico e a
+    serialização rodam sobre o documento inteiro. O custo de uma edição ainda cresce com o
+    tamanho do documento.
+    """
+    data = request.get_json()
+    id_documento = data.get('documento')
+    if not id_documento:
+        return jsonify({'erro': "Campo 'documento' obrigatório."}), 400
+
+    if LIMITES.caracteres is not None and len(data.get('codigo') or '') > LIMITES.caracteres:
+        return jsonify({'erro': f'Código maior que o limite de {LIMITES.caracteres} caracteres.'}), 413
+
+    cronometro = metricas.novo_cronometro()
+    # Os mesmos limites de /analisar; o prazo já conta o léxico da edição
+    orcamento = Orcamento(LIMITES)
+    edicao = None
+    if 'codigo' in data:
+        # Analisado antes de entrar no dicionário: um documento grande não segura os outros editores
+        # (e sob o prazo da requisição)
+        with cronometro.fase('lexico'):
+            documento = DocumentoIncremental(data.get('codigo') or '', orcamento)
+        trava = threading.Lock()
+        with _documentos_lock:
+            if orcamento.estourado is not None:
+                # Cortado pelo prazo: não é o texto do cliente, então não fica guardado (a próxima
+                # edição recebe 409 e o cliente reenvia o código completo)
+                _documentos_incrementais.pop(id_documento, None)
+            else:
+                _documentos_incrementais[id_documento] = (documento, trava)
+                _documentos_incrementais.move_to_end(id_documento)
+                if len(_documentos_incrementais) > MAX_DOCUMENTOS_INCREMENTAIS:
+                    _documentos_incrementais.popitem(last=False)
+    else:
+        with _documentos_lock:
+            entrada = _documentos_incrementais.get(id_documento)
+            if entrada is None:
+                return jsonify({'erro': 'Documento desconhecido; envie o código completo.'}), 409
+            _documentos_incrementais.move_to_end(id_documento)
+        documento, trava = entrada
+        edicao = data.get('edicao') or {}
+
+    with trava:
+        with cronometro.fase('lexico'):
+            if edicao is not None:
+                try:
+                    documento.editar(int(edicao['linha_inicio']), int(edicao['linha_fim']), edicao.get('texto'),
+                                     max_caracteres=LIMITES.caracteres)
+                except DocumentoGrandeDemais as e:
+                    return jsonify({'erro': str(e)}), 413
+                except (KeyError, TypeError, ValueError) as e:
+                    return jsonify({'erro': f'Edição inválida: {e}'}), 400
+            resultado_lexico = documento.fluxo(orcamento)
+    cronometro.registrar_tokens(len(resultado_lexico['tokens']))
+
+    resultado = montar_saida(resultado_lexico, orcamento, cronometro)
+    with cronometro.fase('serializacao'):
+        resposta = jsonify(resultado)
+    return _com_metricas('/analisar/incremental', resposta, cronometro)
+
+# Sessões da análise ao vivo (veja ao_vivo.py), uma por aba do editor (as menos usadas saem primeiro)
+MAX_SESSOES_AO_VIVO = 256
+_sessoes_ao_vivo = OrderedDict()
+_sessoes_lock = threading.Lock()
+
+def _sessao_ao_vivo(id_sessao):
+    with _sessoes_lock:
+        sessao = _sessoes_ao_vivo.get(id_sessao)
+        if sessao is None:
+            sessao = _sessoes_ao_vivo[id_sessao] = SessaoAoVivo()
+            if len(_sessoes_ao_vivo) > MAX_SESSOES_AO_VIVO:
+                # O fluxo aberto da sessão descartada termina; o navegador reconecta e cai em uma nova
+                _sessoes_ao_vivo.popitem(last=False)[1].encerrar()
+        _sessoes_ao_vivo.move_to_end(id_sessao)
+        return sessao
+
+@app.route('/analisar/ao-vivo', methods=['POST'])
+def enviar_revisao_ao_vivo():
+    """
+    Nova revisão do código de uma sessão ao vivo, com n crescente a cada alteração. Corpo JSON:
+        {"sessao": id, "revisao": n, "codigo": texto}  -> o código completo;
+        {"sessao": id, "revisao": n, "edicao": {"linha_inicio": i, "linha_fim": f, "texto": t}}
+            -> só as linhas alteradas desde a revisão anterior, como em /analisar/incremental.
+    Responde 202 na hora; o resultado sai no fluxo de GET /analisar/ao-vivo/<sessao>. Se a
+    sessão não tem o documento (nova ou descartada), uma edição recebe 409 e o cliente deve
+    reenviar a revisão com o código completo; com "aceita": false (revisão velha), a próxima
+    também deve levar o código completo.
+    """
+    data = request.get_json()
+    id_sessao = data.get('sessao')
+    if not id_sessao:
+        return jsonify({'erro': "Campo 'sessao' obrigatório."}), 400
+    try:
+        revisao = int(data['revisao'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'erro': "Campo 'revisao' deve ser um número inteiro."}), 400
+
+    try:
+        if 'codigo' in data:
+            aceita = _sessao_ao_vivo(id_sessao).enviar(revisao, codigo=data.get('codigo') or '')
+        else:
+            edicao = data.get('edicao') or {}
+            edicao = (int(edicao['linha_inicio']), int(edicao['linha_fim']), edicao.get('texto'))
+            aceita = _sessao_ao_vivo(id_sessao).enviar(revisao, edicao=edicao)
+    except DocumentoDesconhecido:
+        return jsonify({'erro': 'Documento desconhecido; envie o código completo.'}), 409
+    except DocumentoGrandeDemais as e:
+        return jsonify({'erro': str(e)}), 413
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Edição inválida: {e}'}), 400
+    return jsonify({'revisao': revisao, 'aceita': aceita}), 202
+
+@app.route('/analisar/ao-vivo/<id_sessao>', methods=['GET'])
+def fluxo_ao_vivo(id_sessao):
+    """
+    Fluxo SSE da sessão: um evento 'resultado' ({"revisao": n, "resultado": [itens de /analisar]})
+    por revisão analisada. Um fluxo novo da mesma sessão encerra o anterior.
+    """
+    sessao = _sessao_ao_vivo(id_sessao)
+
+    def eventos():
+        yield 'retry: 1000\n\n'
+        for resultado in sessao.resultados():
+            yield ': ping\n\n' if resultado is None else evento_sse(*resultado)
+
+    return Response(eventos(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
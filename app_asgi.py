@@ -0,0 +1,375 @@
+"""
+Modo de servidor assíncrono (ASGI) do analisador, com as mesmas rotas de app.py.
+
+Uso: uvicorn app_asgi:aplicacao   (ou hypercorn app_asgi:aplicacao; ou python app_asgi.py)
+
+No servidor de desenvolvimento do Flask uma análise lenta segura os outros clientes e não há
+controle de admissão. Aqui:
+  - POST /analisar (formato JSON padrão) é atendido direto: a análise roda no pool de processos
+    de lote.py (limitado a BIRL_ASGI_WORKERS processos), fora do laço de eventos;
+  - no máximo BIRL_ASGI_MAX_EM_ANDAMENTO análises (POST em /analisar...) ficam em andamento ao
+    mesmo tempo; acima disso a resposta é 429 com Retry-After;
+  - se o cliente desconecta antes do resultado, a análise que ainda está na fila do pool é
+    cancelada (a que já começou termina dentro do limite de tempo de limites.py e é descartada);
+  - as demais rotas (páginas, /static, os outros formatos e rotas de /analisar) são repassadas
+    ao app Flask de app.py, rodando em threads. O corpo da resposta passa por uma fila curta
+    (a thread espera o cliente receber), e se o cliente desconecta a thread para no próximo
+    pedaço da resposta.
+
+O fluxo da análise ao vivo (GET /analisar/ao-vivo/<sessao>, veja ao_vivo.py) é atendido direto:
+enquanto está aberto ele ocupa uma thread de um pool só dele (é nela que as revisões da sessão
+são analisadas), com no máximo BIRL_ASGI_MAX_AO_VIVO fluxos abertos (acima disso, 429); assim os
+editores abertos não tomam as threads das rotas repassadas. Quando o cliente desconecta, o
+fluxo é fechado e a análise em andamento nele é cancelada.
+
+Com BIRL_METRICAS=1, o /analisar atendido direto entra nas métricas de /metrics só com o tempo
+total (as fases rodam no processo do pool); as rotas repassadas medem as fases como no Flask.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from werkzeug.datastructures import Accept, MIMEAccept
+from werkzeug.http import parse_accept_header
+
+import app as app_flask
+import metricas
+from ao_vivo import evento_sse
+from formatos import JSON, comprimir, escolher_codificacao, escolher_formato
+from lote import normalizar_workers, pool, resultado_json
+
+WORKERS = normalizar_workers(os.environ.get('BIRL_ASGI_WORKERS') or None)
+MAX_EM_ANDAMENTO = int(os.environ.get('BIRL_ASGI_MAX_EM_ANDAMENTO', WORKERS * 2))
+RETRY_AFTER = int(os.environ.get('BIRL_ASGI_RETRY_AFTER', 1)) # Segundos sugeridos no 429
+MAX_CORPO = int(float(os.environ.get('BIRL_ASGI_MAX_CORPO_MB', 16)) * 1024 * 1024)
+
+# Pedaços da resposta repassada que esperam o envio ao cliente; com a fila cheia, a thread do
+# Flask espera (um cliente lento não faz a resposta inteira ficar na memória)
+MAX_PEDACOS_NA_FILA = 8
+
+# Threads que rodam o app Flask para as rotas repassadas
+_threads_wsgi = ThreadPoolExecutor(max_workers=int(os.environ.get('BIRL_ASGI_THREADS', 8)), thread_name_prefix='birl-wsgi')
+
+# Fluxos da análise ao vivo abertos ao mesmo tempo, cada um com a sua thread
+MAX_FLUXOS_AO_VIVO = int(os.environ.get('BIRL_ASGI_MAX_AO_VIVO', 32))
+_threads_ao_vivo = ThreadPoolExecutor(max_workers=MAX_FLUXOS_AO_VIVO, thread_name_prefix='birl-ao-vivo')
+
+_em_andamento = 0 # Análises admitidas e ainda não respondidas (só mexido no laço de eventos)
+_fluxos_abertos = 0 # Fluxos ao vivo abertos (só mexido no laço de eventos)
+
+_FIM = object()
+
+
+class _Desconectado(Exception):
+    """O cliente fechou a conexão antes da resposta."""
+
+
+async def _ler_corpo(receive):
+    # Corpo inteiro da requisição; None se passar de MAX_CORPO
+    partes = []
+    tamanho = 0
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'http.disconnect':
+            raise _Desconectado()
+        parte = mensagem.get('body', b'')
+        tamanho += len(parte)
+        if tamanho > MAX_CORPO:
+            return None
+        partes.append(parte)
+        if not mensagem.get('more_body'):
+            return b''.join(partes)
+
+
+async def _esperar_desconexao(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _responder(send, status, corpo, cabecalhos=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-length', str(len(corpo)).encode('ascii'))] + [
+            (nome.lower().encode('latin-1'), valor.encode('latin-1')) for nome, valor in cabecalhos
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': corpo})
+
+
+def _cabecalho(scope, nome):
+    # Valores de um cabeçalho da requisição juntados por vírgula ('' se ausente)
+    return ','.join(valor.decode('latin-1') for chave, valor in scope['headers'] if chave == nome)
+
+
+async def _analisar(scope, receive, send):
+    # POST /analisar no formato padrão, com a análise no pool de processos
+    cronometro = metricas.novo_cronometro()
+    corpo = await _ler_corpo(receive)
+    if corpo is None:
+        await _responder(send, 413, b'{"erro":"Corpo da requisi\\u00e7\\u00e3o grande demais."}\n',
+                         [('Content-Type', 'application/json')])
+        return
+    try:
+        codigo = json.loads(corpo).get('codigo', '')
+    except (ValueError, AttributeError):
+        await _responder(send, 400, b'{"erro":"JSON inv\\u00e1lido."}\n', [('Content-Type', 'application/json')])
+        return
+    if not isinstance(codigo, str):
+        await _responder(send, 400, b'{"erro":"Campo \'codigo\' deve ser uma string."}\n', [('Content-Type', 'application/json')])
+        return
+
+    cache = app_flask.cache_resultados
+    chave = cache.chave(codigo)
+    resultado = cache.obter(chave)
+    if resultado is None:
+        futuro = asyncio.get_running_loop().run_in_executor(pool(WORKERS), resultado_json, codigo)
+        desconexao = asyncio.ensure_future(_esperar_desconexao(receive))
+        await asyncio.wait((futuro, desconexao), return_when=asyncio.FIRST_COMPLETED)
+        if not futuro.done():
+            futuro.cancel() # Sai da fila do pool se ainda não começou
+            raise _Desconectado()
+        desconexao.cancel()
+        resultado = (futuro.result() + '\n').encode('ascii') # Mesmos bytes do jsonify de app.py
+        if not _truncado_por_tempo(resultado):
+            cache.guardar(chave, resultado)
+
+    cabecalhos = [('Content-Type', 'application/json'), ('Vary', 'Accept, Accept-Encoding'), ('Access-Control-Allow-Origin', '*')]
+    codificacao = escolher_codificacao(parse_accept_header(_cabecalho(scope, b'accept-encoding'), Accept), len(resultado))
+    if codificacao:
+        with cronometro.fase('compressao'):
+            resultado = comprimir(resultado, codificacao)
+        cabecalhos.append(('Content-Encoding', codificacao))
+    if cronometro.ativo:
+        total = cronometro.total()
+        cabecalhos.append(('Server-Timing', cronometro.server_timing(total)))
+        metricas.registrar('/analisar', cronometro, len(corpo), total)
+    await _responder(send, 200, resultado, cabecalhos)
+
+
+def _truncado_por_tempo(resultado):
+    # O aviso de análise truncada é o primeiro item (chaves em ordem alfabética, veja analise.montar_saida)
+    inicio = resultado[:400]
+    return inicio.startswith(b'[{"categoria":"aviso"') and b'"limite":"segundos"' in inicio
+
+
+def _ambiente_wsgi(scope, corpo):
+    servidor = scope.get('server') or ('localhost', 80)
+    ambiente = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # O PATH_INFO do WSGI é o caminho em bytes lidos como latin-1
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': servidor[0],
+        'SERVER_PORT': str(servidor[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(corpo),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(corpo)),
+    }
+    for nome, valor in scope['headers']:
+        nome = nome.decode('latin-1').upper().replace('-', '_')
+        valor = valor.decode('latin-1')
+        if nome == 'CONTENT_TYPE':
+            ambiente['CONTENT_TYPE'] = valor
+        elif nome != 'CONTENT_LENGTH':
+            chave = 'HTTP_' + nome
+            ambiente[chave] = f'{ambiente[chave]},{valor}' if chave in ambiente else valor
+    return ambiente
+
+
+async def _drenar(fila):
+    # Descarta o que a thread do Flask ainda puser na fila, até ela terminar
+    while (await fila.get())[0] not in ('fim', 'erro'):
+        pass
+
+
+async def _repassar_ao_flask(scope, receive, send):
+    # Roda o app Flask (WSGI) em uma thread, enviando o corpo da resposta à medida que sai. Se o
+    # cliente desconecta, a thread para no próximo pedaço (e a resposta do Flask é fechada)
+    corpo = await _ler_corpo(receive)
+    if corpo is None:
+        await _responder(send, 413, b'{"erro":"Corpo da requisi\\u00e7\\u00e3o grande demais."}\n',
+                         [('Content-Type', 'application/json')])
+        return
+    laco = asyncio.get_running_loop()
+    fila = asyncio.Queue(maxsize=MAX_PEDACOS_NA_FILA)
+    desconectado = threading.Event()
+
+    def rodar():
+        inicio = {}
+
+        def start_response(status, cabecalhos, exc_info=None):
+            inicio['status'] = int(status.split(' ', 1)[0])
+            inicio['cabecalhos'] = cabecalhos
+
+        def colocar(item, final=False):
+            # Espera enquanto a fila está cheia
+            if desconectado.is_set() and not final:
+                raise _Desconectado()
+            asyncio.run_coroutine_threadsafe(fila.put(item), laco).result()
+
+        try:
+            resposta = app_flask.app(_ambiente_wsgi(scope, corpo), start_response)
+            try:
+                enviado_inicio = False
+                for pedaco in resposta:
+                    if not enviado_inicio:
+                        colocar(('inicio', inicio))
+                        enviado_inicio = True
+                    if pedaco:
+                        colocar(('corpo', pedaco))
+                if not enviado_inicio:
+                    colocar(('inicio', inicio))
+            finally:
+                if hasattr(resposta, 'close'):
+                    resposta.close()
+        except BaseException as e: # Repassado ao laço de eventos
+            colocar(('erro', e), final=True)
+        else:
+            colocar(('fim', None), final=True)
+
+    laco.run_in_executor(_threads_wsgi, rodar)
+    desconexao = asyncio.ensure_future(_esperar_desconexao(receive))
+    try:
+        while True:
+            proximo = asyncio.ensure_future(fila.get())
+            await asyncio.wait((proximo, desconexao), return_when=asyncio.FIRST_COMPLETED)
+            if not proximo.done():
+                proximo.cancel()
+                desconectado.set()
+                asyncio.ensure_future(_drenar(fila)) # Libera a thread, que pode estar esperando a fila
+                raise _Desconectado()
+            tipo, valor = proximo.result()
+            if tipo == 'inicio':
+                await send({
+                    'type': 'http.response.start',
+                    'status': valor['status'],
+                    'headers': [(nome.lower().encode('latin-1'), str(v).encode('latin-1')) for nome, v in valor['cabecalhos']],
+                })
+            elif tipo == 'corpo':
+                await send({'type': 'http.response.body', 'body': valor, 'more_body': True})
+            elif tipo == 'fim':
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            else:
+                raise valor
+    finally:
+        desconexao.cancel()
+
+
+async def _fluxo_ao_vivo(receive, send, id_sessao):
+    # GET /analisar/ao-vivo/<sessao>: o mesmo fluxo SSE da rota do Flask. Cada próximo resultado
+    # é esperado (e analisado) em uma thread de _threads_ao_vivo; se o cliente desconecta, o
+    # fluxo é fechado e a thread sai da espera (ou da análise, cancelada) logo em seguida
+    sessao = app_flask._sessao_ao_vivo(id_sessao)
+    leitor = sessao.abrir_fluxo()
+    resultados = sessao.resultados(leitor)
+    laco = asyncio.get_running_loop()
+    desconexao = asyncio.ensure_future(_esperar_desconexao(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream; charset=utf-8'), (b'cache-control', b'no-cache'),
+                        (b'x-accel-buffering', b'no'), (b'access-control-allow-origin', b'*')],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 1000\n\n', 'more_body': True})
+        while True:
+            proximo = laco.run_in_executor(_threads_ao_vivo, next, resultados, _FIM)
+            await asyncio.wait((proximo, desconexao), return_when=asyncio.FIRST_COMPLETED)
+            if not proximo.done():
+                raise _Desconectado() # O finally fecha o fluxo, e o next() na thread termina
+            resultado = proximo.result()
+            if resultado is _FIM:
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            evento = ': ping\n\n' if resultado is None else evento_sse(*resultado)
+            await send({'type': 'http.response.body', 'body': evento.encode('utf-8'), 'more_body': True})
+    finally:
+        desconexao.cancel()
+        sessao.fechar_fluxo(leitor)
+
+
+async def _ciclo_de_vida(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensagem['type'] == 'lifespan.shutdown':
+            _threads_wsgi.shutdown(wait=False)
+            _threads_ao_vivo.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def aplicacao(scope, receive, send):
+    """A aplicação ASGI."""
+    global _em_andamento, _fluxos_abertos
+    if scope['type'] == 'lifespan':
+        await _ciclo_de_vida(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    caminho = scope['path']
+    id_sessao = caminho[len('/analisar/ao-vivo/'):] if caminho.startswith('/analisar/ao-vivo/') else ''
+    if scope['method'] == 'GET' and id_sessao and '/' not in id_sessao:
+        if _fluxos_abertos >= MAX_FLUXOS_AO_VIVO:
+            await _responder(send, 429, b'{"erro":"Fluxos ao vivo demais abertos; tente de novo em instantes."}\n', [
+                ('Content-Type', 'application/json'), ('Retry-After', str(RETRY_AFTER)), ('Access-Control-Allow-Origin', '*'),
+            ])
+            return
+        _fluxos_abertos += 1
+        try:
+            await _fluxo_ao_vivo(receive, send, id_sessao)
+        except _Desconectado:
+            pass
+        finally:
+            _fluxos_abertos -= 1
+        return
+
+    e_analise = scope['method'] == 'POST' and (caminho == '/analisar' or caminho.startswith('/analisar/'))
+    if not e_analise:
+        try:
+            await _repassar_ao_flask(scope, receive, send)
+        except _Desconectado:
+            pass
+        return
+
+    # Controle de admissão: o contador só é mexido aqui, no laço de eventos (sem lock)
+    if _em_andamento >= MAX_EM_ANDAMENTO:
+        await _responder(send, 429, b'{"erro":"Servidor ocupado; tente de novo em instantes."}\n', [
+            ('Content-Type', 'application/json'), ('Retry-After', str(RETRY_AFTER)), ('Access-Control-Allow-Origin', '*'),
+        ])
+        return
+    _em_andamento += 1
+    try:
+        formato = escolher_formato(parse_accept_header(_cabecalho(scope, b'accept'), MIMEAccept))
+        if caminho == '/analisar' and formato == JSON:
+            await _analisar(scope, receive, send)
+        else:
+            await _repassar_ao_flask(scope, receive, send)
+    except _Desconectado:
+        pass # Ninguém para receber a resposta
+    finally:
+        _em_andamento -= 1
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("O modo ASGI precisa de um servidor ASGI: pip install uvicorn (ou hypercorn).")
+    uvicorn.run(aplicacao, host=os.environ.get('BIRL_HOST', '127.0.0.1'), port=int(os.environ.get('BIRL_PORTA', 8000)))
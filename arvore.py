@@ -0,0 +1,103 @@
+"""
+Árvore sintática (AST) de um programa BIRL!, guardada em uma arena compacta.
+
+Em vez de um objeto por nó, a Arvore guarda três arrays paralelos: o tipo de cada nó, o
+índice do token que o nó representa e o fim da subárvore. Os nós ficam em pré-ordem (cada nó
+vem antes dos seus descendentes), então os descendentes de um nó 'n' são os nós de n + 1 até
+fins[n] - 1: o primeiro filho é n + 1, e o filho seguinte a um filho 'f' é fins[f]. Percorrer
+a árvore inteira é percorrer os índices em ordem.
+
+A árvore é montada pelo sintatico.Parser enquanto ele analisa. Expressões não têm precedência
+na gramática: uma EXPRESSAO tem como filhos os termos e operadores na ordem do código, com uma
+EXPRESSAO aninhada para cada 'Coloca anilha ... Tira anilha'.
+"""
+from array import array
+
+# Tipos de nó. Entre parênteses, o token do nó e os filhos.
+TIPOS_NO = (
+    'PROGRAMA',            # (BORA) comandos
+    'DECLARACAO',          # (ID declarado) EXPRESSAO
+    'ATRIBUICAO',          # (ID) EXPRESSAO
+    'ATRIBUICAO_COMPOSTA', # (ID) EXPRESSAO
+    'IMPRESSAO',           # (GRITA) EXPRESSAO...
+    'CONDICIONAL',         # (CONFERE_AI) EXPRESSAO, comandos, SENAO_SE..., SENAO
+    'SENAO_SE',            # (CONFERE_MAIS) EXPRESSAO, comandos
+    'SENAO',               # (OU_NAO) comandos
+    'LOOP',                # (TREINA ATÉ) EXPRESSAO, comandos
+    'FUNCAO',              # (ID da função) PARAMETRO..., comandos
+    'PARAMETRO',           # (ID)
+    'CHAMADA',             # (ID da função) EXPRESSAO de cada argumento
+    'EXPRESSAO',           # (primeiro token) NOME, LITERAL, OPERADOR e EXPRESSAO entre parênteses
+    'NOME',                # (ID usado em uma expressão)
+    'LITERAL',             # (número, string ou booleano)
+    'OPERADOR',            # (operador)
+)
+# EXPRESSAO e as folhas de expressão ficam por último: semantico.py pula os tipos a partir de EXPRESSAO
+# (menos NOME) com uma comparação só
+(
+    PROGRAMA, DECLARACAO, ATRIBUICAO, ATRIBUICAO_COMPOSTA, IMPRESSAO, CONDICIONAL, SENAO_SE, SENAO,
+    LOOP, FUNCAO, PARAMETRO, CHAMADA, EXPRESSAO, NOME, LITERAL, OPERADOR,
+) = range(len(TIPOS_NO))
+
+
+class Arvore:
+    """
+    A AST de um programa.
+
+    Atributos:
+        tokens_fonte (fluxo_tokens.TokenStream): Os tokens de onde saem lexema, linha e coluna.
+        tipos (array 'B'): Tipo de cada nó (índice em TIPOS_NO).
+        tokens (array 'I'): Token de cada nó, como índice nos tokens vistos pelo Parser.
+        fins (array 'I'): Índice seguinte ao último nó da subárvore de cada nó.
+        posicoes (array 'I' | None): Índice em tokens_fonte de cada token visto pelo Parser
+                                     (None: os índices são os mesmos).
+    """
+    __slots__ = ('tokens_fonte', 'tipos', 'tokens', 'fins', 'posicoes')
+
+    def __init__(self, tokens_fonte, posicoes=None):
+        self.tokens_fonte = tokens_fonte
+        self.tipos = array('B')
+        self.tokens = array('I')
+        self.fins = array('I')
+        self.posicoes = posicoes
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def filhos(self, no):
+        """Índices dos filhos diretos do nó."""
+        filho, fim = no + 1, self.fins[no]
+        fins = self.fins
+        while filho < fim:
+            yield filho
+            filho = fins[filho]
+
+    def quantidade_filhos(self, no):
+        quantidade = 0
+        for _ in self.filhos(no):
+            quantidade += 1
+        return quantidade
+
+    def token(self, no):
+        """Índice em tokens_fonte do token do nó."""
+        indice = self.tokens[no]
+        return indice if self.posicoes is None else self.posicoes[indice]
+
+    def simbolo(self, no):
+        """Id do lexema do token do nó (veja fluxo_tokens.TokenStream.simbolo)."""
+        return self.tokens_fonte.simbolo(self.token(no))
+
+    def lexema(self, no):
+        return self.tokens_fonte.lexema(self.token(no))
+
+    def linha(self, no):
+        return self.tokens_fonte.linha(self.token(no))
+
+    def coluna(self, no):
+        return self.tokens_fonte.coluna(self.token(no))
+
+    def como_lista(self, no=0):
+        """A subárvore do nó como [tipo, lexema, filhos...] (para depuração e testes manuais)."""
+        if not len(self):
+            return None
+        return [TIPOS_NO[self.tipos[no]], self.lexema(no)] + [self.como_lista(filho) for filho in self.filhos(no)]
@@ -0,0 +1 @@
+"""Benchmarks do analisador BIRL! (rodar a partir da raiz do projeto com 'python -m benchmarks.<nome>')."""
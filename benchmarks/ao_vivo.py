@@ -0,0 +1,84 @@
+"""
+Simula a digitação no editor ao vivo e conta as análises feitas, canceladas e entregues.
+
+Um programa gerado é "digitado" em rajadas: a cada tecla uma revisão nova (a edição da última
+linha, como o editor manda) vai para uma SessaoAoVivo, com uma pausa entre as rajadas. Para cada espera (debounce) pedida, mostra
+quantas análises começaram, quantas foram canceladas, quantos resultados chegaram e a latência
+entre a última tecla de uma rajada e o resultado dela. Sem a sessão, cada tecla seria uma
+análise completa.
+
+Uso: python -m benchmarks.ao_vivo [--comandos 2000] [--rajadas 10] [--teclas 20] [--espera-ms 0 150]
+"""
+import argparse
+import threading
+import time
+
+from analise import analisar_programa
+from ao_vivo import SessaoAoVivo
+from benchmarks.gerador import gerar_programa
+from limites import LIMITES
+
+
+def _simular(codigo, espera, rajadas, teclas, intervalo, pausa):
+    sessao = SessaoAoVivo(espera=espera)
+    recebidos = [] # (revisão, instante)
+
+    def ler():
+        for resultado in sessao.resultados(ping=60):
+            recebidos.append((resultado[0], time.perf_counter()))
+            if resultado[0] == revisao_final:
+                return
+
+    revisao_final = rajadas * teclas + 1
+    linhas = codigo.split('\n')
+    sessao.enviar(1, codigo=codigo)
+    leitor = threading.Thread(target=ler)
+    leitor.start()
+    ultimas = {} # Revisão da última tecla de cada rajada -> instante
+    revisao = 1
+    for _ in range(rajadas):
+        for _ in range(teclas):
+            revisao += 1
+            # Cada tecla acrescenta um espaço no fim da última linha
+            sessao.enviar(revisao, edicao=(len(linhas), len(linhas), linhas[-1] + ' ' * revisao))
+            enviada = time.perf_counter()
+            time.sleep(intervalo)
+        ultimas[revisao] = enviada
+        time.sleep(pausa)
+    leitor.join()
+    sessao.encerrar()
+
+    latencias = sorted(instante - ultimas[revisao] for revisao, instante in recebidos if revisao in ultimas)
+    return sessao, recebidos, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--comandos', type=int, default=2000)
+    parser.add_argument('--rajadas', type=int, default=10)
+    parser.add_argument('--teclas', type=int, default=20)
+    parser.add_argument('--intervalo-ms', type=float, default=60, help='tempo entre teclas de uma rajada')
+    parser.add_argument('--pausa-ms', type=float, default=800, help='pausa entre rajadas')
+    parser.add_argument('--espera-ms', type=float, nargs='+', default=[0, 150])
+    args = parser.parse_args()
+
+    codigo = gerar_programa(args.comandos, semente=0)
+    inicio = time.perf_counter()
+    analisar_programa(codigo, LIMITES)
+    completa = time.perf_counter() - inicio
+    teclas = args.rajadas * args.teclas
+    print(f"{len(codigo) / 1024:.0f} KB, análise completa {completa * 1000:.1f} ms; "
+          f"{teclas} teclas = {teclas * completa:.1f} s de análise sem a sessão ao vivo")
+
+    for espera_ms in args.espera_ms:
+        sessao, recebidos, latencias = _simular(
+            codigo, espera_ms / 1000, args.rajadas, args.teclas, args.intervalo_ms / 1000, args.pausa_ms / 1000)
+        mediana = f"{latencias[len(latencias) // 2] * 1000:.0f} ms" if latencias else '-'
+        print(
+            f"espera {espera_ms:>5.0f} ms: {sessao.analises} análises, {sessao.canceladas} canceladas, "
+            f"{len(recebidos)} resultados; latência mediana após a rajada {mediana}"
+        )
+
+
+if __name__ == '__main__':
+    main()
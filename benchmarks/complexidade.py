@@ -0,0 +1,145 @@
+"""
+Verifica que o tempo da análise cresce linearmente com o tamanho de entradas adversariais.
+
+Para cada família de entradas, mede o léxico (analisar_codigo) ou o sintático (Parser.parse,
+sobre os tokens já prontos) em tamanhos crescentes, ajusta o expoente k de
+tempo ~ tamanho^k (mínimos quadrados em escala log-log) e falha se k passar do limite.
+
+As famílias miram os pontos que poderiam ficar quadráticos: a busca à frente da verificação
+de MONSTRO (linha longa de identificadores), a alternativa de ASPAS_NAO_FECHADA (aspas que
+não fecham), a deduplicação de Parser.add_error (milhares de erros iguais) e a
+ressincronização da lista de comandos (tokens que não começam comando nenhum), além de linhas
+longas, aninhamento profundo e só caracteres não reconhecidos.
+
+Uso: python -m benchmarks.complexidade [--limite 1.3] [--repeticoes 3] [--filtro parser]
+"""
+import argparse
+import math
+import sys
+import time
+
+from analisador import analisar_codigo
+from benchmarks.sintatico import _tokens
+from sintatico import Parser
+
+
+def linha_de_ids_nao_declarados(n):
+    # Uma única linha com n identificadores nunca declarados com MONSTRO
+    return 'BORA\n' + ' '.join(f'v{i}' for i in range(n)) + ' x TASAINDODAJAULA 1\nBIRL!\n'
+
+
+def expressao_em_uma_linha(n):
+    # Uma única linha com uma expressão de n termos
+    return 'BORA\nMONSTRO x TASAINDODAJAULA 1' + ' + x' * n + '\nBIRL!\n'
+
+
+def aninhamento_profundo(n):
+    # n parênteses e n CONFERE_AI aninhados. Sem indentação, que os blocos não usam: com ela
+    # (como em benchmarks.sintatico.programa_aninhado) o código cresceria com n ao quadrado
+    parenteses = 'Coloca anilha ' * n + '1' + ' Tira anilha' * n
+    return f"BORA\nMONSTRO x TASAINDODAJAULA {parenteses}\n" + 'CONFERE_AI x > 1:\n' * n + 'GRITA Coloca anilha x Tira anilha\nBIRL!\n'
+
+
+def linhas_com_aspas_abertas(n):
+    # n linhas com uma aspa que não fecha
+    return 'BORA\n' + 'GRITA Coloca anilha "sem fechar Tira anilha\n' * n + 'BIRL!\n'
+
+
+def aspas_abertas_em_uma_linha(n):
+    # Uma única linha com n aspas: a última não fecha
+    return 'BORA\nGRITA Coloca anilha ' + '"a ' * n + 'Tira anilha\nBIRL!\n'
+
+
+def caracteres_nao_reconhecidos(n):
+    # n caracteres não reconhecidos em uma linha só (um erro por caractere)
+    return 'BORA\n' + '@' * n + '\nBIRL!\n'
+
+
+def erros_repetidos(n):
+    # O mesmo erro sintático em n linhas seguidas
+    return 'BORA\nMONSTRO x TASAINDODAJAULA 1\n' + 'x TASAINDODAJAULA 7 7\n' * n + 'BIRL!\n'
+
+
+def erros_repetidos_em_uma_linha(n):
+    # n repetições do mesmo erro na mesma linha (descartadas por Parser.add_error)
+    return 'BORA\nGRITA Coloca anilha 1 Tira anilha' + ' 7' * n + '\nBIRL!\n'
+
+
+def comandos_invalidos(n):
+    # n tokens que não começam comando: a lista de comandos ressincroniza a cada um
+    return 'BORA\n' + ': 7 , ' * (n // 3) + '\nBIRL!\n'
+
+
+def _sintatico(gerar):
+    # Gerador de entrada do Parser: os tokens do programa, já filtrados como no app
+    return lambda n: _tokens(gerar(n))
+
+
+def _parse(tokens):
+    return Parser(tokens).parse()
+
+
+# nome -> (gerador de entrada, função analisada, tamanhos)
+FAMILIAS = {
+    'ids_nao_declarados_em_uma_linha': (linha_de_ids_nao_declarados, analisar_codigo, [2000, 4000, 8000, 16000, 32000]),
+    'expressao_em_uma_linha': (expressao_em_uma_linha, analisar_codigo, [2000, 4000, 8000, 16000, 32000]),
+    'aninhamento_profundo': (aninhamento_profundo, analisar_codigo, [500, 1000, 2000, 4000, 8000]),
+    'linhas_com_aspas_abertas': (linhas_com_aspas_abertas, analisar_codigo, [1000, 2000, 4000, 8000, 16000]),
+    'aspas_abertas_em_uma_linha': (aspas_abertas_em_uma_linha, analisar_codigo, [2000, 4000, 8000, 16000, 32000]),
+    'caracteres_nao_reconhecidos': (caracteres_nao_reconhecidos, analisar_codigo, [2000, 4000, 8000, 16000, 32000]),
+    'erros_repetidos': (erros_repetidos, analisar_codigo, [1000, 2000, 4000, 8000, 16000]),
+    'parser_expressao_em_uma_linha': (_sintatico(expressao_em_uma_linha), _parse, [2000, 4000, 8000, 16000, 32000]),
+    'parser_aninhamento_profundo': (_sintatico(aninhamento_profundo), _parse, [500, 1000, 2000, 4000, 8000]),
+    'parser_linhas_com_aspas_abertas': (_sintatico(linhas_com_aspas_abertas), _parse, [1000, 2000, 4000, 8000, 16000]),
+    'parser_erros_repetidos': (_sintatico(erros_repetidos), _parse, [1000, 2000, 4000, 8000, 16000]),
+    'parser_erros_repetidos_em_uma_linha': (_sintatico(erros_repetidos_em_uma_linha), _parse, [2000, 4000, 8000, 16000, 32000]),
+    'parser_comandos_invalidos': (_sintatico(comandos_invalidos), _parse, [2000, 4000, 8000, 16000, 32000]),
+}
+
+
+def _medir(funcao, entrada, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(entrada)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def expoente_de_crescimento(tamanhos, tempos):
+    """Inclinação da reta de mínimos quadrados de log(tempo) contra log(tamanho)."""
+    xs = [math.log(t) for t in tamanhos]
+    ys = [math.log(max(t, 1e-9)) for t in tempos]
+    media_x = sum(xs) / len(xs)
+    media_y = sum(ys) / len(ys)
+    numerador = sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys))
+    denominador = sum((x - media_x) ** 2 for x in xs)
+    return numerador / denominador
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--limite', type=float, default=1.3, help='Expoente máximo aceito (1.0 = linear).')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--filtro', default='', help='Só as famílias com esse trecho no nome.')
+    args = parser.parse_args()
+
+    falhas = []
+    for nome, (gerar, funcao, tamanhos) in FAMILIAS.items():
+        if args.filtro not in nome:
+            continue
+        tempos = [_medir(funcao, gerar(n), args.repeticoes) for n in tamanhos]
+        k = expoente_de_crescimento(tamanhos, tempos)
+        detalhes = ', '.join(f'{n}: {t * 1000:.1f} ms' for n, t in zip(tamanhos, tempos))
+        situacao = 'OK' if k <= args.limite else 'FALHOU'
+        print(f"[{situacao}] {nome}: expoente {k:.2f} ({detalhes})")
+        if k > args.limite:
+            falhas.append(nome)
+
+    if falhas:
+        print(f"Crescimento acima de n^{args.limite}: {', '.join(falhas)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Gerador de programas BIRL! sintéticos para os benchmarks.
+
+A mesma semente gera sempre o mesmo programa. O tamanho (quantidade de comandos), a
+profundidade de aninhamento dos blocos, a quantidade de identificadores, a densidade de strings
+e números nas expressões e a taxa de erros são configuráveis. Com taxa_erros=0 o programa não
+tem erros léxicos, sintáticos nem semânticos.
+
+Os blocos BIRL! não têm terminador: o corpo de um 'FICA GRANDE' vai até o CONFERE_MAIS ou OU_NAO
+que o fecha (ou o fim do programa), não até o fim da indentação, e um CONFERE_MAIS/OU_NAO fica
+com o CONFERE_AI aberto mais interno. Para só usar variáveis e funções visíveis para o
+semântico, o gerador acompanha os blocos como o Parser os vê.
+
+Uso: python -m benchmarks.gerador [--comandos 200] [--semente 0] [--taxa-erros 0.05] > programa.birl
+"""
+import argparse
+import random
+
+# Erros que podem ser injetados, léxicos (apontados pelo léxico) e sintáticos
+ERROS_LEXICOS = ('numero_excessivo', 'string_longa', 'caractere_desconhecido', 'aspas_abertas', 'atribuicao_sem_monstro')
+ERROS_SINTATICOS = ('sem_dois_pontos', 'sem_tira_anilha', 'operador_duplo', 'comando_invalido')
+
+_OPERADORES = ('+', '-', '*', '/')
+_RELACIONAIS = ('>', '<', '>=', '<=', '==', '!=')
+_PALAVRAS = ('treino', 'supino', 'agachamento', 'frango', 'monstro', 'jaula', 'birl', 'bambam', 'hora do show')
+
+
+class _Gerador:
+    def __init__(self, rng, profundidade, identificadores, densidade_strings, densidade_numeros, taxa_erros, erros):
+        self.rng = rng
+        self.profundidade = profundidade
+        self.nomes = [f'{rng.choice(("peso", "carga", "serie", "rep", "frango"))}_{i}' for i in range(identificadores)]
+        self.declarados = []
+        self.funcoes = [] # (nome, quantidade de parâmetros), na ordem de definição
+        # Blocos abertos como o Parser os vê: ['se', aceita CONFERE_MAIS/OU_NAO] ou
+        # ('funcao', len(declarados), len(funcoes)) no início do corpo
+        self.blocos = []
+        self.densidade_strings = densidade_strings
+        self.densidade_numeros = densidade_numeros
+        self.taxa_erros = taxa_erros
+        self.erros = erros
+        self.linhas = []
+
+    # --- Expressões
+    def termo(self, nivel=0):
+        rng = self.rng
+        sorteio = rng.random()
+        if sorteio < self.densidade_strings:
+            # Até 48 caracteres entre as aspas (o léxico aceita strings de até 50 com elas)
+            return '"' + ' '.join(rng.choice(_PALAVRAS) for _ in range(rng.randint(1, 4)))[:48].rstrip() + '"'
+        if sorteio < self.densidade_strings + self.densidade_numeros or not self.declarados:
+            if rng.random() < 0.3:
+                return f'{rng.randint(0, 9999)}.{rng.randint(0, 99)}'
+            return str(rng.randint(0, 999999))
+        if nivel < 2 and rng.random() < 0.1:
+            return f'Coloca anilha {self.expressao(nivel + 1)} Tira anilha'
+        if rng.random() < 0.05:
+            return rng.choice(('VERDADEIRO', 'FALSO'))
+        return rng.choice(self.declarados)
+
+    def expressao(self, nivel=0, operadores=_OPERADORES):
+        partes = [self.termo(nivel)]
+        for _ in range(self.rng.choice((0, 0, 1, 1, 2, 3))):
+            partes += [self.rng.choice(operadores), self.termo(nivel)]
+        return ' '.join(partes)
+
+    def condicao(self):
+        comparacao = f'{self.expressao()} {self.rng.choice(_RELACIONAIS)} {self.expressao()}'
+        if self.rng.random() < 0.2:
+            comparacao += f" {self.rng.choice(('E', 'OU'))} {self.termo()} {self.rng.choice(_RELACIONAIS)} {self.termo()}"
+        return comparacao
+
+    # --- Comandos
+    def emitir(self, nivel, texto):
+        self.linhas.append('    ' * nivel + texto)
+
+    def continuar_se(self, senao):
+        # CONFERE_MAIS/OU_NAO fecham os blocos até o CONFERE_AI mais interno que ainda os aceita,
+        # e o que foi declarado nas funções fechadas deixa de ser visível
+        while True:
+            bloco = self.blocos[-1]
+            if bloco[0] == 'se' and bloco[1]:
+                bloco[1] = not senao
+                return
+            self.blocos.pop()
+            if bloco[0] == 'funcao':
+                del self.declarados[bloco[1]:], self.funcoes[bloco[2]:]
+
+    def comando(self, nivel):
+        rng = self.rng
+        nao_declarados = [nome for nome in self.nomes if nome not in self.declarados]
+        sorteio = rng.random()
+        if nao_declarados and (sorteio < 0.25 or not self.declarados):
+            nome = rng.choice(nao_declarados)
+            self.emitir(nivel, f'MONSTRO {nome} TASAINDODAJAULA {self.expressao()}')
+            self.declarados.append(nome)
+        elif sorteio < 0.45:
+            operador = rng.choice(('TASAINDODAJAULA', 'TASAINDODAJAULA', '+=', '-=', '*='))
+            self.emitir(nivel, f'{rng.choice(self.declarados)} {operador} {self.expressao()}')
+        elif sorteio < 0.65:
+            itens = ', '.join(self.expressao() for _ in range(rng.randint(1, 3)))
+            self.emitir(nivel, f'GRITA Coloca anilha {itens} Tira anilha')
+        elif sorteio < 0.72 and self.funcoes:
+            # Só funções visíveis, com a quantidade certa de argumentos
+            funcao = rng.choice(self.funcoes)[0]
+            quantidade = next(aridade for nome, aridade in reversed(self.funcoes) if nome == funcao)
+            argumentos = ', '.join(self.expressao() for _ in range(quantidade))
+            self.emitir(nivel, f'CHAMA {funcao} Coloca anilha {argumentos} Tira anilha'.replace('  ', ' '))
+        elif sorteio < 0.72 or nivel >= self.profundidade:
+            self.emitir(nivel, f'GRITA Coloca anilha {self.expressao()} Tira anilha')
+        elif sorteio < 0.82:
+            self.emitir(nivel, f'CONFERE_AI {self.condicao()}:')
+            self.blocos.append(['se', True])
+            self.bloco(nivel + 1)
+            for _ in range(rng.choice((0, 0, 1, 2))):
+                self.continuar_se(senao=False)
+                self.emitir(nivel, f'CONFERE_MAIS {self.condicao()}:')
+                self.bloco(nivel + 1)
+            if rng.random() < 0.5:
+                self.continuar_se(senao=True)
+                self.emitir(nivel, 'OU_NAO:')
+                self.bloco(nivel + 1)
+        elif sorteio < 0.92:
+            self.emitir(nivel, f'TREINA ATÉ {self.condicao()}:')
+            self.bloco(nivel + 1)
+        else:
+            # Os parâmetros não são usados no corpo: atribuir a um deles seria, para o léxico,
+            # uma atribuição sem MONSTRO
+            parametros = rng.sample(self.nomes, min(len(self.nomes), rng.randint(0, 3)))
+            funcao = rng.choice(("treino", "dieta", "descanso"))
+            self.emitir(nivel, f'FICA GRANDE {funcao} Coloca anilha {", ".join(parametros)} Tira anilha:'.replace('  ', ' '))
+            self.funcoes.append((funcao, len(parametros)))
+            self.blocos.append(('funcao', len(self.declarados), len(self.funcoes)))
+            self.bloco(nivel + 1)
+
+        if self.erros and rng.random() < self.taxa_erros:
+            self.linhas[-1] = self.com_erro(self.linhas[-1])
+
+    def bloco(self, nivel):
+        for _ in range(self.rng.randint(1, 3)):
+            self.comando(nivel)
+
+    def com_erro(self, linha):
+        # Estraga a linha com um dos erros pedidos
+        rng = self.rng
+        erro = rng.choice(self.erros)
+        if erro == 'numero_excessivo':
+            return linha + f' + {rng.randint(10 ** 9, 10 ** 12)}'
+        if erro == 'string_longa':
+            return linha + ' + "' + 'BIRL ' * 12 + '"'
+        if erro == 'caractere_desconhecido':
+            return linha + ' @'
+        if erro == 'aspas_abertas':
+            return linha + ' + "sem fechar'
+        if erro == 'atribuicao_sem_monstro':
+            return linha + f'\nnunca_declarada_{rng.randint(0, 10 ** 6)} TASAINDODAJAULA 1'
+        if erro == 'sem_dois_pontos' and linha.endswith(':'):
+            return linha[:-1]
+        if erro == 'sem_tira_anilha' and linha.endswith('Tira anilha'):
+            return linha[:-len('Tira anilha')]
+        if erro == 'operador_duplo':
+            return linha + ' + * 1'
+        return linha + ' 7 7' # comando_invalido (e os que não se aplicam à linha)
+
+
+def gerar_programa(comandos=200, semente=0, profundidade=3, identificadores=20,
+                   densidade_strings=0.15, densidade_numeros=0.4, taxa_erros=0.0, erros=ERROS_LEXICOS + ERROS_SINTATICOS):
+    """
+    Gera um programa BIRL! (BORA ... BIRL!) com aproximadamente 'comandos' comandos de nível 0.
+
+    Args:
+        comandos (int): Comandos no nível mais externo (os blocos acrescentam outros).
+        semente (int): Semente do gerador aleatório; a mesma semente gera o mesmo programa.
+        profundidade (int): Aninhamento máximo de blocos (CONFERE_AI, TREINA ATÉ, FICA GRANDE).
+        identificadores (int): Quantidade de nomes de variáveis diferentes.
+        densidade_strings, densidade_numeros (float): Fração dos termos das expressões que são
+                                                       strings ou números (o resto são variáveis).
+        taxa_erros (float): Probabilidade de cada comando receber um erro.
+        erros (tuple): Tipos de erro sorteados (veja ERROS_LEXICOS e ERROS_SINTATICOS).
+    """
+    gerador = _Gerador(random.Random(semente), profundidade, max(1, identificadores),
+                       densidade_strings, densidade_numeros, taxa_erros, tuple(erros))
+    gerador.linhas.append('BORA')
+    for _ in range(comandos):
+        gerador.comando(0)
+    gerador.linhas.append('BIRL!')
+    return '\n'.join(gerador.linhas) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--comandos', type=int, default=200)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--profundidade', type=int, default=3)
+    parser.add_argument('--identificadores', type=int, default=20)
+    parser.add_argument('--densidade-strings', type=float, default=0.15)
+    parser.add_argument('--densidade-numeros', type=float, default=0.4)
+    parser.add_argument('--taxa-erros', type=float, default=0.0)
+    parser.add_argument('--erros', nargs='+', choices=ERROS_LEXICOS + ERROS_SINTATICOS, default=ERROS_LEXICOS + ERROS_SINTATICOS)
+    args = parser.parse_args()
+    print(gerar_programa(
+        args.comandos, args.semente, args.profundidade, args.identificadores,
+        args.densidade_strings, args.densidade_numeros, args.taxa_erros, args.erros,
+    ), end='')
+
+
+if __name__ == '__main__':
+    main()
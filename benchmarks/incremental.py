@@ -0,0 +1,54 @@
+"""
+Mede o léxico de uma edição de uma linha no DocumentoIncremental contra o léxico completo.
+
+Só o léxico é medido: o sintático e o semântico de /analisar/incremental continuam rodando sobre
+o documento inteiro a cada edição e não entram nesta comparação.
+
+Uso: python -m benchmarks.incremental [--megabytes 1 2 4] [--edicoes 50]
+"""
+import argparse
+import random
+import time
+
+from analisador import analisar_codigo
+from benchmarks.varredura import _codigo_de_teste
+from lexer_incremental import DocumentoIncremental
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, nargs='+', default=[0.5, 1, 2])
+    parser.add_argument('--edicoes', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for megabytes in args.megabytes:
+        codigo = _codigo_de_teste(megabytes)
+        documento = DocumentoIncremental(codigo)
+        total_linhas = len(documento)
+
+        inicio = time.perf_counter()
+        analisar_codigo(documento.texto)
+        tempo_completo = time.perf_counter() - inicio
+
+        tempos, reanalisadas = [], 0
+        for _ in range(args.edicoes):
+            linha = rng.randint(1, total_linhas)
+            inicio = time.perf_counter()
+            documento.editar(linha, linha, 'GRITA Coloca anilha "editado" Tira anilha')
+            tempos.append(time.perf_counter() - inicio)
+            reanalisadas += documento.linhas_reanalisadas
+
+        if documento.resultado() != analisar_codigo(documento.texto):
+            raise SystemExit('A análise incremental divergiu da análise completa!')
+
+        tempos.sort()
+        print(
+            f"{megabytes:>5} MB ({total_linhas} linhas): completa {tempo_completo * 1000:.1f} ms, "
+            f"edição mediana {tempos[len(tempos) // 2] * 1000:.3f} ms "
+            f"({reanalisadas / args.edicoes:.1f} linhas re-analisadas em média)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compara a análise léxica de um arquivo lido em uma str com a varredura dos bytes via mmap.
+
+Para arquivos de tamanhos crescentes, mede o pico de memória alocada pelo Python (tracemalloc;
+as páginas do mmap não entram, são do cache de arquivos do sistema) e a vazão de cada caminho,
+e confere que os dois geram os mesmos eventos.
+
+Uso: python -m benchmarks.lexico_mmap [--megabytes 2 8]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from analisador import iter_tokens
+from benchmarks.varredura import _codigo_de_teste
+from lexer_mmap import iter_tokens_arquivo
+
+
+def _lendo_str(caminho):
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        codigo = arquivo.read()
+    return iter_tokens(codigo)
+
+
+CAMINHOS = {'str': _lendo_str, 'mmap': iter_tokens_arquivo}
+
+
+def _consumir(eventos):
+    quantidade = 0
+    for _ in eventos:
+        quantidade += 1
+    return quantidade
+
+
+def _pico_de_memoria(caminho, abrir):
+    gc.collect()
+    tracemalloc.start()
+    _consumir(abrir(caminho))
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, nargs='+', default=[2, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for megabytes in args.megabytes:
+            caminho = os.path.join(pasta, f'{megabytes}.birl')
+            with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+                arquivo.write(_codigo_de_teste(megabytes))
+            tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+
+            if megabytes == args.megabytes[0] and list(_lendo_str(caminho)) != list(iter_tokens_arquivo(caminho)):
+                raise SystemExit("A varredura via mmap produziu eventos diferentes da varredura da str!")
+
+            print(f"Arquivo de {tamanho_mb:.1f} MB")
+            for nome, abrir in CAMINHOS.items():
+                inicio = time.perf_counter()
+                eventos = _consumir(abrir(caminho))
+                decorrido = time.perf_counter() - inicio
+                pico = _pico_de_memoria(caminho, abrir)
+                print(f"  {nome:>4}: {decorrido:.2f} s ({tamanho_mb / decorrido:.2f} MB/s, {eventos} eventos), "
+                      f"pico de memória {pico / 1024 / 1024:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Mede a análise léxica em pedaços paralelos (lexer_paralelo.py) contra a sequencial.
+
+Confere que o resultado é igual ao de analisar_fluxo e mostra o tempo e o ganho para cada
+quantidade de processos.
+
+Uso: python -m benchmarks.lexico_paralelo [--megabytes 8] [--workers 1 2 4] [--repeticoes 3]
+"""
+import argparse
+import time
+
+import lote
+from benchmarks.varredura import _codigo_de_teste
+from fluxo_tokens import analisar_fluxo
+from lexer_paralelo import analisar_fluxo_paralelo
+
+
+def _melhor_tempo(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def _resumo(resultado):
+    return list(resultado['tokens']), resultado['diagnosticos']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, lote.MAX_WORKERS}))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    codigo = _codigo_de_teste(args.megabytes)
+    print(f"Entrada: {len(codigo.encode('utf-8')) / 1024 / 1024:.2f} MB; {lote.MAX_WORKERS} CPU(s)")
+
+    sequencial, esperado = _melhor_tempo(lambda: analisar_fluxo(codigo), args.repeticoes)
+    esperado = _resumo(esperado)
+    print(f"sequencial: {sequencial:.3f} s")
+
+    for workers in args.workers:
+        if workers > lote.MAX_WORKERS:
+            print(f"{workers:>2} workers: pulado (só há {lote.MAX_WORKERS} CPU(s))")
+            continue
+        lote.pool(workers) # Cria o pool fora da medição
+        tempo, resultado = _melhor_tempo(lambda: analisar_fluxo_paralelo(codigo, workers, pedacos=max(2, workers)), args.repeticoes)
+        if _resumo(resultado) != esperado:
+            raise SystemExit(f"Resultado com {workers} workers diferente do sequencial!")
+        print(f"{workers:>2} workers: {tempo:.3f} s ({sequencial / tempo:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
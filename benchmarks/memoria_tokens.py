@@ -0,0 +1,63 @@
+"""
+Mede a memória retida por token: lista [linha, lexema, tipo, coluna] contra TokenStream.
+
+Com --identificadores a entrada é um programa gerado cujas expressões são quase só variáveis,
+onde os lexemas internados pelo léxico (simbolos.Lexemas) fazem mais diferença na lista.
+
+Uso: python -m benchmarks.memoria_tokens [--megabytes 2] [--identificadores]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from analisador import analisar_codigo
+from benchmarks.gerador import gerar_programa
+from benchmarks.varredura import _codigo_de_teste
+from fluxo_tokens import analisar_fluxo
+
+
+def _memoria_retida(construir):
+    # Bytes alocados que continuam vivos depois que 'construir' termina (a fonte não entra na conta)
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = construir()
+    gc.collect()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, depois - antes
+
+
+def _codigo_identificadores(megabytes):
+    # Cada comando gerado tem ~230 caracteres com essas densidades
+    comandos = max(1, int(megabytes * 1024 * 1024 / 230))
+    return gerar_programa(comandos, semente=0, identificadores=200, densidade_strings=0.0, densidade_numeros=0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=2)
+    parser.add_argument('--identificadores', action='store_true', help='programa gerado, com expressões quase só de variáveis')
+    args = parser.parse_args()
+
+    codigo = _codigo_identificadores(args.megabytes) if args.identificadores else _codigo_de_teste(args.megabytes)
+
+    resultado_lista, bytes_lista = _memoria_retida(lambda: analisar_codigo(codigo)['tokens'])
+    total = len(resultado_lista)
+    del resultado_lista
+
+    def construir_fluxo():
+        fluxo = analisar_fluxo(codigo)['tokens']
+        fluxo.inicios_linha # O índice de linhas também fica retido
+        return fluxo
+
+    resultado_fluxo, bytes_fluxo = _memoria_retida(construir_fluxo)
+    assert len(resultado_fluxo) == total
+
+    print(f"{total} tokens, {len(resultado_fluxo.lexemas)} lexemas internados distintos")
+    print(f"  lista de listas: {bytes_lista / total:6.1f} bytes/token ({bytes_lista / 1024 / 1024:.1f} MB)")
+    print(f"  TokenStream:     {bytes_fluxo / total:6.1f} bytes/token ({bytes_fluxo / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Compara o Parser iterativo (sintatico.Parser) com o de descida recursiva que ele substituiu.
+
+Confere que os dois devolvem os mesmos erros em programas válidos e com erros, mede os tempos
+e mostra o aninhamento máximo que cada um aguenta.
+
+Uso: python -m benchmarks.sintatico [--repeticoes 5] [--profundidade 5000]
+"""
+import argparse
+import random
+import time
+
+from analisador import CODIGO_TIPO, TIPOS_TOKEN
+from benchmarks.sintatico_recursivo import ParserRecursivo
+from benchmarks.varredura import _codigo_de_teste
+from fluxo_tokens import TokenStream, analisar_fluxo
+from sintatico import IGNORADO, TIPO_SINTATICO, Parser
+
+
+# Comandos simples, repetidos para formar um programa grande
+_CORPO_SIMPLES = """MONSTRO peso TASAINDODAJAULA 85.5
+MONSTRO altura_quadrado TASAINDODAJAULA Coloca anilha altura * altura Tira anilha
+GRITA Coloca anilha "Seu IMC é:", peso / altura_quadrado Tira anilha
+peso TASAINDODAJAULA peso + 1 * Coloca anilha 2 - altura Tira anilha
+CHAMA dobro Coloca anilha peso, 2 Tira anilha
+"""
+
+# Todas as estruturas. Um bloco só termina no próximo CONFERE_MAIS/OU_NAO/BIRL!, então cada
+# repetição fica aninhada na anterior (poucas repetições já são um aninhamento profundo)
+_CORPO_ESTRUTURAS = """CONFERE_AI peso > 80 E altura < 2:
+    GRITA Coloca anilha "Seu IMC é:", peso / altura_quadrado Tira anilha
+CONFERE_MAIS peso > 60:
+    GRITA Coloca anilha "ok" Tira anilha
+OU_NAO:
+    peso += 1
+TREINA ATÉ peso < 100:
+    peso TASAINDODAJAULA peso + 1
+FICA GRANDE dobro Coloca anilha a, b Tira anilha:
+    GRITA Coloca anilha a * 2 Tira anilha
+CHAMA dobro Coloca anilha peso, 2 Tira anilha
+"""
+
+
+def como_o_parser_ve(tokens):
+    """
+    Os tokens com os tipos que o Parser vê (sintatico.TIPO_SINTATICO): sem os ignorados e com
+    os de erro léxico trocados. O ParserRecursivo não conhece essa tabela; os dois só são
+    comparáveis sobre estes tokens.
+    """
+    return TokenStream.de_lista([
+        [linha, lexema, TIPOS_TOKEN[TIPO_SINTATICO[CODIGO_TIPO[tipo]]], coluna]
+        for linha, lexema, tipo, coluna in tokens
+        if TIPO_SINTATICO[CODIGO_TIPO[tipo]] != IGNORADO
+    ])
+
+
+def _tokens(codigo):
+    return como_o_parser_ve(analisar_fluxo(codigo)['tokens'])
+
+
+def programa_aninhado(profundidade):
+    """CONFERE_AI dentro de CONFERE_AI, 'profundidade' vezes, com uma expressão com parênteses no meio."""
+    abertura = ''.join(f"{'    ' * n}CONFERE_AI x > {n}:\n" for n in range(profundidade))
+    parenteses = 'Coloca anilha ' * profundidade + '1' + ' Tira anilha' * profundidade
+    return f"BORA\nMONSTRO x TASAINDODAJAULA {parenteses}\n{abertura}GRITA Coloca anilha x Tira anilha\nBIRL!"
+
+
+def _tokens_embaralhados(fluxo, rng, quantidade):
+    # Programas com erros: tokens de um programa real com trechos apagados e trocados
+    lista = list(fluxo)
+    for _ in range(quantidade):
+        copia = [list(token) for token in lista]
+        for _ in range(rng.randint(1, 6)):
+            posicao = rng.randrange(len(copia))
+            operacao = rng.random()
+            if operacao < 0.4:
+                del copia[posicao]
+            elif operacao < 0.7:
+                copia[posicao][2] = rng.choice(TIPOS_TOKEN[:26])
+            else:
+                copia.insert(posicao, list(copia[rng.randrange(len(copia))]))
+        yield copia
+
+
+def _medir(classe, tokens, vezes):
+    inicio = time.perf_counter()
+    for _ in range(vezes):
+        classe(tokens).parse()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--profundidade', type=int, default=5000)
+    args = parser.parse_args()
+
+    exemplos = _tokens(_codigo_de_teste(0.01))
+    rng = random.Random(0)
+    for tokens in _tokens_embaralhados(exemplos, rng, 300):
+        tokens = como_o_parser_ve(tokens)
+        if Parser(tokens).parse() != ParserRecursivo(tokens).parse():
+            raise SystemExit(f'Os parsers divergiram para os tokens: {tokens}')
+
+    programas = [
+        ('comandos simples', 'BORA\n' + _CORPO_SIMPLES * 4000 + 'BIRL!', 1),
+        ('estruturas aninhadas', 'BORA\n' + _CORPO_ESTRUTURAS * 40 + 'BIRL!', 100),
+    ]
+    for descricao, codigo, vezes in programas:
+        tokens = _tokens(codigo)
+        erros = Parser(tokens).parse()
+        if erros != ParserRecursivo(tokens).parse():
+            raise SystemExit(f'Os parsers divergiram no programa de {descricao}!')
+        print(f"Programa com {descricao}: {len(tokens)} tokens, {len(erros)} erros")
+        for nome, classe in (('recursivo', ParserRecursivo), ('iterativo', Parser)):
+            melhor = min(_medir(classe, tokens, vezes) for _ in range(args.repeticoes))
+            print(f"  {nome:>9}: {melhor * 1000:.2f} ms ({len(tokens) * vezes / melhor / 1e6:.2f} M tokens/s)")
+
+    aninhado = _tokens(programa_aninhado(args.profundidade))
+    print(f"Aninhamento {args.profundidade}: {len(aninhado)} tokens")
+    try:
+        ParserRecursivo(aninhado).parse()
+        print("  recursivo: ok")
+    except RecursionError:
+        print("  recursivo: RecursionError")
+    inicio = time.perf_counter()
+    erros = Parser(aninhado).parse()
+    print(f"  iterativo: {len(erros)} erros em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
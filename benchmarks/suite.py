@@ -0,0 +1,195 @@
+"""
+Suíte de benchmarks do analisador com programas gerados por benchmarks.gerador.
+
+Mede analisar_codigo (léxico), Parser.parse (sintático, sobre tokens já prontos),
+analisar_semantica (sobre a árvore já montada) e a requisição /analisar inteira pelo cliente de teste do Flask (sem o cache de resultados), em
+programas de tamanhos e taxas de erro diferentes. Cada benchmark é calibrado para que uma
+amostra dure pelo menos --tempo-minimo, aquecido e repetido; o resultado vai para um JSON.
+'comparar' confronta dois desses JSON e termina com código 1 se algum benchmark ficou mais
+lento que o limite.
+
+Uso: python -m benchmarks.suite rodar [-o resultados.json] [--amostras 10] [--filtro lexico]
+     python -m benchmarks.suite comparar base.json novo.json [--limite 0.10]
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from analisador import analisar_codigo
+from benchmarks.gerador import ERROS_SINTATICOS, gerar_programa
+from benchmarks.sintatico import _tokens
+from semantico import analisar_semantica
+from sintatico import Parser
+
+SEMENTE = 2024
+
+# nome -> (comandos, taxa de erros, tipos de erro)
+PROGRAMAS = {
+    'pequeno': (50, 0.0, None),
+    'medio': (500, 0.0, None),
+    'grande': (3000, 0.0, None),
+    'medio_com_erros': (500, 0.05, None),
+    'medio_com_erros_sintaticos': (500, 0.05, ERROS_SINTATICOS),
+}
+
+
+def _programa(nome):
+    comandos, taxa_erros, erros = PROGRAMAS[nome]
+    if erros is None:
+        return gerar_programa(comandos, SEMENTE, taxa_erros=taxa_erros)
+    return gerar_programa(comandos, SEMENTE, taxa_erros=taxa_erros, erros=erros)
+
+
+def _lexico(nome):
+    codigo = _programa(nome)
+    return lambda: analisar_codigo(codigo)
+
+
+def _sintatico(nome):
+    tokens = _tokens(_programa(nome))
+    return lambda: Parser(tokens).parse()
+
+
+def _semantico(nome):
+    parser = Parser(_tokens(_programa(nome)))
+    parser.parse()
+    return lambda: analisar_semantica(parser.arvore)
+
+
+def _requisicao(nome):
+    import app # Só aqui: carregar o Flask não deve pesar nos outros benchmarks
+
+    cliente = app.app.test_client()
+    corpo = {'codigo': _programa(nome)}
+
+    def rodar():
+        app.cache_resultados.limpar()
+        resposta = cliente.post('/analisar', json=corpo)
+        assert resposta.status_code == 200, resposta.status_code
+        return resposta.get_data()
+    return rodar
+
+
+# nome do benchmark -> função que prepara a entrada e devolve a função medida (sem argumentos)
+BENCHMARKS = {
+    **{f'lexico/{nome}': (lambda nome=nome: _lexico(nome)) for nome in PROGRAMAS},
+    **{f'sintatico/{nome}': (lambda nome=nome: _sintatico(nome))
+       for nome in ('pequeno', 'medio', 'grande', 'medio_com_erros_sintaticos')},
+    **{f'semantico/{nome}': (lambda nome=nome: _semantico(nome)) for nome in ('medio', 'grande')},
+    **{f'requisicao/{nome}': (lambda nome=nome: _requisicao(nome)) for nome in ('pequeno', 'medio', 'medio_com_erros')},
+}
+
+
+def _cronometrar(funcao, loops):
+    inicio = time.perf_counter()
+    for _ in range(loops):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def medir(funcao, amostras=10, aquecimento=2, tempo_minimo=0.1):
+    """
+    Tempos por chamada (segundos) de 'amostras' amostras de 'funcao'.
+
+    Cada amostra roda a função 'loops' vezes, com 'loops' dobrado até a amostra durar pelo
+    menos 'tempo_minimo'; as primeiras 'aquecimento' amostras são descartadas.
+    """
+    loops = 1
+    while _cronometrar(funcao, loops) < tempo_minimo:
+        loops *= 2
+    for _ in range(aquecimento):
+        _cronometrar(funcao, loops)
+    tempos = [_cronometrar(funcao, loops) / loops for _ in range(amostras)]
+    return {
+        'loops': loops,
+        'amostras': tempos,
+        'media': statistics.fmean(tempos),
+        'mediana': statistics.median(tempos),
+        'desvio': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        'minimo': min(tempos),
+    }
+
+
+def _formatar(segundos):
+    return f'{segundos * 1000:.3f} ms' if segundos < 1 else f'{segundos:.3f} s'
+
+
+def rodar(args):
+    resultados = {}
+    for nome, preparar in BENCHMARKS.items():
+        if args.filtro and not any(filtro in nome for filtro in args.filtro):
+            continue
+        resultado = resultados[nome] = medir(preparar(), args.amostras, args.aquecimento, args.tempo_minimo)
+        print(f"{nome:40} {_formatar(resultado['mediana']):>12} +- {_formatar(resultado['desvio'])}"
+              f" ({resultado['loops']} loops x {args.amostras})")
+
+    saida = {
+        'metadados': {
+            'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'implementacao': platform.python_implementation(),
+            'plataforma': platform.platform(),
+            'semente': SEMENTE,
+        },
+        'benchmarks': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(saida, arquivo, indent=2)
+        print(f'Resultados salvos em {args.saida}')
+
+
+def comparar(args):
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)['benchmarks']
+    with open(args.novo, encoding='utf-8') as arquivo:
+        novo = json.load(arquivo)['benchmarks']
+
+    regressoes = []
+    for nome in sorted(base.keys() & novo.keys()):
+        antes, depois = base[nome]['mediana'], novo[nome]['mediana']
+        razao = depois / antes
+        if razao > 1 + args.limite:
+            situacao = 'REGRESSÃO'
+            regressoes.append(nome)
+        elif razao < 1 - args.limite:
+            situacao = 'melhora'
+        else:
+            situacao = 'igual'
+        print(f'{nome:40} {_formatar(antes):>12} -> {_formatar(depois):>12} ({razao:.2f}x) {situacao}')
+    for nome in sorted(base.keys() ^ novo.keys()):
+        print(f"{nome:40} só em {'base' if nome in base else 'novo'}")
+
+    if regressoes:
+        print(f"Mais lentos que {args.limite:.0%}: {', '.join(regressoes)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    parser_rodar = comandos.add_parser('rodar', help='Roda os benchmarks.')
+    parser_rodar.add_argument('-o', '--saida', help='Arquivo JSON para os resultados.')
+    parser_rodar.add_argument('--amostras', type=int, default=10)
+    parser_rodar.add_argument('--aquecimento', type=int, default=2)
+    parser_rodar.add_argument('--tempo-minimo', type=float, default=0.1, help='Duração mínima de uma amostra (segundos).')
+    parser_rodar.add_argument('--filtro', nargs='+', help='Só os benchmarks com algum desses trechos no nome.')
+    parser_rodar.set_defaults(funcao=rodar)
+
+    parser_comparar = comandos.add_parser('comparar', help='Compara dois arquivos de resultados.')
+    parser_comparar.add_argument('base')
+    parser_comparar.add_argument('novo')
+    parser_comparar.add_argument('--limite', type=float, default=0.10, help='Aumento relativo da mediana tolerado.')
+    parser_comparar.set_defaults(funcao=comparar)
+
+    args = parser.parse_args()
+    args.funcao(args)
+
+
+if __name__ == '__main__':
+    main()
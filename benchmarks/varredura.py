@@ -0,0 +1,56 @@
+"""
+Compara a vazão da varredura linha a linha com a varredura do código inteiro (modo 'buffer').
+
+Uso: python -m benchmarks.varredura [--megabytes 4] [--repeticoes 3]
+"""
+import argparse
+import os
+import time
+
+from analisador import iter_tokens
+
+_PASTA_EXEMPLOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cod_teste')
+
+
+def _codigo_de_teste(megabytes):
+    # Repete os exemplos de cod_teste até atingir o tamanho pedido
+    exemplos = []
+    for nome in sorted(os.listdir(_PASTA_EXEMPLOS)):
+        with open(os.path.join(_PASTA_EXEMPLOS, nome), encoding='utf-8') as arquivo:
+            exemplos.append(arquivo.read())
+    bloco = '\n'.join(exemplos)
+    return bloco * max(1, int(megabytes * 1024 * 1024 / len(bloco)))
+
+
+def _consumir(codigo, modo):
+    eventos = 0
+    for _ in iter_tokens(codigo, modo=modo):
+        eventos += 1
+    return eventos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=4)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    codigo = _codigo_de_teste(args.megabytes)
+    tamanho_mb = len(codigo.encode('utf-8')) / (1024 * 1024)
+    print(f"Entrada: {tamanho_mb:.2f} MB, {codigo.count(chr(10)) + 1} linhas")
+
+    if list(iter_tokens(codigo, modo='linha')) != list(iter_tokens(codigo, modo='buffer')):
+        raise SystemExit("Os modos 'linha' e 'buffer' produziram saídas diferentes!")
+
+    for modo in ('linha', 'buffer'):
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            eventos = _consumir(codigo, modo)
+            tempos.append(time.perf_counter() - inicio)
+        melhor = min(tempos)
+        print(f"{modo:>7}: {melhor:.3f} s ({tamanho_mb / melhor:.2f} MB/s, {eventos} eventos)")
+
+
+if __name__ == '__main__':
+    main()
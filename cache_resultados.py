@@ -0,0 +1,99 @@
+"""
+Cache de resultados da análise, endereçado pelo conteúdo do código.
+
+A chave é o hash do código-fonte junto com uma versão do analisador, e o valor são os bytes
+JSON já serializados da resposta: uma submissão repetida (os exemplos de cod_teste, em sala
+de aula) é respondida sem léxico, sintático nem montagem da saída.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def versao_dos_modulos(*modulos):
+    """
+    Versão do analisador derivada do código-fonte dos módulos que definem a saída.
+
+    Qualquer mudança nesses arquivos gera outra versão, invalidando as entradas antigas do cache.
+    """
+    resumo = hashlib.sha256()
+    for modulo in modulos:
+        with open(modulo.__file__, 'rb') as arquivo:
+            resumo.update(arquivo.read())
+    return resumo.hexdigest()[:16]
+
+
+class CacheResultados:
+    """
+    Cache LRU limitado por quantidade de entradas e pelo total de bytes guardados.
+
+    Seguro para uso por várias threads (servidor com threads do Flask).
+
+    Atributos:
+        acertos, falhas (int): Contadores de consultas respondidas ou não pelo cache.
+    """
+
+    def __init__(self, versao, max_itens=1024, max_bytes=64 * 1024 * 1024):
+        self.versao = versao
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def chave(self, codigo, variante=''):
+        # 'variante' separa formatos diferentes da resposta para o mesmo código
+        resumo = hashlib.sha256(self.versao.encode('ascii'))
+        resumo.update(variante.encode('ascii'))
+        resumo.update(b'\0')
+        resumo.update(codigo.encode('utf-8', 'surrogatepass'))
+        return resumo.digest()
+
+    def obter(self, chave):
+        """Bytes guardados para a chave, ou None. Conta como acerto ou falha."""
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        # Um valor maior que o limite inteiro não é guardado (tiraria tudo do cache)
+        if len(valor) > self.max_bytes:
+            return
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= len(antigo)
+            self._itens[chave] = valor
+            self._bytes += len(valor)
+            while len(self._itens) > self.max_itens or self._bytes > self.max_bytes:
+                _, descartado = self._itens.popitem(last=False)
+                self._bytes -= len(descartado)
+                self.descartes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'versao': self.versao,
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+                'max_itens': self.max_itens,
+                'max_bytes': self.max_bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'descartes': self.descartes,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }
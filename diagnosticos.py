@@ -0,0 +1,105 @@
+"""
+Diagnósticos (erros) do analisador como registros estruturados.
+
+O léxico e o sintático não montam mais o texto dos erros: cada erro vira um Diagnostico com o
+código do erro, a posição e os argumentos da mensagem (lexemas, tipos...). O texto só é gerado
+em renderizar(), na hora de serializar a resposta, a partir do CATALOGO.
+"""
+from collections import namedtuple
+
+# Categorias
+LEXICO = 'lexico'
+BALANCEAMENTO = 'balanceamento'
+INICIALIZACAO = 'inicializacao'
+PALAVRA_CHAVE = 'palavra_chave'
+ESTRUTURA = 'estrutura'
+SINTATICO = 'sintatico'
+SEMANTICO = 'semantico'
+
+ERRO = 'erro' # Severidade (por enquanto todos os diagnósticos são erros)
+
+# Código -> (categoria, severidade, modelo da mensagem). O modelo recebe os argumentos do
+# diagnóstico por posição e a posição como {linha}/{coluna}.
+CATALOGO = {
+    # Léxico (analisador.py)
+    'NUMERO_EXCESSIVO': (LEXICO, ERRO, "Erro Léxico na linha {linha}, coluna {coluna}: Número '{0}' excede o limite de 9 dígitos. Tipo original: {1}."),
+    'STRING_MUITO_LONGA': (LEXICO, ERRO, "Erro Léxico na linha {linha}, coluna {coluna}: String '{0}' excede o limite de {1} caracteres."),
+    'CARACTERE_NAO_RECONHECIDO': (LEXICO, ERRO, "Erro Léxico na linha {linha}, coluna {coluna}: Caractere não reconhecido '{0}'."),
+    'ASPAS_NAO_FECHADAS': (LEXICO, ERRO, "Erro Léxico na linha {linha}, coluna {coluna}: Aspas não fechadas em '{0}'."),
+    'CARACTERE_INVALIDO': (LEXICO, ERRO, "Erro Léxico na linha {linha}, coluna {coluna}: Caractere inválido '{0}'. Utilize 'Coloca anilha' e 'Tira anilha'."),
+    'ATRIBUICAO_SEM_DECLARACAO': (INICIALIZACAO, ERRO, "Erro de Inicialização na linha {linha}, coluna {coluna}: Variável '{0}' utilizada com atribuição ('TASAINDODAJAULA') sem declaração com 'MONSTRO'."),
+    'PALAVRA_CHAVE_INCORRETA': (PALAVRA_CHAVE, ERRO, "Erro de Palavra-Chave na linha {linha}, coluna {coluna}: Uso incorreto da palavra '{0}'. Utilize as palavras-chave BIRL! para controle de fluxo (ex: CONFERE_AI, OU_NAO)."),
+    'FECHAMENTO_SEM_ABERTURA': (BALANCEAMENTO, ERRO, "Erro de Balanceamento na linha {linha}, coluna {coluna}: '{0}' encontrado sem delimitador de abertura correspondente."),
+    'FECHAMENTO_TROCADO': (BALANCEAMENTO, ERRO, "Erro de Balanceamento na linha {linha}, coluna {coluna}: '{0}' encontrado, mas esperava fechamento para '{1}' (aberto na linha {2}, coluna {3})."),
+    'DELIMITADOR_NAO_FECHADO': (BALANCEAMENTO, ERRO, "Erro de Balanceamento na linha {linha}, coluna {coluna}: Delimitador '{0}' aberto e não fechado."),
+    # A linha/coluna só seria conhecida se o token estivesse certo, caso em que não há erro
+    'INICIO_SEM_BORA': (ESTRUTURA, ERRO, "Erro de Estrutura na linha N/A, coluna N/A: O programa deve começar com 'BORA'."),
+    'FIM_SEM_BIRL': (ESTRUTURA, ERRO, "Erro de Estrutura na linha N/A, coluna N/A: O programa deve terminar com 'BIRL!'."),
+
+    # Sintático (sintatico.py)
+    'TOKEN_INESPERADO': (SINTATICO, ERRO, "Token inesperado '{0}'. Esperava '{1}'."),
+    'FIM_INESPERADO': (SINTATICO, ERRO, "Fim de arquivo inesperado. Esperava '{0}'."),
+    'BORA_AUSENTE': (SINTATICO, ERRO, "Comando 'BORA' ausente ou mal posicionado no início do programa."),
+    'BIRL_AUSENTE': (SINTATICO, ERRO, "Comando 'BIRL!' ausente ou mal posicionado no final do programa."),
+    'TOKENS_EXTRAS': (SINTATICO, ERRO, "Tokens extras após 'BIRL!': '{0}'."),
+    'COMANDO_NAO_PROCESSADO': (SINTATICO, ERRO, "Erro: Não foi possível processar o comando '{0}'. Tentando sincronizar."),
+    'COMANDO_INVALIDO': (SINTATICO, ERRO, "Comando inválido. Esperava 'MONSTRO', 'GRITA', 'CONFERE_AI', 'TREINA ATÉ', 'FICA GRANDE', 'CHAMA' ou uma atribuição. Encontrou: '{0}'"),
+    'COMANDO_NAO_RECONHECIDO': (SINTATICO, ERRO, "Comando não reconhecido ou mal formado: '{0}'"),
+    'OPERADOR_AUSENTE': (SINTATICO, ERRO, "Expressão mal formada: Operador ausente entre '{0}' e '{1}'."),
+    'TOKEN_INESPERADO_NA_EXPRESSAO': (SINTATICO, ERRO, "Expressão mal formada: Token inesperado '{0}' após '{1}'."),
+    'TERMO_AUSENTE_APOS_OPERADOR': (SINTATICO, ERRO, "Expressão incompleta. Esperava um termo após o operador '{0}'."),
+    'TERMO_NO_FIM_DO_ARQUIVO': (SINTATICO, ERRO, "Termo inesperado: fim de arquivo ou token inválido."),
+    'TERMO_INESPERADO': (SINTATICO, ERRO, "Termo inesperado na expressão: '{0}'"),
+    'PARENTESES_INCOMPLETO': (SINTATICO, ERRO, "Expressão incompleta dentro de parênteses."),
+    'COLOCA_ANILHA_AUSENTE': (SINTATICO, ERRO, "Delimitador 'Coloca anilha' ausente após 'GRITA'."),
+    'TIRA_ANILHA_AUSENTE': (SINTATICO, ERRO, "Delimitador 'Tira anilha' ausente após lista de impressão."),
+    'IMPRESSAO_INVALIDA': (SINTATICO, ERRO, "Expressão ou lista de expressões inválida dentro de GRITA Coloca anilha ... Tira anilha."),
+    'EXPRESSAO_AUSENTE_APOS_VIRGULA': (SINTATICO, ERRO, "Expressão ausente ou mal formada após vírgula na lista de expressões."),
+    'DOIS_PONTOS_AUSENTE': (SINTATICO, ERRO, "Dois pontos ':' ausente após {0}."),
+    'CONDICAO_ELIF_INVALIDA': (SINTATICO, ERRO, "Expressão de condição ausente ou inválida após 'CONFERE_MAIS'."),
+    'PARAMETRO_AUSENTE_APOS_VIRGULA': (SINTATICO, ERRO, "Identificador ausente após vírgula na lista de parâmetros."),
+    'ARGUMENTO_INVALIDO': (SINTATICO, ERRO, "Expressão de argumento ausente ou mal formada."),
+    'ARGUMENTO_AUSENTE_APOS_VIRGULA': (SINTATICO, ERRO, "Expressão de argumento ausente ou mal formada após vírgula."),
+
+    # Semântico (semantico.py). ATRIBUICAO_SEM_DECLARACAO, acima, também é emitido por ele
+    'VARIAVEL_NAO_DECLARADA': (SEMANTICO, ERRO, "Erro Semântico na linha {linha}, coluna {coluna}: Variável '{0}' usada sem declaração com 'MONSTRO' (ou como parâmetro) visível neste ponto."),
+    'FUNCAO_NAO_DEFINIDA': (SEMANTICO, ERRO, "Erro Semântico na linha {linha}, coluna {coluna}: Função '{0}' chamada com 'CHAMA' sem ter sido definida com 'FICA GRANDE' antes."),
+    'QUANTIDADE_DE_ARGUMENTOS': (SEMANTICO, ERRO, "Erro Semântico na linha {linha}, coluna {coluna}: Função '{0}' recebe {1} argumento(s), mas foi chamada com {2}."),
+}
+
+
+class Diagnostico(namedtuple('Diagnostico', 'codigo linha coluna args')):
+    """
+    Um erro encontrado na análise.
+
+    Atributos:
+        codigo (str): Chave do CATALOGO.
+        linha, coluna (int | None): Posição (1-based); None quando não se aplica ("N/A").
+        args (tuple): Argumentos da mensagem (lexemas, tipos...).
+
+    Categoria e severidade vêm do código, sem ocupar espaço em cada registro.
+    """
+    __slots__ = ()
+
+    @property
+    def categoria(self):
+        return CATALOGO[self.codigo][0]
+
+    @property
+    def severidade(self):
+        return CATALOGO[self.codigo][1]
+
+    def como_dict(self):
+        """Forma estruturada para serialização (sem o texto da mensagem)."""
+        return {
+            'codigo': self.codigo, 'severidade': self.severidade, 'categoria': self.categoria,
+            'linha': self.linha, 'coluna': self.coluna, 'args': list(self.args),
+        }
+
+
+def renderizar(diagnostico):
+    """Texto da mensagem do diagnóstico."""
+    modelo = CATALOGO[diagnostico.codigo][2]
+    linha = 'N/A' if diagnostico.linha is None else diagnostico.linha
+    coluna = 'N/A' if diagnostico.coluna is None else diagnostico.coluna
+    return modelo.format(*diagnostico.args, linha=linha, coluna=coluna)
@@ -0,0 +1,156 @@
+"""
+Representação compacta da lista de tokens produzida pelo analisador léxico.
+
+Em vez de uma lista [linha, lexema, tipo, coluna] por token, o TokenStream guarda o código
+do tipo em um array de bytes e os offsets de início/fim do lexema no código-fonte. Lexema,
+linha e coluna são calculados só quando pedidos, a partir de um índice dos inícios de linha.
+"""
+from array import array
+from bisect import bisect_right
+
+from analisador import CODIGO_TIPO, TIPOS_TOKEN, _QUEBRA_LINHA, iter_tokens
+from simbolos import Lexemas
+
+
+def _inicios_de_linha(fonte):
+    # Offsets onde começa cada linha, com as mesmas quebras usadas pelo analisador
+    return array('I', [0] + [quebra.end() for quebra in _QUEBRA_LINHA.finditer(fonte)])
+
+
+class TokenStream:
+    """
+    Sequência de tokens sobre um código-fonte.
+
+    Atributos:
+        fonte (str): O código analisado (ou os lexemas concatenados, se criado por de_lista).
+        tipos (array 'B'): Código de tipo de cada token (índice em analisador.TIPOS_TOKEN).
+        inicios, fins (array 'I'): Offsets do lexema de cada token em 'fonte'.
+        lexemas (simbolos.Lexemas): Tabela de lexemas internados, compartilhada com o léxico
+                                    que produziu os tokens (veja simbolo).
+
+    Indexar ou iterar devolve listas [linha, lexema, tipo, coluna], como em analisar_codigo.
+    """
+
+    def __init__(self, fonte, tipos=None, inicios=None, fins=None, inicios_linha=None, linhas=None, colunas=None, lexemas=None):
+        self.fonte = fonte
+        self.lexemas = lexemas if lexemas is not None else Lexemas()
+        self.tipos = tipos if tipos is not None else array('B')
+        self.inicios = inicios if inicios is not None else array('I')
+        self.fins = fins if fins is not None else array('I')
+        self._inicios_linha = inicios_linha
+        # Só usados por streams criados a partir de listas, onde os offsets não dizem a linha
+        self._linhas = linhas
+        self._colunas = colunas
+
+    @classmethod
+    def de_lista(cls, tokens):
+        """Cria um TokenStream a partir de tokens no formato [linha, lexema, tipo(, coluna)]."""
+        partes = []
+        fluxo = cls('', linhas=array('I'), colunas=array('I'))
+        offset = 0
+        for token in tokens:
+            lexema = token[1]
+            partes.append(lexema)
+            fluxo.tipos.append(CODIGO_TIPO[token[2]])
+            fluxo.inicios.append(offset)
+            offset += len(lexema)
+            fluxo.fins.append(offset)
+            fluxo._linhas.append(token[0])
+            fluxo._colunas.append(token[3] if len(token) > 3 else 0)
+        fluxo.fonte = ''.join(partes)
+        return fluxo
+
+    def __len__(self):
+        return len(self.tipos)
+
+    @property
+    def inicios_linha(self):
+        if self._inicios_linha is None:
+            self._inicios_linha = _inicios_de_linha(self.fonte)
+        return self._inicios_linha
+
+    def lexema(self, indice):
+        return self.fonte[self.inicios[indice]:self.fins[indice]]
+
+    def simbolo(self, indice):
+        """Id do lexema do token em self.lexemas (internado aqui se o léxico não o internou)."""
+        return self.lexemas.internar(self.fonte[self.inicios[indice]:self.fins[indice]])
+
+    def tipo(self, indice):
+        return TIPOS_TOKEN[self.tipos[indice]]
+
+    def linha(self, indice):
+        if self._linhas is not None:
+            return self._linhas[indice]
+        return bisect_right(self.inicios_linha, self.inicios[indice])
+
+    def coluna(self, indice):
+        if self._colunas is not None:
+            return self._colunas[indice]
+        inicio = self.inicios[indice]
+        return inicio - self.inicios_linha[bisect_right(self.inicios_linha, inicio) - 1] + 1
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError('índice de token fora do intervalo')
+        return [self.linha(indice), self.lexema(indice), self.tipo(indice), self.coluna(indice)]
+
+    def __iter__(self):
+        if self._linhas is not None:
+            for indice in range(len(self)):
+                yield self[indice]
+            return
+        # Percorre os inicios de linha junto com os tokens, sem busca binária por token
+        fonte, inicios, fins, tipos = self.fonte, self.inicios, self.fins, self.tipos
+        inicios_linha = self.inicios_linha
+        total_linhas = len(inicios_linha)
+        num_linha = 1
+        for indice in range(len(tipos)):
+            inicio = inicios[indice]
+            while num_linha < total_linhas and inicios_linha[num_linha] <= inicio:
+                num_linha += 1
+            yield [num_linha, fonte[inicio:fins[indice]], TIPOS_TOKEN[tipos[indice]], inicio - inicios_linha[num_linha - 1] + 1]
+
+    def filtrar(self, tipos_excluidos):
+        """Novo TokenStream, sobre a mesma fonte, sem os tokens cujos tipos (nomes) estão em 'tipos_excluidos'."""
+        excluidos = {CODIGO_TIPO[tipo] for tipo in tipos_excluidos if tipo in CODIGO_TIPO}
+        manter = [indice for indice, codigo in enumerate(self.tipos) if codigo not in excluidos]
+        return TokenStream(
+            self.fonte,
+            array('B', [self.tipos[i] for i in manter]),
+            array('I', [self.inicios[i] for i in manter]),
+            array('I', [self.fins[i] for i in manter]),
+            self._inicios_linha,
+            array('I', [self._linhas[i] for i in manter]) if self._linhas is not None else None,
+            array('I', [self._colunas[i] for i in manter]) if self._colunas is not None else None,
+            self.lexemas,
+        )
+
+
+def analisar_fluxo(codigo: str, motor: str = None, orcamento=None) -> dict:
+    """
+    Igual a analisador.analisar_codigo, mas devolve os tokens como um TokenStream e os erros
+    como diagnósticos estruturados (o texto só é montado na serialização). Com um
+    limites.Orcamento, a análise para no primeiro limite atingido (veja iter_tokens).
+
+    Returns:
+        dict: {'tokens': TokenStream, 'diagnosticos': [diagnosticos.Diagnostico]}.
+    """
+    fluxo = TokenStream(codigo)
+    inicios_linha = fluxo.inicios_linha
+    tipos, inicios, fins = fluxo.tipos, fluxo.inicios, fluxo.fins
+    diagnosticos = []
+
+    for evento, valor in iter_tokens(codigo, motor=motor, orcamento=orcamento, lexemas=fluxo.lexemas):
+        if evento == 'token':
+            num_linha, lexema, tipo, coluna = valor
+            inicio = inicios_linha[num_linha - 1] + coluna - 1
+            tipos.append(CODIGO_TIPO[tipo])
+            inicios.append(inicio)
+            fins.append(inicio + len(lexema))
+        else:
+            diagnosticos.append(valor)
+
+    return {'tokens': fluxo, 'diagnosticos': diagnosticos}
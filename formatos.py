@@ -0,0 +1,108 @@
+"""
+Formatos de resposta das rotas de análise, escolhidos pelo cabeçalho Accept.
+
+    application/json                     -> lista de objetos (analise.montar_saida), o padrão
+    application/vnd.birl.colunar+json    -> colunas (analise.montar_colunar)
+    application/msgpack                  -> as mesmas colunas em MessagePack (se o pacote
+                                            'msgpack' estiver instalado)
+    application/x-ndjson                 -> um objeto por linha, enviado em fluxo enquanto a
+                                            análise roda (analise.itens_em_fluxo)
+
+Corpos grandes são comprimidos com brotli (se o pacote 'brotli' estiver instalado) ou gzip,
+conforme o Accept-Encoding do cliente.
+"""
+import gzip
+import json
+import os
+
+try:
+    import msgpack
+except ImportError: # Opcional: sem ele o formato binário não é oferecido
+    msgpack = None
+
+try:
+    import brotli
+except ImportError: # Opcional: sem ele só há gzip
+    brotli = None
+
+JSON = 'application/json'
+COLUNAR = 'application/vnd.birl.colunar+json'
+MSGPACK = 'application/msgpack'
+NDJSON = 'application/x-ndjson'
+
+# Em ordem de preferência: com 'Accept: */*' (ou sem Accept) vale o primeiro, o formato de sempre
+FORMATOS = (JSON, COLUNAR) + ((MSGPACK,) if msgpack is not None else ()) + (NDJSON,)
+
+# Linhas NDJSON juntadas em cada pedaço enviado (menos escritas no socket)
+LINHAS_POR_PEDACO = 256
+
+CODIFICACOES = (('br',) if brotli is not None else ()) + ('gzip',)
+
+# Corpos menores que isso não compensam a compressão
+MIN_BYTES_COMPRESSAO = int(os.environ.get('BIRL_COMPRIMIR_MIN', 1024))
+
+
+def escolher_formato(accept):
+    """
+    Formato da resposta para um werkzeug MIMEAccept (request.accept_mimetypes).
+
+    Um Accept que não casa com nenhum formato continua recebendo o JSON de sempre.
+    """
+    return accept.best_match(FORMATOS, default=JSON) if accept else JSON
+
+
+def escolher_codificacao(accept_encoding, tamanho):
+    """Content-Encoding para um corpo de 'tamanho' bytes ('br', 'gzip' ou None para não comprimir)."""
+    if tamanho < MIN_BYTES_COMPRESSAO or not accept_encoding:
+        return None
+    return accept_encoding.best_match(CODIFICACOES)
+
+
+def serializar_colunar(colunas, formato):
+    """Bytes do resultado de analise.montar_colunar no formato COLUNAR ou MSGPACK."""
+    if formato == MSGPACK:
+        return msgpack.packb(colunas, use_bin_type=True)
+    return json.dumps(colunas, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def comprimir(corpo, codificacao):
+    """Corpo comprimido com a codificação escolhida por escolher_codificacao."""
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=5)
+    if codificacao == 'gzip':
+        return gzip.compress(corpo, compresslevel=6, mtime=0)
+    return corpo
+
+
+def ndjson(itens, orcamento=None):
+    """
+    Gera os pedaços (bytes) de uma resposta NDJSON: um objeto por item, com as mesmas chaves
+    (e a mesma ordem de chaves) dos objetos de /analisar.
+
+    Args:
+        itens: Tuplas (linha, coluna, lexema_ou_mensagem, tipo, categoria), ex.: analise.itens_em_fluxo.
+        orcamento (limites.Orcamento): Se informado, o aviso de análise truncada leva
+                                       'truncado' e 'limite', como em analise.montar_saida.
+    """
+    texto = json.dumps
+    nomes_tipo = {} # O tipo se repete muito: cada um é serializado uma vez só
+    linhas = []
+    for linha, coluna, lexema_ou_mensagem, tipo, categoria in itens:
+        if categoria == 'aviso' and orcamento is not None:
+            linhas.append(texto({
+                'categoria': categoria, 'coluna': coluna, 'lexema_ou_mensagem': lexema_ou_mensagem,
+                'limite': orcamento.estourado, 'linha': linha, 'tipo': tipo, 'truncado': True,
+            }, separators=(',', ':')))
+        else:
+            nome_tipo = nomes_tipo.get(tipo)
+            if nome_tipo is None:
+                nome_tipo = nomes_tipo[tipo] = texto(tipo)
+            linhas.append(
+                f'{{"categoria":"{categoria}","coluna":{coluna},"lexema_ou_mensagem":{texto(lexema_ou_mensagem)},'
+                f'"linha":{texto(linha)},"tipo":{nome_tipo}}}'
+            )
+        if len(linhas) == LINHAS_POR_PEDACO:
+            yield ('\n'.join(linhas) + '\n').encode('utf-8')
+            linhas = []
+    if linhas:
+        yield ('\n'.join(linhas) + '\n').encode('utf-8')
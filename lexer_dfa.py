@@ -0,0 +1,539 @@
+"""
+Gerador de lexer por tabelas (autômato finito determinístico) a partir de TOKEN_SPEC.
+
+O TOKEN_SPEC é compilado em um AFN (construção de Thompson) e depois, por construção de
+subconjuntos, em um AFD cujas tabelas ficam em cache no disco, com o nome derivado do hash
+do TOKEN_SPEC: nas próximas execuções as tabelas são só carregadas.
+
+A semântica é a mesma da alternância de token_regex: vence o primeiro padrão da lista que
+casar na posição, e dentro dele o casamento mais longo (o que os quantificadores gulosos de
+TOKEN_SPEC produzem). As âncoras '\\b' e '$' são resolvidas olhando o caractere anterior
+(guardado no estado) e o próximo caractere (na tabela de aceitação).
+
+Uso para comparar os dois motores: python lexer_dfa.py [arquivo ...] [--reconstruir]
+"""
+import hashlib
+import json
+import os
+import sys
+
+from analisador import TOKEN_SPEC
+
+# Mudar sempre que o formato das tabelas ou a construção do autômato mudar (invalida o cache)
+VERSAO_TABELAS = 1
+
+_PASTA_CACHE = os.environ.get('BIRL_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+_INFINITO = 1 << 30
+
+
+# --- Parser do subconjunto de expressões regulares usado em TOKEN_SPEC ---
+
+_ESCAPES_CARACTERE = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+
+class _LeitorRegex:
+    """
+    Converte um padrão em árvore: ('alt', [...]), ('seq', [...]), ('rep', no, min, max_ilimitado),
+    ('atomo', atomo) ou ('ancora', 'b' | 'B' | '$').
+
+    Átomos: ('lit', c), ('digito',), ('ponto',) ou ('conj', negado, frozenset(caracteres), tem_digito).
+    """
+
+    def __init__(self, padrao):
+        self.padrao = padrao
+        self.pos = 0
+
+    def erro(self, mensagem):
+        raise ValueError(f"Padrão '{self.padrao}' não suportado pelo lexer DFA: {mensagem} (posição {self.pos}).")
+
+    def ler(self):
+        arvore = self.alternancia()
+        if self.pos != len(self.padrao):
+            self.erro("parêntese ')' sem abertura")
+        return arvore
+
+    def alternancia(self):
+        ramos = [self.sequencia()]
+        while self.pos < len(self.padrao) and self.padrao[self.pos] == '|':
+            self.pos += 1
+            ramos.append(self.sequencia())
+        return ramos[0] if len(ramos) == 1 else ('alt', ramos)
+
+    def sequencia(self):
+        itens = []
+        while self.pos < len(self.padrao) and self.padrao[self.pos] not in '|)':
+            item = self.item()
+            while self.pos < len(self.padrao) and self.padrao[self.pos] in '*+?':
+                quantificador = self.padrao[self.pos]
+                self.pos += 1
+                if item[0] == 'ancora':
+                    self.erro('quantificador aplicado a uma âncora')
+                item = ('rep', item, 1 if quantificador == '+' else 0, quantificador != '?')
+            itens.append(item)
+        return ('seq', itens)
+
+    def item(self):
+        c = self.padrao[self.pos]
+        self.pos += 1
+        if c == '(':
+            if self.padrao.startswith('?:', self.pos):
+                self.pos += 2
+            elif self.padrao.startswith('?', self.pos):
+                self.erro('grupo especial')
+            arvore = self.alternancia()
+            if self.pos >= len(self.padrao) or self.padrao[self.pos] != ')':
+                self.erro("parêntese '(' sem fechamento")
+            self.pos += 1
+            return arvore
+        if c == '[':
+            return ('atomo', self.conjunto())
+        if c == '.':
+            return ('atomo', ('ponto',))
+        if c == '$':
+            return ('ancora', '$')
+        if c in '^{':
+            self.erro(f"'{c}'")
+        if c == '\\':
+            return self.escape()
+        return ('atomo', ('lit', c))
+
+    def escape(self):
+        if self.pos >= len(self.padrao):
+            self.erro('barra invertida no fim do padrão')
+        c = self.padrao[self.pos]
+        self.pos += 1
+        if c in 'bB':
+            return ('ancora', c)
+        if c == 'd':
+            return ('atomo', ('digito',))
+        if c in _ESCAPES_CARACTERE:
+            return ('atomo', ('lit', _ESCAPES_CARACTERE[c]))
+        if c.isalnum():
+            self.erro(f"escape '\\{c}'")
+        return ('atomo', ('lit', c))
+
+    def conjunto(self):
+        negado = self.padrao.startswith('^', self.pos)
+        if negado:
+            self.pos += 1
+        caracteres = set()
+        tem_digito = False
+        primeiro = True
+        while True:
+            if self.pos >= len(self.padrao):
+                self.erro("colchete '[' sem fechamento")
+            c = self.padrao[self.pos]
+            self.pos += 1
+            if c == ']' and not primeiro:
+                break
+            primeiro = False
+            if c == '\\':
+                e = self.padrao[self.pos]
+                self.pos += 1
+                if e == 'd':
+                    tem_digito = True
+                    continue
+                if e.isalnum() and e not in _ESCAPES_CARACTERE:
+                    self.erro(f"escape '\\{e}' dentro de conjunto")
+                c = _ESCAPES_CARACTERE.get(e, e)
+            if self.padrao.startswith('-', self.pos) and self.pos + 1 < len(self.padrao) and self.padrao[self.pos + 1] != ']':
+                fim = self.padrao[self.pos + 1]
+                self.pos += 2
+                if fim == '\\':
+                    fim = self.padrao[self.pos]
+                    self.pos += 1
+                if ord(fim) - ord(c) > 0xFF:
+                    self.erro('intervalo grande demais')
+                caracteres.update(chr(o) for o in range(ord(c), ord(fim) + 1))
+            else:
+                caracteres.add(c)
+        return ('conj', negado, frozenset(caracteres), tem_digito)
+
+
+def _eh_palavra(c):
+    # Mesma definição de '\w' do módulo re para strings
+    return c.isalnum() or c == '_'
+
+
+def _contem(atomo, c):
+    tipo = atomo[0]
+    if tipo == 'lit':
+        return c == atomo[1]
+    if tipo == 'digito':
+        return c.isdecimal()
+    if tipo == 'ponto':
+        return c != '\n'
+    _, negado, caracteres, tem_digito = atomo
+    return (c in caracteres or (tem_digito and c.isdecimal())) != negado
+
+
+def _contem_generico(atomo, eh_decimal):
+    # Caracteres que não aparecem explicitamente em nenhum padrão só se distinguem por '\d' e '\w'
+    tipo = atomo[0]
+    if tipo == 'lit':
+        return False
+    if tipo in ('digito', 'ponto'):
+        return eh_decimal if tipo == 'digito' else True
+    _, negado, _, tem_digito = atomo
+    return (tem_digito and eh_decimal) != negado
+
+
+# --- AFN (Thompson) ---
+
+class _AFN:
+    def __init__(self):
+        self.vazias = []      # nó -> [destino] (transições vazias)
+        self.ancoras = []     # nó -> [(ancora, destino)]
+        self.simbolos = []    # nó -> [(indice_atomo, destino)]
+        self.aceita = {}      # nó -> índice da regra
+        self.atomos = []
+        self._indice_atomo = {}
+
+    def novo_no(self):
+        self.vazias.append([])
+        self.ancoras.append([])
+        self.simbolos.append([])
+        return len(self.vazias) - 1
+
+    def atomo(self, atomo):
+        if atomo not in self._indice_atomo:
+            self._indice_atomo[atomo] = len(self.atomos)
+            self.atomos.append(atomo)
+        return self._indice_atomo[atomo]
+
+    def construir(self, arvore, inicio, fim):
+        tipo = arvore[0]
+        if tipo == 'atomo':
+            self.simbolos[inicio].append((self.atomo(arvore[1]), fim))
+        elif tipo == 'ancora':
+            self.ancoras[inicio].append((arvore[1], fim))
+        elif tipo == 'seq':
+            atual = inicio
+            for item in arvore[1]:
+                proximo = self.novo_no()
+                self.construir(item, atual, proximo)
+                atual = proximo
+            self.vazias[atual].append(fim)
+        elif tipo == 'alt':
+            for ramo in arvore[1]:
+                self.construir(ramo, inicio, fim)
+        else:  # 'rep'
+            _, filho, minimo, ilimitado = arvore
+            atual = inicio
+            for _ in range(minimo):
+                proximo = self.novo_no()
+                self.construir(filho, atual, proximo)
+                atual = proximo
+            if ilimitado:
+                laco = self.novo_no()
+                self.vazias[atual].append(laco)
+                corpo = self.novo_no()
+                self.construir(filho, laco, corpo)
+                self.vazias[corpo].append(laco)
+                self.vazias[laco].append(fim)
+            elif minimo == 0:
+                self.construir(filho, atual, fim)
+                self.vazias[atual].append(fim)
+            else:
+                self.vazias[atual].append(fim)
+
+
+def _gerar_tabelas(token_spec):
+    """Constrói o AFD de TOKEN_SPEC e devolve as tabelas em um dicionário serializável em JSON."""
+    afn = _AFN()
+    inicios = []
+    for indice, (_, padrao) in enumerate(token_spec):
+        inicio, fim = afn.novo_no(), afn.novo_no()
+        afn.construir(_LeitorRegex(padrao).ler(), inicio, fim)
+        afn.aceita[fim] = indice
+        inicios.append(inicio)
+
+    # Classes de caracteres: caracteres explícitos agrupados pela "assinatura" (a quais átomos
+    # pertencem e se são de palavra) + três classes genéricas para todo o resto.
+    explicitos = set()
+    for atomo in afn.atomos:
+        if atomo[0] == 'lit':
+            explicitos.add(atomo[1])
+        elif atomo[0] == 'conj':
+            explicitos.update(atomo[2])
+    explicitos.add('\n')
+
+    assinaturas = {}
+    classe_de_explicito = {}
+    for c in sorted(explicitos):
+        assinatura = (tuple(_contem(a, c) for a in afn.atomos), _eh_palavra(c))
+        classe_de_explicito[c] = assinaturas.setdefault(assinatura, len(assinaturas))
+    classes_genericas = {}
+    for eh_decimal, eh_palavra in ((False, False), (False, True), (True, True)):
+        assinatura = (tuple(_contem_generico(a, eh_decimal) for a in afn.atomos), eh_palavra)
+        classes_genericas[f'{int(eh_decimal)}{int(eh_palavra)}'] = assinaturas.setdefault(assinatura, len(assinaturas))
+
+    total_classes = len(assinaturas)
+    classe_fim = total_classes  # "próximo caractere" quando o texto acabou
+    palavra_da_classe = [False] * (total_classes + 1)
+    atomos_da_classe = [None] * total_classes
+    for (pertence, eh_palavra), classe in assinaturas.items():
+        palavra_da_classe[classe] = eh_palavra
+        atomos_da_classe[classe] = pertence
+
+    # Menor regra alcançável a partir de cada nó do AFN (para parar a varredura cedo)
+    total_nos = len(afn.vazias)
+    alcance = [_INFINITO] * total_nos
+    predecessores = [[] for _ in range(total_nos)]
+    for no in range(total_nos):
+        for destino in afn.vazias[no]:
+            predecessores[destino].append(no)
+        for _, destino in afn.ancoras[no]:
+            predecessores[destino].append(no)
+        for _, destino in afn.simbolos[no]:
+            predecessores[destino].append(no)
+    pendentes = []
+    for no, regra in afn.aceita.items():
+        alcance[no] = regra
+        pendentes.append(no)
+    while pendentes:
+        no = pendentes.pop()
+        for anterior in predecessores[no]:
+            if alcance[no] < alcance[anterior]:
+                alcance[anterior] = alcance[no]
+                pendentes.append(anterior)
+
+    def fecho(nucleo, anterior_palavra, classe):
+        # Transições vazias + âncoras que valem entre o caractere anterior e 'classe'
+        proxima_palavra = palavra_da_classe[classe]
+        fim_do_texto = classe == classe_fim
+        vistos = set(nucleo)
+        pilha = list(nucleo)
+        while pilha:
+            no = pilha.pop()
+            destinos = list(afn.vazias[no])
+            for ancora, destino in afn.ancoras[no]:
+                if ((ancora == 'b' and anterior_palavra != proxima_palavra)
+                        or (ancora == 'B' and anterior_palavra == proxima_palavra)
+                        or (ancora == '$' and fim_do_texto)):
+                    destinos.append(destino)
+            for destino in destinos:
+                if destino not in vistos:
+                    vistos.add(destino)
+                    pilha.append(destino)
+        return vistos
+
+    estados = {}
+    fila = []
+
+    def estado(nucleo, anterior_palavra):
+        chave = (nucleo, anterior_palavra)
+        if chave not in estados:
+            estados[chave] = len(fila)
+            fila.append(chave)
+        return estados[chave]
+
+    inicio = [estado(frozenset(inicios), False), estado(frozenset(inicios), True)]
+    transicoes = []
+    aceitacao = []
+    menor_viva = []
+    processados = 0
+    while processados < len(fila):
+        nucleo, anterior_palavra = fila[processados]
+        processados += 1
+        linha_transicoes = []
+        linha_aceitacao = []
+        for classe in range(total_classes + 1):
+            nos = fecho(nucleo, anterior_palavra, classe)
+            regras = [afn.aceita[no] for no in nos if no in afn.aceita]
+            linha_aceitacao.append(min(regras) if regras else -1)
+            if classe == classe_fim:
+                continue
+            pertence = atomos_da_classe[classe]
+            destino = frozenset(d for no in nos for atomo, d in afn.simbolos[no] if pertence[atomo])
+            linha_transicoes.append(estado(destino, palavra_da_classe[classe]) if destino else -1)
+        transicoes.append(linha_transicoes)
+        aceitacao.append(linha_aceitacao)
+        menor_viva.append(min((alcance[no] for no in nucleo), default=_INFINITO))
+
+    return {
+        'versao': VERSAO_TABELAS,
+        'nomes': [nome for nome, _ in token_spec],
+        'classe_de_explicito': classe_de_explicito,
+        'classes_genericas': classes_genericas,
+        'palavra_da_classe': palavra_da_classe,
+        'classe_fim': classe_fim,
+        'inicio': inicio,
+        'transicoes': transicoes,
+        'aceitacao': aceitacao,
+        'menor_viva': menor_viva,
+    }
+
+
+def chave_do_spec(token_spec):
+    """Hash que identifica as tabelas geradas para um TOKEN_SPEC."""
+    conteudo = json.dumps([VERSAO_TABELAS, token_spec], ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+
+
+def carregar_tabelas(token_spec, reconstruir=False):
+    """Lê as tabelas do cache em disco ou as gera (e tenta gravá-las) se não existirem."""
+    caminho = os.path.join(_PASTA_CACHE, f'lexer_dfa-{chave_do_spec(token_spec)}.json')
+    if not reconstruir:
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                tabelas = json.load(arquivo)
+            if tabelas.get('versao') == VERSAO_TABELAS:
+                return tabelas
+        except (OSError, ValueError):
+            pass
+
+    tabelas = _gerar_tabelas(token_spec)
+    try:
+        os.makedirs(_PASTA_CACHE, exist_ok=True)
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(tabelas, arquivo, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporario, caminho)
+    except OSError:
+        pass  # Sem cache (ex.: pasta somente leitura): as tabelas continuam valendo em memória
+    return tabelas
+
+
+class _Match:
+    """Imita a parte de re.Match que analisador.iter_tokens usa."""
+    __slots__ = ('lastgroup', 'string', '_inicio', '_fim')
+
+    def __init__(self, tipo, texto, inicio, fim):
+        self.lastgroup = tipo
+        self.string = texto
+        self._inicio = inicio
+        self._fim = fim
+
+    def group(self, _grupo=None):
+        return self.string[self._inicio:self._fim]
+
+    def start(self, _grupo=None):
+        return self._inicio
+
+    def end(self, _grupo=None):
+        return self._fim
+
+
+class LexerDFA:
+    """Executa as tabelas geradas a partir de TOKEN_SPEC sobre uma linha de código."""
+
+    def __init__(self, tabelas):
+        self.nomes = tabelas['nomes']
+        self.inicio = tabelas['inicio']
+        self.transicoes = tabelas['transicoes']
+        self.aceitacao = tabelas['aceitacao']
+        self.menor_viva = tabelas['menor_viva']
+        self.classe_fim = tabelas['classe_fim']
+        self.palavra_da_classe = tabelas['palavra_da_classe']
+        self._explicitos = tabelas['classe_de_explicito']
+        self._genericas = tabelas['classes_genericas']
+        self._cache_classes = {}
+        # Tabela direta para Latin-1, que cobre quase todo código BIRL!
+        self._latin1 = [self._calcular_classe(chr(o)) for o in range(256)]
+
+    def _calcular_classe(self, c):
+        classe = self._explicitos.get(c)
+        if classe is None:
+            classe = self._genericas[f'{int(c.isdecimal())}{int(_eh_palavra(c))}']
+        return classe
+
+    def classes(self, texto):
+        latin1 = self._latin1
+        cache = self._cache_classes
+        resultado = []
+        for c in texto:
+            o = ord(c)
+            if o < 256:
+                resultado.append(latin1[o])
+            else:
+                classe = cache.get(c)
+                if classe is None:
+                    classe = cache[c] = self._calcular_classe(c)
+                resultado.append(classe)
+        return resultado
+
+    def finditer(self, texto):
+        """Gera um _Match por token de 'texto' (uma linha sem quebras), como token_regex.finditer."""
+        classes = self.classes(texto)
+        tamanho = len(classes)
+        transicoes = self.transicoes
+        aceitacao = self.aceitacao
+        menor_viva = self.menor_viva
+        palavra_da_classe = self.palavra_da_classe
+        classe_fim = self.classe_fim
+        pos = 0
+        while pos < tamanho:
+            estado = self.inicio[1 if pos > 0 and palavra_da_classe[classes[pos - 1]] else 0]
+            melhor = _INFINITO
+            fim = pos
+            i = pos
+            while True:
+                classe = classes[i] if i < tamanho else classe_fim
+                if i > pos:
+                    regra = aceitacao[estado][classe]
+                    if 0 <= regra <= melhor:
+                        melhor = regra
+                        fim = i
+                if i == tamanho:
+                    break
+                estado = transicoes[estado][classe]
+                if estado < 0 or menor_viva[estado] > melhor:
+                    break
+                i += 1
+            if melhor == _INFINITO:
+                pos += 1  # Nenhum padrão casa aqui; finditer também pularia o caractere
+                continue
+            yield _Match(self.nomes[melhor], texto, pos, fim)
+            pos = fim
+
+
+_lexer_padrao = None
+
+
+def lexer_padrao():
+    """LexerDFA do TOKEN_SPEC atual, construído (ou lido do cache) no primeiro uso."""
+    global _lexer_padrao
+    if _lexer_padrao is None:
+        _lexer_padrao = LexerDFA(carregar_tabelas(TOKEN_SPEC))
+    return _lexer_padrao
+
+
+def main(argumentos):
+    from analisador import analisar_codigo
+
+    reconstruir = '--reconstruir' in argumentos
+    caminhos = [a for a in argumentos if a != '--reconstruir']
+    if not caminhos:
+        pasta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cod_teste')
+        caminhos = [os.path.join(pasta, nome) for nome in sorted(os.listdir(pasta))]
+
+    global _lexer_padrao
+    _lexer_padrao = LexerDFA(carregar_tabelas(TOKEN_SPEC, reconstruir=reconstruir))
+    print(f"Tabelas: {len(_lexer_padrao.transicoes)} estados, {_lexer_padrao.classe_fim} classes de caracteres")
+
+    diferentes = 0
+    for caminho in caminhos:
+        with open(caminho, encoding='utf-8') as arquivo:
+            codigo = arquivo.read()
+        resultado_regex = analisar_codigo(codigo, motor='regex')
+        resultado_dfa = analisar_codigo(codigo, motor='dfa')
+        if resultado_regex == resultado_dfa:
+            print(f"{caminho}: idênticos ({len(resultado_dfa['tokens'])} tokens)")
+            continue
+        diferentes += 1
+        print(f"{caminho}: DIFERENTES")
+        for chave in ('tokens', 'erros_estrutura'):
+            for a, b in zip(resultado_regex[chave], resultado_dfa[chave]):
+                if a != b:
+                    print(f"  {chave}: regex={a!r} dfa={b!r}")
+                    break
+            else:
+                if len(resultado_regex[chave]) != len(resultado_dfa[chave]):
+                    print(f"  {chave}: regex tem {len(resultado_regex[chave])} itens, dfa tem {len(resultado_dfa[chave])}")
+    return 1 if diferentes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
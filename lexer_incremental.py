@@ -0,0 +1,297 @@
+"""
+Análise léxica incremental para o editor ao vivo.
+
+Um DocumentoIncremental guarda, para cada linha do documento, os tokens e erros que ela gerou
+e o estado léxico (EstadoLexico) com que a linha começou. Ao editar um intervalo de linhas,
+só as linhas novas são re-analisadas, seguidas das linhas seguintes até o estado voltar a ser
+igual ao da análise anterior (delimitadores abertos, variáveis declaradas, token significativo
+anterior...). Daí em diante a saída antiga é reaproveitada, com os números de linha ajustados.
+
+O resultado é sempre idêntico ao de analisador.analisar_codigo sobre o texto completo.
+
+Só o léxico é incremental. fluxo() monta a cada chamada o TokenStream do documento inteiro (a
+partir dos tokens guardados por linha, sem passar o léxico de novo), e quem analisa o resultado
+(o sintático e o semântico em /analisar/incremental) percorre o documento inteiro: o custo de
+uma edição nas rotas ainda cresce com o tamanho do documento.
+
+Um DocumentoIncremental não é thread-safe: quem o compartilha entre threads usa um lock.
+"""
+import sys
+from array import array
+from itertools import chain
+
+from analisador import (
+    CODIGO_TIPO, EstadoLexico, _FIM_DE_LINHA, _QUEBRA_LINHA, _analisar_matches, _verificacoes_finais,
+    token_regex,
+)
+from diagnosticos import Diagnostico, renderizar
+from fluxo_tokens import TokenStream
+from simbolos import Lexemas
+
+
+class _Declaradas(set):
+    # Conjunto de variáveis declaradas que anota, em 'ordem', cada nome na primeira vez que entra
+    def __init__(self, nomes, ordem):
+        super().__init__(nomes)
+        self.ordem = ordem
+
+    def add(self, nome):
+        if nome not in self:
+            self.ordem.append(nome)
+            super().add(nome)
+
+
+# Linhas analisadas entre duas consultas ao relógio na abertura de um documento com orçamento
+_LINHAS_POR_BLOCO = 1024
+
+
+class DocumentoGrandeDemais(ValueError):
+    """A edição deixaria o documento maior que o limite de caracteres."""
+
+
+def _dividir_linhas(texto):
+    # Mesmas quebras de linha do analisador; a linha final sem quebra também conta
+    return _QUEBRA_LINHA.split(texto)
+
+
+class DocumentoIncremental:
+    """
+    Documento BIRL mantido em memória entre edições.
+
+    Atributos (internos):
+        _linhas (list[str]): Texto de cada linha, sem a quebra.
+        _tokens (list[tuple]): Por linha, tuplas (lexema, tipo, coluna).
+        _erros (list[tuple]): Por linha, diagnósticos sem o número da linha, como tuplas
+                              (codigo, coluna, args), para renumerar sem re-analisar.
+        _estados (list[tuple]): Estado antes de cada linha (e após a última):
+                                (pilha de delimitadores, tipo significativo anterior,
+                                 primeiro tipo, último tipo, quantidade de variáveis declaradas).
+        _declaradas (list[str]): Variáveis na ordem de declaração; o estado da linha k
+                                 declara as _estados[k][4] primeiras.
+        _lexemas (simbolos.Lexemas): Identificadores e palavras-chave internados, compartilhados
+                                     pelos tokens de todas as linhas e edições (só cresce).
+    """
+
+    def __init__(self, codigo='', orcamento=None):
+        """
+        Abre o documento com o texto 'codigo'. Com um orcamento (limites.Orcamento), o prazo dele
+        vale para essa primeira análise: se ele passa, o documento fica só com as linhas já
+        analisadas e o estouro fica em orcamento.estourado (o documento não é o texto inteiro).
+        """
+        self._linhas = []
+        self._tokens = []
+        self._erros = []
+        self._estados = [((), None, None, None, 0)]
+        self._declaradas = []
+        self._lexemas = Lexemas()
+        self._caracteres = 0 # Soma dos tamanhos das linhas (sem as quebras)
+        # Linhas re-analisadas na última edição (útil para medir o ganho)
+        self.linhas_reanalisadas = 0
+        if orcamento is None:
+            self.editar(1, 0, codigo)
+            return
+        linhas = _dividir_linhas(codigo)
+        for inicio in range(0, len(linhas), _LINHAS_POR_BLOCO):
+            if inicio and orcamento.sem_tempo():
+                break
+            # Cada bloco entra no fim do documento, continuando do estado da linha anterior
+            self.editar(len(self._linhas) + 1, len(self._linhas), '\n'.join(linhas[inicio:inicio + _LINHAS_POR_BLOCO]))
+
+    def __len__(self):
+        return len(self._linhas)
+
+    @property
+    def texto(self):
+        return '\n'.join(self._linhas)
+
+    @property
+    def caracteres(self):
+        """len(self.texto), sem montar o texto."""
+        return self._caracteres + max(len(self._linhas) - 1, 0)
+
+    def _analisar_linha(self, texto_linha, estado):
+        tokens, erros = [], []
+        matches = chain(token_regex.finditer(texto_linha), (_FIM_DE_LINHA,))
+        for evento, valor in _analisar_matches(matches, estado, set()):
+            if evento == 'token':
+                tokens.append((valor[1], valor[2], valor[3]))
+            else:
+                erros.append((valor.codigo, valor.coluna, valor.args))
+        return tuple(tokens), tuple(erros)
+
+    def editar(self, linha_inicio, linha_fim, texto, max_caracteres=None):
+        """
+        Substitui as linhas linha_inicio..linha_fim (1-based, inclusivas) pelas linhas de 'texto'.
+
+        Com linha_fim = linha_inicio - 1 o texto é inserido antes de linha_inicio, sem remover
+        nada; com texto None as linhas são apenas removidas. Com max_caracteres, uma edição que
+        deixaria o documento maior que isso é recusada (o documento não muda).
+
+        Raises:
+            ValueError: Se o intervalo não existe no documento.
+            TypeError: Se o texto não é str nem None.
+            DocumentoGrandeDemais: Se o documento passaria de max_caracteres.
+        """
+        total = len(self._linhas)
+        if not (1 <= linha_inicio <= total + 1 and linha_inicio - 1 <= linha_fim <= total):
+            raise ValueError(f"Intervalo de linhas inválido: {linha_inicio}..{linha_fim} (o documento tem {total} linhas).")
+        if texto is not None and not isinstance(texto, str):
+            raise TypeError("O texto da edição deve ser uma string (ou null).")
+
+        a, b = linha_inicio - 1, linha_fim # Fatia [a:b] das linhas antigas
+        novas = _dividir_linhas(texto) if texto is not None else []
+        delta = len(novas) - (b - a)
+        caracteres = self._caracteres - sum(map(len, self._linhas[a:b])) + sum(map(len, novas))
+        if max_caracteres is not None and caracteres + max(total + delta - 1, 0) > max_caracteres:
+            raise DocumentoGrandeDemais(f"O documento passaria do limite de {max_caracteres} caracteres.")
+
+        estados_antigos = self._estados
+        declaradas_antigas = self._declaradas
+        pilha, anterior, primeiro_tipo, ultimo_tipo, qtd_declaradas = estados_antigos[a]
+
+        ordem = declaradas_antigas[:qtd_declaradas]
+        estado = EstadoLexico(self._lexemas)
+        estado.num_linha = a + 1
+        estado.declared_variables = _Declaradas(ordem, ordem)
+        estado.delimiters_stack = list(pilha)
+        estado.previous_meaningful_token_type = anterior
+        estado.primeiro_tipo = primeiro_tipo
+        estado.ultimo_tipo = ultimo_tipo
+
+        tokens, erros, estados = [], [], []
+
+        def analisar(texto_linha):
+            tokens_linha, erros_linha = self._analisar_linha(texto_linha, estado)
+            tokens.append(tokens_linha)
+            erros.append(erros_linha)
+            estados.append(self._capturar(estado))
+
+        for texto_linha in novas:
+            analisar(texto_linha)
+
+        # Segue pelas linhas antigas até o estado coincidir com o que elas já tinham
+        j = b
+        while j < total and not self._mesmo_estado(estado, ordem, qtd_declaradas, estados_antigos[j], declaradas_antigas, a, b, delta):
+            analisar(self._linhas[j])
+            j += 1
+
+        self.linhas_reanalisadas = len(novas) + (j - b)
+        if j < total:
+            # Estados iguais: as declarações seguintes são as mesmas de antes
+            ordem.extend(declaradas_antigas[estados_antigos[j][4]:])
+        self._declaradas = ordem
+        self._caracteres = caracteres
+        # Substituições no lugar: o trecho reaproveitado não é copiado
+        self._linhas[a:b] = novas
+        self._tokens[a:j] = tokens
+        self._erros[a:j] = erros
+        self._estados[a + 1:j + 1] = estados
+        if delta:
+            estados_seguintes = self._estados
+            for k in range(a + 1 + len(estados), len(estados_seguintes)):
+                if estados_seguintes[k][0]:
+                    estados_seguintes[k] = self._deslocar(estados_seguintes[k], b, delta)
+
+    @staticmethod
+    def _capturar(estado):
+        return (
+            tuple(estado.delimiters_stack), estado.previous_meaningful_token_type,
+            estado.primeiro_tipo, estado.ultimo_tipo, len(estado.declared_variables),
+        )
+
+    @staticmethod
+    def _deslocar(salvo, b, delta):
+        # Renumera as linhas da pilha de delimitadores de um estado posterior à edição
+        pilha = tuple((lexema, linha + delta if linha > b else linha, tipo, coluna) for lexema, linha, tipo, coluna in salvo[0])
+        return (pilha,) + salvo[1:]
+
+    @staticmethod
+    def _mesmo_estado(estado, ordem, qtd_inicial, salvo, declaradas_antigas, a, b, delta):
+        pilha, anterior, primeiro_tipo, ultimo_tipo, qtd_declaradas = salvo
+        if (anterior != estado.previous_meaningful_token_type or primeiro_tipo != estado.primeiro_tipo
+                or ultimo_tipo != estado.ultimo_tipo or qtd_declaradas != len(ordem)
+                or len(pilha) != len(estado.delimiters_stack)):
+            return False
+        for (lexema, linha, tipo, coluna), atual in zip(pilha, estado.delimiters_stack):
+            if a < linha <= b:
+                return False # Delimitador aberto em uma linha que não existe mais
+            if (lexema, linha + delta if linha > b else linha, tipo, coluna) != atual:
+                return False
+        # As declarações anteriores à edição são comuns; basta comparar as feitas depois dela
+        return set(ordem[qtd_inicial:]) == set(declaradas_antigas[qtd_inicial:qtd_declaradas])
+
+    def _diagnosticos(self, linhas=None):
+        # Erros das primeiras 'linhas' linhas (None: todas); as verificações do fim do programa
+        # só entram com o documento inteiro (linhas=None)
+        erros = self._erros if linhas is None else self._erros[:linhas]
+        diagnosticos = [
+            Diagnostico(codigo, num_linha, coluna, args)
+            for num_linha, erros_linha in enumerate(erros, 1)
+            for codigo, coluna, args in erros_linha
+        ]
+        if linhas is not None:
+            return diagnosticos
+        pilha, _, primeiro_tipo, ultimo_tipo, _ = self._estados[-1]
+        estado = EstadoLexico()
+        estado.delimiters_stack = list(pilha)
+        estado.primeiro_tipo = primeiro_tipo
+        estado.ultimo_tipo = ultimo_tipo
+        emitidos = set(diagnosticos)
+        diagnosticos.extend(diagnostico for _, diagnostico in _verificacoes_finais(estado, emitidos))
+        return diagnosticos
+
+    def resultado(self):
+        """Mesma saída de analisador.analisar_codigo sobre o texto atual do documento."""
+        tokens = [
+            [num_linha, lexema, tipo, coluna]
+            for num_linha, tokens_linha in enumerate(self._tokens, 1)
+            for lexema, tipo, coluna in tokens_linha
+        ]
+        return {'tokens': tokens, 'erros_estrutura': [renderizar(diagnostico) for diagnostico in self._diagnosticos()]}
+
+    def fluxo(self, orcamento=None):
+        """
+        Mesma saída de fluxo_tokens.analisar_fluxo sobre o texto atual do documento.
+
+        Com um orcamento (limites.Orcamento), os limites de tokens, de erros e de tempo do léxico
+        de analisador.iter_tokens valem aqui, conferidos linha a linha: ao atingir um, o
+        resultado para na linha anterior e o limite fica em orcamento.estourado. (O de
+        caracteres é conferido por editar, com max_caracteres.) Um orcamento já estourado (o
+        prazo passou na abertura do documento) não corta mais nada, mas o documento é tratado
+        como cortado: as verificações do fim do programa ficam de fora.
+        """
+        fluxo = TokenStream(self.texto, lexemas=self._lexemas)
+        tipos, inicios, fins = fluxo.tipos, fluxo.inicios, fluxo.fins
+        inicios_linha = array('I')
+        inicio_linha = 0
+        linhas = None # Linhas no resultado (None: todas)
+        if orcamento is not None and orcamento.estourado is not None:
+            linhas = len(self._linhas)
+            orcamento = None
+        if orcamento is not None:
+            max_tokens = orcamento.limites.tokens or sys.maxsize
+            max_erros = orcamento.limites.diagnosticos or sys.maxsize
+            erros = 0
+            conferir_relogio = 1024
+        for num_linha, (texto_linha, tokens_linha) in enumerate(zip(self._linhas, self._tokens)):
+            if orcamento is not None:
+                erros += len(self._erros[num_linha])
+                if erros > max_erros:
+                    orcamento.estourar('diagnosticos')
+                elif len(tipos) + len(tokens_linha) > max_tokens:
+                    orcamento.estourar('tokens')
+                elif len(tipos) >= conferir_relogio:
+                    conferir_relogio = len(tipos) + 1024
+                    orcamento.sem_tempo()
+                if orcamento.estourado is not None:
+                    linhas = num_linha
+                    break
+            inicios_linha.append(inicio_linha)
+            for lexema, tipo, coluna in tokens_linha:
+                inicio = inicio_linha + coluna - 1
+                tipos.append(CODIGO_TIPO[tipo])
+                inicios.append(inicio)
+                fins.append(inicio + len(lexema))
+            inicio_linha += len(texto_linha) + 1
+        fluxo._inicios_linha = inicios_linha
+        return {'tokens': fluxo, 'diagnosticos': self._diagnosticos(linhas)}
@@ -0,0 +1,140 @@
+"""
+Análise léxica de arquivos grandes direto dos bytes UTF-8, via mmap.
+
+Ler o arquivo em uma str e varrer a str mantém várias cópias da entrada na memória. Aqui o
+arquivo é mapeado (mmap) e varrido em blocos de linhas inteiras (BYTES_POR_BLOCO) com uma
+versão em bytes de token_regex_buffer, decodificando só os lexemas emitidos: o arquivo nunca
+vira uma str, e as páginas já lidas podem ser devolvidas pelo sistema. A memória fica
+praticamente independente do tamanho do arquivo.
+
+Em bytes, '\\b', '\\d' e '.' do módulo re só conhecem ASCII. Por isso a versão em bytes só é
+usada em blocos ASCII, em que ela casa exatamente como a versão str e o offset em bytes é a
+coluna. Um bloco com caracteres de vários bytes (ex.: o 'É' de 'TREINA ATÉ') é decodificado
+sozinho e varrido com token_regex_buffer, o que mantém as colunas contadas em caracteres e a
+mesma saída da análise da str.
+
+Uso: python lexer_mmap.py ARQUIVO [--resumo]   (tokens e erros em NDJSON no stdout)
+"""
+import argparse
+import json
+import mmap
+import re
+import sys
+from collections import Counter
+
+from analisador import _FIM_DE_LINHA, _fonte_regex_buffer, iter_tokens, token_regex_buffer
+from diagnosticos import renderizar
+
+# Tamanho aproximado de cada bloco varrido (o bloco vai até o fim da linha em que esse tamanho é atingido)
+BYTES_POR_BLOCO = 64 * 1024
+
+# token_regex_buffer sobre bytes UTF-8, só com as quebras de linha ASCII (exato em blocos ASCII)
+token_regex_bytes = re.compile(_fonte_regex_buffer(r'\n\r\x0b\x0c\x1c\x1d\x1e').encode('utf-8'))
+
+# As quebras de str.splitlines() em UTF-8 (\x85, \u2028 e \u2029 ocupam mais de um byte)
+_QUEBRA_LINHA_BYTES = re.compile(rb'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]')
+
+
+class _MatchBytes:
+    """Imita a parte de re.Match que analisador._analisar_matches usa, com o lexema já decodificado."""
+    __slots__ = ('lastgroup', 'lexema', 'inicio')
+
+    def __init__(self, tipo, lexema, inicio):
+        self.lastgroup = tipo
+        self.lexema = lexema
+        self.inicio = inicio
+
+    def group(self, _grupo=None):
+        return self.lexema
+
+    def start(self, _grupo=None):
+        return self.inicio
+
+    def end(self, _grupo=None):
+        return self.inicio + len(self.lexema)
+
+
+def _blocos(dados, tamanho=None):
+    """
+    Divide 'dados' em blocos de linhas inteiras de aproximadamente 'tamanho' bytes. Cada bloco
+    termina antes de uma quebra de linha, que fica fora dele (o último vai até o fim dos dados).
+    """
+    tamanho = tamanho or BYTES_POR_BLOCO
+    inicio = 0
+    fim_dados = len(dados)
+    while inicio < fim_dados:
+        quebra = _QUEBRA_LINHA_BYTES.search(dados, inicio + tamanho)
+        if quebra is None:
+            yield dados[inicio:], False
+            return
+        inicio_quebra = quebra.start()
+        if inicio_quebra > inicio and dados[inicio_quebra - 1:inicio_quebra] == b'\r' and quebra.group() == b'\n':
+            inicio_quebra -= 1 # A busca começou no meio de um '\r\n'
+        yield dados[inicio:inicio_quebra], True
+        inicio = quebra.end()
+
+
+def varrer_bytes(dados):
+    """
+    Varredura de um texto UTF-8 em bytes (bytes, bytearray ou mmap) para
+    analisador._analisar_matches: os mesmos tokens da varredura da str decodificada (os
+    espaços soltos, SKIP, que o analisador ignora, ficam de fora).
+
+    Raises:
+        UnicodeDecodeError: Se um bloco não for UTF-8 válido.
+    """
+    finditer_bytes = token_regex_bytes.finditer
+    finditer = token_regex_buffer.finditer
+    for bloco, cortado_em_quebra in _blocos(dados):
+        if bloco.isascii():
+            for match in finditer_bytes(bloco):
+                tipo = match.lastgroup
+                if tipo != 'SKIP':
+                    yield _MatchBytes(tipo, match.group(tipo).decode('ascii'), match.start(tipo))
+        else:
+            yield from finditer(bloco.decode('utf-8'))
+        if cortado_em_quebra:
+            # A quebra entre os blocos: próxima linha, com offsets recomeçando do zero no próximo bloco
+            yield _FIM_DE_LINHA
+
+
+def iter_tokens_arquivo(caminho, orcamento=None):
+    """
+    analisador.iter_tokens sobre um arquivo UTF-8 mapeado na memória (mesmos eventos que
+    iter_tokens(open(caminho).read()), sem ler o arquivo inteiro em uma str).
+
+    O arquivo fica mapeado enquanto o gerador é consumido.
+    """
+    with open(caminho, 'rb') as arquivo:
+        if not arquivo.seek(0, 2):
+            yield from iter_tokens(b'', orcamento=orcamento) # mmap não aceita arquivo vazio
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            if hasattr(dados, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                dados.madvise(mmap.MADV_SEQUENTIAL) # Leitura antecipada; páginas lidas podem sair da memória
+            yield from iter_tokens(dados, orcamento=orcamento)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('arquivo')
+    parser.add_argument('--resumo', action='store_true', help='Só a contagem de tokens por tipo e os erros.')
+    args = parser.parse_args()
+
+    contagem = Counter()
+    saida = sys.stdout
+    for evento, valor in iter_tokens_arquivo(args.arquivo):
+        if evento == 'token':
+            if args.resumo:
+                contagem[valor[2]] += 1
+            else:
+                linha, lexema, tipo, coluna = valor
+                saida.write(json.dumps({'linha': linha, 'coluna': coluna, 'lexema': lexema, 'tipo': tipo}, ensure_ascii=False) + '\n')
+        else:
+            saida.write(json.dumps({'erro': renderizar(valor), **valor.como_dict()}, ensure_ascii=False) + '\n')
+    if args.resumo:
+        saida.write(json.dumps({'tokens': sum(contagem.values()), 'por_tipo': dict(contagem.most_common())}, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Análise léxica de um programa grande em pedaços, em processos paralelos.
+
+Quase todo o trabalho do léxico é local à linha. O estado que passa de uma linha para a
+seguinte é pequeno: as variáveis declaradas, a pilha de 'Coloca anilha' abertos, o tipo do
+último token significativo e o primeiro/último token (para BORA/BIRL!). Aqui o código é
+dividido em quebras de linha, cada pedaço é analisado em um processo como se começasse um
+programa, e a junção corrige o que dependia do estado dos pedaços anteriores:
+
+  - ATRIBUICAO_SEM_DECLARACAO de uma variável já declarada em um pedaço anterior sai;
+  - FECHAMENTO_SEM_ABERTURA que fecha um 'Coloca anilha' de um pedaço anterior sai (e o
+    parêntese aberto sai da pilha);
+  - um pedaço cujo primeiro token é um ID logo depois de um MONSTRO no fim do pedaço anterior
+    conta esse ID como declarado;
+  - BORA/BIRL! e os delimitadores não fechados são verificados uma vez, no fim.
+
+O resultado é igual ao de fluxo_tokens.analisar_fluxo (ou analisador.analisar_codigo) no
+código inteiro. Os limites de limites.py não se aplicam aqui (uso offline).
+"""
+from array import array
+
+from analisador import CODIGO_TIPO, EstadoLexico, _QUEBRA_LINHA, _analisar_matches, _varrer_buffer, _verificacoes_finais
+from diagnosticos import renderizar
+from fluxo_tokens import TokenStream, _inicios_de_linha
+from lote import normalizar_workers, pool
+
+# Pedaços menores que isso não compensam o envio a outro processo
+MIN_CARACTERES_POR_PEDACO = 256 * 1024
+
+
+def dividir(codigo, pedacos):
+    """
+    Offsets (inicio, fim) de até 'pedacos' pedaços de linhas inteiras de tamanhos parecidos.
+    Cada pedaço termina antes de uma quebra de linha; a quebra entre dois pedaços não fica em
+    nenhum deles.
+    """
+    tamanho = max(1, len(codigo) // max(1, pedacos))
+    limites = []
+    inicio = 0
+    while True:
+        quebra = _QUEBRA_LINHA.search(codigo, inicio + tamanho) if len(limites) < pedacos - 1 else None
+        if quebra is None:
+            limites.append((inicio, len(codigo)))
+            return limites
+        inicio_quebra = quebra.start()
+        if inicio_quebra > inicio and codigo[inicio_quebra - 1] == '\r' and quebra.group() == '\n':
+            inicio_quebra -= 1 # A busca começou no meio de um '\r\n'
+        limites.append((inicio, inicio_quebra))
+        inicio = quebra.end()
+
+
+def _analisar_pedaco(tarefa):
+    # Roda nos processos do pool: o léxico do pedaço a partir de um estado vazio, mais o resumo
+    # do estado no fim, com linhas contadas a partir de 1 e offsets já somados a 'base'
+    texto, base = tarefa
+    inicios_linha = _inicios_de_linha(texto)
+    if base:
+        inicios_linha = array('I', [base + inicio for inicio in inicios_linha])
+    tipos, inicios, fins = array('B'), array('I'), array('I')
+    diagnosticos = []
+    primeiro_id = None
+    teve_token = False
+
+    estado = EstadoLexico()
+    for evento, valor in _analisar_matches(_varrer_buffer(texto), estado, set()):
+        if evento == 'token':
+            num_linha, lexema, tipo, coluna = valor
+            if not teve_token:
+                teve_token = True
+                primeiro_id = lexema if tipo == 'ID' else None
+            inicio = inicios_linha[num_linha - 1] + coluna - 1
+            tipos.append(CODIGO_TIPO[tipo])
+            inicios.append(inicio)
+            fins.append(inicio + len(lexema))
+        else:
+            diagnosticos.append(valor)
+
+    return {
+        'tipos': tipos, 'inicios': inicios, 'fins': fins, 'inicios_linha': inicios_linha,
+        'diagnosticos': diagnosticos,
+        'linhas': len(inicios_linha),
+        'declaradas': estado.declared_variables,
+        'abertos': estado.delimiters_stack,
+        'anterior': estado.previous_meaningful_token_type if teve_token else None,
+        'teve_token': teve_token,
+        'primeiro_id': primeiro_id,
+        'primeiro_tipo': estado.primeiro_tipo,
+        'ultimo_tipo': estado.ultimo_tipo,
+    }
+
+
+def _juntar(codigo, resultados):
+    # Junta os pedaços na ordem, corrigindo os diagnósticos que dependiam do estado anterior
+    fluxo = TokenStream(codigo, inicios_linha=array('I'))
+    diagnosticos = []
+    declaradas = set()
+    estado = EstadoLexico()
+    abertos = estado.delimiters_stack
+    anterior = None
+    linha_base = 0
+
+    for resultado in resultados:
+        efetivas = declaradas
+        if anterior == 'VARIAVEL' and resultado['primeiro_id'] is not None:
+            # 'MONSTRO' no fim do pedaço anterior declara o primeiro ID deste
+            efetivas = declaradas | {resultado['primeiro_id']}
+
+        for diagnostico in resultado['diagnosticos']:
+            if diagnostico.codigo == 'ATRIBUICAO_SEM_DECLARACAO' and diagnostico.args[0] in efetivas:
+                continue
+            if diagnostico.codigo == 'FECHAMENTO_SEM_ABERTURA' and abertos:
+                abertos.pop()
+                continue
+            if diagnostico.linha is not None:
+                diagnostico = diagnostico._replace(linha=diagnostico.linha + linha_base)
+            diagnosticos.append(diagnostico)
+
+        abertos.extend((lexema, linha + linha_base, tipo, coluna) for lexema, linha, tipo, coluna in resultado['abertos'])
+        declaradas = efetivas | resultado['declaradas']
+        if resultado['teve_token']:
+            anterior = resultado['anterior']
+        estado.primeiro_tipo = estado.primeiro_tipo or resultado['primeiro_tipo']
+        estado.ultimo_tipo = resultado['ultimo_tipo'] or estado.ultimo_tipo
+
+        fluxo.tipos.extend(resultado['tipos'])
+        fluxo.inicios.extend(resultado['inicios'])
+        fluxo.fins.extend(resultado['fins'])
+        fluxo.inicios_linha.extend(resultado['inicios_linha'])
+        linha_base += resultado['linhas']
+
+    diagnosticos.extend(valor for _, valor in _verificacoes_finais(estado, set(diagnosticos)))
+    return {'tokens': fluxo, 'diagnosticos': diagnosticos}
+
+
+def analisar_fluxo_paralelo(codigo: str, workers=None, pedacos=None) -> dict:
+    """
+    Igual a fluxo_tokens.analisar_fluxo (sem limites), com os pedaços do código analisados em
+    processos paralelos.
+
+    Args:
+        codigo (str): O código BIRL.
+        workers (int): Processos (limitado a lote.MAX_WORKERS). Com 1, os pedaços são analisados
+                       e juntados no próprio processo.
+        pedacos (int): Em quantos pedaços dividir; o padrão é um por worker, sem pedaços menores
+                       que MIN_CARACTERES_POR_PEDACO.
+    """
+    workers = normalizar_workers(workers)
+    if pedacos is None:
+        pedacos = min(workers, max(1, len(codigo) // MIN_CARACTERES_POR_PEDACO))
+    tarefas = [(codigo[inicio:fim], inicio) for inicio, fim in dividir(codigo, pedacos)]
+    if workers == 1 or len(tarefas) == 1:
+        resultados = map(_analisar_pedaco, tarefas)
+    else:
+        resultados = pool(workers).map(_analisar_pedaco, tarefas)
+    return _juntar(codigo, resultados)
+
+
+def analisar_codigo_paralelo(codigo: str, workers=None, pedacos=None) -> dict:
+    """Igual a analisador.analisar_codigo, a partir de analisar_fluxo_paralelo."""
+    resultado = analisar_fluxo_paralelo(codigo, workers, pedacos)
+    return {
+        'tokens': list(resultado['tokens']),
+        'erros_estrutura': [renderizar(diagnostico) for diagnostico in resultado['diagnosticos']],
+    }
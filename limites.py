@@ -0,0 +1,110 @@
+"""
+Limites de recursos de uma análise, contra entradas patológicas.
+
+Sem limites, alguns megabytes de caracteres não reconhecidos viram um token e um erro por
+caractere, e uma única requisição prende um worker e gera uma resposta enorme. Com um
+Orcamento, o léxico e o sintático param ao atingir um limite e o resultado sai truncado,
+dizendo qual limite foi atingido.
+"""
+import os
+import time
+from collections import namedtuple
+
+
+def _do_ambiente(nome, padrao, tipo=int):
+    # Variável ausente usa o padrão; vazia ou 0 desliga o limite
+    valor = os.environ.get(nome)
+    if valor is None:
+        return padrao
+    valor = tipo(valor) if valor.strip() else 0
+    return valor if valor > 0 else None
+
+
+class Limites(namedtuple('Limites', 'caracteres tokens diagnosticos segundos')):
+    """
+    Limites de uma análise; None em um campo desliga aquele limite.
+
+    Atributos:
+        caracteres (int): Tamanho máximo do código; o excedente (a partir da última quebra de
+                          linha dentro do limite) não é analisado.
+        tokens (int): Máximo de tokens gerados pelo léxico.
+        diagnosticos (int): Máximo de erros do léxico e, separadamente, do sintático.
+        segundos (float): Tempo máximo (relógio de parede) do léxico e do sintático juntos.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def do_ambiente(cls):
+        """Limites das variáveis BIRL_MAX_CARACTERES, BIRL_MAX_TOKENS, BIRL_MAX_DIAGNOSTICOS e BIRL_MAX_SEGUNDOS."""
+        return cls(
+            caracteres=_do_ambiente('BIRL_MAX_CARACTERES', 1_000_000),
+            tokens=_do_ambiente('BIRL_MAX_TOKENS', 200_000),
+            diagnosticos=_do_ambiente('BIRL_MAX_DIAGNOSTICOS', 1_000),
+            segundos=_do_ambiente('BIRL_MAX_SEGUNDOS', 5.0, float),
+        )
+
+
+# Limites usados pelo app e pela análise em lote (analisar_pasta.py só os usa com --limites)
+LIMITES = Limites.do_ambiente()
+
+# Descrição de cada limite para a mensagem de análise truncada
+DESCRICAO_LIMITE = {
+    'caracteres': 'tamanho do código',
+    'tokens': 'quantidade de tokens',
+    'diagnosticos': 'quantidade de erros',
+    'segundos': 'tempo de análise',
+}
+
+
+class Orcamento:
+    """
+    Os limites de uma análise em andamento.
+
+    Criado quando a análise começa (o prazo conta a partir daí) e passado ao léxico e ao
+    sintático. 'estourado' guarda o nome do primeiro limite atingido, ou None; 'cancelado'
+    diz se a análise foi cancelada (veja cancelar).
+    """
+    __slots__ = ('limites', 'prazo', 'estourado', 'cancelado', '_separados')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.prazo = None if limites.segundos is None else time.perf_counter() + limites.segundos
+        self.estourado = None
+        self.cancelado = False
+        self._separados = [] # Orçamentos criados por separado(), cancelados junto com este
+
+    def cancelar(self):
+        """
+        Faz a análise parar na próxima vez que o léxico consulta o relógio (pode ser chamado de
+        outra thread). Ela termina como se o prazo tivesse passado; o resultado deve ser
+        descartado. Os orçamentos separados deste também são cancelados.
+        """
+        self.cancelado = True
+        self.prazo = 0.0
+        for orcamento in self._separados:
+            orcamento.cancelar()
+
+    def estourar(self, limite):
+        """Registra que 'limite' foi atingido (só o primeiro fica registrado)."""
+        if self.estourado is None:
+            self.estourado = limite
+
+    def sem_tempo(self):
+        """Se o prazo já passou (e, nesse caso, registra o estouro de 'segundos')."""
+        if self.prazo is not None and time.perf_counter() > self.prazo:
+            self.estourar('segundos')
+            return True
+        return False
+
+    def separado(self):
+        """
+        Orçamento com os mesmos limites e o mesmo prazo, mas estouro próprio: para o sintático
+        rodar junto com o léxico sem que um limite atingido por um interrompa o outro. Cancelar
+        este orçamento cancela o separado.
+        """
+        orcamento = Orcamento(self.limites)
+        # Registrado antes de copiar o prazo: um cancelar() no meio alcança o novo orçamento
+        self._separados.append(orcamento)
+        orcamento.prazo = self.prazo
+        orcamento.cancelado = self.cancelado
+        return orcamento
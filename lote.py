@@ -0,0 +1,62 @@
+"""
+Análise de muitos programas em paralelo, em processos separados.
+
+Cada processo roda analise.analisar_programa e devolve o resultado já serializado em JSON,
+de modo que o processo principal só junta os textos: o trabalho de CPU fica todo nos
+processos do pool, fora do interpretador que atende as requisições.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from analise import analisar_programa
+from limites import LIMITES
+
+MAX_WORKERS = os.cpu_count() or 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def resultado_json(codigo: str, limites=LIMITES) -> str:
+    """
+    Resultado de analisar_programa serializado como o jsonify do app (chaves ordenadas, compacto).
+    Por padrão com os limites do app; com limites=None, sem limite nenhum.
+    """
+    return json.dumps(analisar_programa(codigo, limites), sort_keys=True, separators=(',', ':'))
+
+
+def normalizar_workers(workers=None):
+    """Quantidade de processos a usar: o pedido, limitado a 1..MAX_WORKERS (padrão: MAX_WORKERS)."""
+    if workers is None:
+        return MAX_WORKERS
+    return max(1, min(int(workers), MAX_WORKERS))
+
+
+def pool(workers):
+    """Pool de processos compartilhado para essa quantidade de workers (criado no primeiro uso)."""
+    with _pools_lock:
+        executor = _pools.get(workers)
+        if executor is None:
+            executor = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def analisar_lote(codigos, workers=None):
+    """
+    Analisa vários códigos em paralelo.
+
+    Args:
+        codigos (list[str]): Os programas.
+        workers (int): Processos a usar (limitado a MAX_WORKERS); 1 analisa no próprio processo.
+
+    Returns:
+        list[str]: O resultado JSON de cada programa, na mesma ordem da entrada.
+    """
+    workers = normalizar_workers(workers)
+    if workers == 1 or len(codigos) <= 1:
+        return [resultado_json(codigo) for codigo in codigos]
+    # Lotes de alguns programas por tarefa diluem o custo de enviar cada um ao processo
+    tamanho_tarefa = max(1, len(codigos) // (workers * 4))
+    return list(pool(workers).map(resultado_json, codigos, chunksize=tamanho_tarefa))
@@ -0,0 +1,197 @@
+"""
+Tempos por fase das análises e métricas no formato texto do Prometheus.
+
+Ligado com BIRL_METRICAS=1. Cada requisição de análise ganha um Cronometro, que soma o tempo
+de cada fase (léxico, sintático, semântico, classificação dos erros, serialização e
+compressão) e vira o cabeçalho Server-Timing da resposta; ao final da
+requisição os tempos, o tamanho do corpo e a quantidade de tokens entram nos histogramas
+expostos em /metrics.
+
+Desligado, novo_cronometro() devolve sempre o mesmo cronômetro nulo, cujas fases não medem
+nada: o custo fica em uma chamada de método por fase.
+
+Uma fase medida dentro de outra não conta no tempo da de fora. É assim que a passada única
+separa as fases: ela inteira conta como 'sintatico', e o Parser mede como 'lexico' o tempo em
+que puxa tokens do léxico.
+"""
+import os
+import threading
+import time
+
+
+def _ligado():
+    return os.environ.get('BIRL_METRICAS', '').strip().lower() in ('1', 'true', 'sim')
+
+
+ATIVO = _ligado()
+
+# Fases medidas, na ordem do Server-Timing
+FASES = ('lexico', 'sintatico', 'semantico', 'classificacao', 'serializacao', 'compressao')
+
+# Limites superiores dos baldes de cada histograma
+BALDES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BALDES_TOKENS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+class _Fase:
+    __slots__ = ('cronometro', 'nome', 'inicio')
+
+    def __init__(self, cronometro, nome):
+        self.cronometro = cronometro
+        self.nome = nome
+
+    def __enter__(self):
+        self.cronometro._abertas.append(self.nome)
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *excecao):
+        duracao = time.perf_counter() - self.inicio
+        fases, abertas = self.cronometro.fases, self.cronometro._abertas
+        abertas.pop()
+        fases[self.nome] = fases.get(self.nome, 0.0) + duracao
+        if abertas:
+            # Descontado da fase de fora, que soma o bloco inteiro quando termina
+            fases[abertas[-1]] = fases.get(abertas[-1], 0.0) - duracao
+
+
+class Cronometro:
+    """
+    Tempos de uma requisição de análise.
+
+    Atributos:
+        inicio (float): perf_counter() na criação (início da requisição).
+        fases (dict): Segundos acumulados por fase (a mesma fase pode ser medida várias vezes),
+                      sem o tempo das fases medidas dentro dela.
+        tokens (int): Tokens produzidos pelo léxico, ou None se não houve análise (ex.: cache).
+    """
+    __slots__ = ('inicio', 'fases', 'tokens', '_abertas')
+    ativo = True
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fases = {}
+        self.tokens = None
+        self._abertas = [] # Fases em andamento, da mais externa para a mais interna
+
+    def fase(self, nome):
+        """Context manager que soma o tempo do bloco à fase 'nome'."""
+        return _Fase(self, nome)
+
+    def registrar_tokens(self, quantidade):
+        self.tokens = quantidade
+
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def server_timing(self, total=None):
+        """Valor do cabeçalho Server-Timing (durações em milissegundos)."""
+        partes = [f'{nome};dur={self.fases[nome] * 1000:.3f}' for nome in FASES if nome in self.fases]
+        partes.append(f'total;dur={(self.total() if total is None else total) * 1000:.3f}')
+        return ', '.join(partes)
+
+
+class _FaseNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *excecao):
+        pass
+
+
+class _CronometroNulo:
+    # O cronômetro das requisições com as métricas desligadas
+    __slots__ = ()
+    ativo = False
+    _fase = _FaseNula()
+
+    def fase(self, nome):
+        return self._fase
+
+    def registrar_tokens(self, quantidade):
+        pass
+
+
+NULO = _CronometroNulo()
+
+
+def novo_cronometro():
+    """Cronometro para uma requisição (o nulo, se as métricas estão desligadas)."""
+    return Cronometro() if ATIVO else NULO
+
+
+class Histograma:
+    """Histograma cumulativo do Prometheus, com uma série por combinação de rótulos."""
+
+    def __init__(self, nome, ajuda, baldes, rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.baldes = baldes
+        self.rotulos = rotulos
+        self._series = {} # valores dos rótulos -> [contagem por balde..., contagem, soma]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *rotulos):
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = [0] * (len(self.baldes) + 1) + [0.0]
+            for i, limite in enumerate(self.baldes):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += 1
+            serie[-1] += valor
+
+    def texto(self):
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} histogram']
+        with self._lock:
+            series = sorted((rotulos, list(serie)) for rotulos, serie in self._series.items())
+        for valores, serie in series:
+            rotulos = ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in zip(self.rotulos, valores))
+            prefixo = rotulos + ',' if rotulos else ''
+            for limite, contagem in zip(self.baldes, serie):
+                linhas.append(f'{self.nome}_bucket{{{prefixo}le="{limite}"}} {contagem}')
+            linhas.append(f'{self.nome}_bucket{{{prefixo}le="+Inf"}} {serie[-2]}')
+            sufixo = f'{{{rotulos}}}' if rotulos else ''
+            linhas.append(f'{self.nome}_sum{sufixo} {serie[-1]!r}')
+            linhas.append(f'{self.nome}_count{sufixo} {serie[-2]}')
+        return '\n'.join(linhas)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+DURACAO_REQUISICAO = Histograma('birl_requisicao_segundos', 'Duração das requisições de análise.', BALDES_SEGUNDOS, ('rota',))
+DURACAO_FASE = Histograma('birl_fase_segundos', 'Duração de cada fase da análise.', BALDES_SEGUNDOS, ('rota', 'fase'))
+TAMANHO_REQUISICAO = Histograma('birl_requisicao_bytes', 'Tamanho do corpo das requisições de análise.', BALDES_BYTES, ('rota',))
+QUANTIDADE_TOKENS = Histograma('birl_tokens', 'Tokens produzidos pelo léxico por análise.', BALDES_TOKENS, ('rota',))
+
+HISTOGRAMAS = (DURACAO_REQUISICAO, DURACAO_FASE, TAMANHO_REQUISICAO, QUANTIDADE_TOKENS)
+
+
+def registrar(rota, cronometro, tamanho_corpo, total=None):
+    """
+    Soma uma requisição terminada aos histogramas.
+
+    Args:
+        rota (str): Rótulo da rota (ex.: '/analisar').
+        cronometro (Cronometro): O cronômetro da requisição (o nulo é ignorado).
+        tamanho_corpo (int): Bytes do corpo da requisição.
+        total (float): Duração da requisição; o padrão é o tempo desde a criação do cronômetro.
+    """
+    if not cronometro.ativo:
+        return
+    DURACAO_REQUISICAO.observar(cronometro.total() if total is None else total, rota)
+    for fase, segundos in cronometro.fases.items():
+        DURACAO_FASE.observar(segundos, rota, fase)
+    TAMANHO_REQUISICAO.observar(tamanho_corpo, rota)
+    if cronometro.tokens is not None:
+        QUANTIDADE_TOKENS.observar(cronometro.tokens, rota)
+
+
+def texto_prometheus(extras=()):
+    """Todas as métricas no formato texto do Prometheus (versão 0.0.4), mais as linhas em 'extras'."""
+    return '\n'.join([histograma.texto() for histograma in HISTOGRAMAS] + list(extras)) + '\n'
@@ -0,0 +1,172 @@
+"""
+Páginas HTML e arquivos estáticos servidos com validadores e cache.
+
+As páginas não dependem da requisição: cada template é renderizado uma vez (na primeira vez
+que é pedido) e guardado com um ETag forte (hash do conteúdo) e as variantes já comprimidas
+(brotli, se disponível, e gzip). Uma revisita com If-None-Match recebe 304 sem corpo. As
+páginas vão com 'Cache-Control: no-cache' (o navegador sempre revalida, e uma nova versão do
+app aparece na hora).
+
+Os arquivos de static/ são lidos uma vez, na inicialização, com o mesmo tratamento. O
+url_for('static', ...) dos templates ganha '?v=<hash do arquivo>': com a versão certa na URL,
+a resposta pode ficar um ano no cache do navegador sem revalidar (immutable), e um arquivo
+alterado muda de URL. Sem a versão (ou com uma antiga) a resposta vai com 'no-cache' e ETag.
+
+A tabela de tokens (/tabela-tokens) é gerada de analisador.TOKEN_SPEC: nomes e expressões
+regulares saem da especificação que o léxico usa, e DOCUMENTACAO_TOKENS só acrescenta
+exemplos e descrições.
+"""
+import hashlib
+import mimetypes
+import os
+from collections import namedtuple
+
+from flask import Response, render_template
+
+from analisador import TOKEN_SPEC
+from formatos import CODIFICACOES, MIN_BYTES_COMPRESSAO, comprimir, escolher_codificacao
+
+# Exemplos de lexemas e descrição de cada tipo de TOKEN_SPEC para a tabela de tokens (um tipo
+# sem entrada aqui aparece na tabela só com o nome e a expressão regular)
+DOCUMENTACAO_TOKENS = {
+    'INICIO_PROGRAMA': ('BORA', 'Início do programa'),
+    'FIM_PROGRAMA': ('BIRL!', 'Fim do programa'),
+    'VARIAVEL': ('MONSTRO', 'Declaração de variável'),
+    'ATRIBUICAO': ('TASAINDODAJAULA', 'Operador de atribuição (=)'),
+    'PRINT': ('GRITA', 'Imprime algo no console'),
+    'IF': ('CONFERE_AI', 'Início de condição IF'),
+    'ELIF': ('CONFERE_MAIS', 'Condição ELIF (else if)'),
+    'ELSE': ('OU_NAO', 'Condição ELSE'),
+    'WHILE': ('TREINA ATÉ', 'Laço while'),
+    'FUNC': ('FICA GRANDE', 'Declaração de função'),
+    'CALL': ('CHAMA', 'Chamada de função'),
+    'BOOLEAN_VERDADEIRO': ('VERDADEIRO', 'Valor booleano verdadeiro'),
+    'BOOLEAN_FALSO': ('FALSO', 'Valor booleano falso'),
+    'OP_LOGICO': ('E, OU, NÃO', 'Operadores lógicos (AND, OR, NOT)'),
+    'OP_ATRIBUICAO_COMPOSTA': ('+=, -=, *=, /=', 'Operadores de atribuição composta'),
+    'OP_RELACIONAL_OU_IGUALDADE': ('>=, <=, ==, !=, >, <', 'Operadores relacionais e de igualdade'),
+    'OP_ARITMETICO': ('+, -, *, /', 'Operadores aritméticos'),
+    'PARENTESES_ABRE': ('Coloca anilha', 'Início de parênteses (abre um bloco ou lista de argumentos)'),
+    'PARENTESES_FECHA': ('Tira anilha', 'Fim de parênteses (fecha um bloco ou lista de argumentos)'),
+    'VIRGULA': (',', 'Vírgula (separador)'),
+    'DOIS_PONTOS': (':', 'Dois pontos (início de bloco)'),
+    'STRING': ('"Qual foi?", "BIRL!"', 'Texto entre aspas duplas'),
+    'NUM_DECIMAL': ('3.14, 0.5, 123.0', 'Números de ponto flutuante'),
+    'NUM': ('10, 100, 42', 'Números inteiros'),
+    'COMENTARIO': ('# Isto é um comentário', 'Comentários de linha'),
+    'ID': ('x, resultado, idade', 'Identificador (nome de variável ou função)'),
+    'ASPAS_NAO_FECHADA': ('"sem fechar', 'String sem as aspas de fechamento na linha (erro léxico)'),
+    'CARACTERE_SOLTO_PARENTESES': ('(, )', 'Parêntese solto: BIRL! usa Coloca anilha/Tira anilha (erro léxico)'),
+    'NEWLINE': ('(quebra de linha)', 'Quebra de linha (ignorada na análise)'),
+    'SKIP': ('(espaço, tab)', 'Espaços em branco e tabulações (ignorados)'),
+    'MISMATCH': ('@, $, etc.', 'Qualquer caractere não reconhecido (erro léxico)'),
+}
+
+LinhaTabela = namedtuple('LinhaTabela', 'nome padrao lexemas descricao')
+
+# Linhas da tabela de tokens, na ordem de TOKEN_SPEC (a ordem em que o léxico tenta os padrões)
+TABELA_TOKENS = tuple(
+    LinhaTabela(nome, padrao, *DOCUMENTACAO_TOKENS.get(nome, ('', '')))
+    for nome, padrao in TOKEN_SPEC
+)
+
+# Cache-Control das páginas e dos estáticos (com e sem a versão certa na URL)
+CACHE_PAGINAS = 'no-cache'
+CACHE_ESTATICOS_VERSIONADOS = 'public, max-age=31536000, immutable'
+CACHE_ESTATICOS = 'no-cache'
+
+# Tipos que valem a pena comprimir (imagens JPEG/PNG já são comprimidas)
+_TIPOS_COMPRIMIVEIS = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class Recurso(namedtuple('Recurso', 'corpo mimetype etag variantes')):
+    """
+    Um corpo pronto para servir.
+
+    Atributos:
+        corpo (bytes): O conteúdo sem compressão.
+        mimetype (str): Tipo do conteúdo, sem charset (o Response acrescenta o dos tipos de texto).
+        etag (str): ETag forte do corpo (sem aspas); cada variante comprimida usa etag + '-' + codificação.
+        variantes (dict): Codificação ('br', 'gzip') -> corpo comprimido.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def de_bytes(cls, corpo, mimetype):
+        etag = hashlib.sha256(corpo).hexdigest()[:32]
+        variantes = {}
+        if mimetype.startswith(_TIPOS_COMPRIMIVEIS) and len(corpo) >= MIN_BYTES_COMPRESSAO:
+            for codificacao in CODIFICACOES:
+                comprimido = comprimir(corpo, codificacao)
+                if len(comprimido) < len(corpo):
+                    variantes[codificacao] = comprimido
+        return cls(corpo, mimetype, etag, variantes)
+
+    def responder(self, requisicao, cache_control):
+        """
+        Resposta para 'requisicao': a variante comprimida aceita pelo cliente (se houver), com
+        ETag e Cache-Control, ou 304 se o If-None-Match já tem esse ETag.
+        """
+        codificacao = escolher_codificacao(requisicao.accept_encodings, len(self.corpo)) if self.variantes else None
+        if codificacao not in self.variantes:
+            codificacao = None
+        etag = self.etag if codificacao is None else f'{self.etag}-{codificacao}'
+
+        if requisicao.if_none_match.contains_weak(etag):
+            resposta = Response(status=304)
+        else:
+            resposta = Response(self.variantes[codificacao] if codificacao else self.corpo, mimetype=self.mimetype)
+            if codificacao:
+                resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = cache_control
+        if self.variantes:
+            resposta.vary.add('Accept-Encoding')
+        return resposta
+
+
+class Paginas:
+    """Templates renderizados uma vez (sem contexto da requisição) e guardados como Recurso."""
+
+    def __init__(self, contexto=None):
+        # Variáveis extras de cada template: nome -> dict
+        self._contexto = contexto or {}
+        self._recursos = {}
+
+    def responder(self, template, requisicao):
+        recurso = self._recursos.get(template)
+        if recurso is None:
+            html = render_template(template, **self._contexto.get(template, {}))
+            # Duas threads podem renderizar a mesma página ao mesmo tempo; o resultado é igual
+            recurso = self._recursos[template] = Recurso.de_bytes(html.encode('utf-8'), 'text/html')
+        return recurso.responder(requisicao, CACHE_PAGINAS)
+
+
+class ArquivosEstaticos:
+    """
+    Os arquivos de uma pasta de estáticos, lidos na criação.
+
+    Atributos:
+        versoes (dict): Nome (caminho relativo, com '/') -> versão (início do ETag) para o url_for.
+    """
+
+    def __init__(self, pasta):
+        self._recursos = {}
+        self.versoes = {}
+        for raiz, _, arquivos in os.walk(pasta):
+            for nome_arquivo in arquivos:
+                caminho = os.path.join(raiz, nome_arquivo)
+                nome = os.path.relpath(caminho, pasta).replace(os.sep, '/')
+                with open(caminho, 'rb') as arquivo:
+                    corpo = arquivo.read()
+                mimetype = mimetypes.guess_type(nome_arquivo)[0] or 'application/octet-stream'
+                recurso = self._recursos[nome] = Recurso.de_bytes(corpo, mimetype)
+                self.versoes[nome] = recurso.etag[:12]
+
+    def responder(self, nome, requisicao):
+        """Resposta para o arquivo 'nome', ou None se ele não existe."""
+        recurso = self._recursos.get(nome)
+        if recurso is None:
+            return None
+        versionado = requisicao.args.get('v') == self.versoes[nome]
+        return recurso.responder(requisicao, CACHE_ESTATICOS_VERSIONADOS if versionado else CACHE_ESTATICOS)
@@ -0,0 +1,94 @@
+"""
+Análise semântica de um programa BIRL!, sobre a árvore montada pelo Parser (arvore.Arvore).
+
+É uma passada só pelos nós, em pré-ordem, com os nomes como ids de lexema (simbolos.Lexemas,
+a mesma tabela do léxico) em uma simbolos.TabelaSimbolos:
+  - o programa e cada 'FICA GRANDE' abrem um escopo, que vai até o fim da subárvore do nó
+    (como em Python, CONFERE_AI e TREINA ATÉ não abrem escopo);
+  - 'MONSTRO' declara a variável no escopo atual, já a partir da própria expressão (como no
+    léxico), e os parâmetros de uma função são declarados no escopo dela;
+  - 'FICA GRANDE' declara a função, com a quantidade de parâmetros, no escopo em que aparece,
+    antes do corpo (o corpo pode chamá-la);
+  - um nome é visível se foi declarado no escopo atual ou em um de fora.
+
+Um nome não encontrado é registrado no escopo atual depois do erro, para que os usos seguintes
+não repitam o mesmo erro (como o léxico faz com ATRIBUICAO_SEM_DECLARACAO).
+"""
+from arvore import ATRIBUICAO, ATRIBUICAO_COMPOSTA, CHAMADA, DECLARACAO, EXPRESSAO, FUNCAO, NOME, PARAMETRO
+from diagnosticos import Diagnostico
+from simbolos import TabelaSimbolos
+
+
+def analisar_semantica(arvore):
+    """
+    Confere os nomes do programa.
+
+    Returns:
+        list[diagnosticos.Diagnostico]: Na ordem dos nós, com os códigos VARIAVEL_NAO_DECLARADA
+            (uso em expressão ou atribuição composta), ATRIBUICAO_SEM_DECLARACAO (atribuição
+            com TASAINDODAJAULA), FUNCAO_NAO_DEFINIDA e QUANTIDADE_DE_ARGUMENTOS.
+    """
+    tipos, fins = arvore.tipos, arvore.fins
+    # Id do lexema de um nó sem passar pelos métodos da Arvore e do TokenStream: os lexemas que
+    # o léxico internou já estão na tabela
+    fonte, inicios, fins_token = arvore.tokens_fonte.fonte, arvore.tokens_fonte.inicios, arvore.tokens_fonte.fins
+    lexemas = arvore.tokens_fonte.lexemas
+    ids_lexemas, internar = lexemas.ids, lexemas.internar
+    tokens = arvore.tokens if arvore.posicoes is None else [arvore.posicoes[indice] for indice in arvore.tokens]
+    diagnosticos = []
+
+    def erro(codigo, no, *args):
+        diagnosticos.append(Diagnostico(codigo, arvore.linha(no), arvore.coluna(no), args))
+
+    # Uma função não definida fica com None, para as chamadas seguintes não repetirem o erro
+    tabela = TabelaSimbolos()
+    variaveis, funcoes = tabela.variaveis, tabela.funcoes
+    tabela.abrir_escopo()
+    # Fim (índice do nó seguinte à subárvore) de cada escopo aberto
+    fins_escopos = [len(tipos)]
+    fim = fins_escopos[-1]
+
+    for no, tipo in enumerate(tipos):
+        if tipo == EXPRESSAO or tipo > NOME:
+            continue # EXPRESSAO, LITERAL e OPERADOR (a maioria dos nós) não mexem nos escopos
+        if no >= fim:
+            while no >= fins_escopos[-1]:
+                fins_escopos.pop()
+                tabela.fechar_escopo()
+            fim = fins_escopos[-1]
+        token = tokens[no]
+        nome = fonte[inicios[token]:fins_token[token]]
+        simbolo = ids_lexemas.get(nome)
+        if simbolo is None:
+            simbolo = internar(nome)
+
+        if tipo == NOME or tipo == ATRIBUICAO or tipo == ATRIBUICAO_COMPOSTA:
+            if simbolo not in variaveis:
+                erro('ATRIBUICAO_SEM_DECLARACAO' if tipo == ATRIBUICAO else 'VARIAVEL_NAO_DECLARADA', no, nome)
+                tabela.declarar_variavel(simbolo)
+
+        elif tipo == DECLARACAO or tipo == PARAMETRO:
+            tabela.declarar_variavel(simbolo)
+
+        elif tipo == FUNCAO:
+            # Os parâmetros são os primeiros filhos (folhas seguidas)
+            parametro = no + 1
+            while parametro < fins[no] and tipos[parametro] == PARAMETRO:
+                parametro += 1
+            tabela.declarar_funcao(simbolo, parametro - no - 1)
+            tabela.abrir_escopo()
+            fim = fins[no]
+            fins_escopos.append(fim)
+
+        elif tipo == CHAMADA:
+            if simbolo not in funcoes:
+                erro('FUNCAO_NAO_DEFINIDA', no, nome)
+                tabela.declarar_funcao(simbolo, None)
+            else:
+                parametros = funcoes[simbolo]
+                if parametros is not None:
+                    argumentos = arvore.quantidade_filhos(no)
+                    if argumentos != parametros:
+                        erro('QUANTIDADE_DE_ARGUMENTOS', no, nome, parametros, argumentos)
+
+    return diagnosticos
@@ -0,0 +1,91 @@
+"""
+Lexemas internados e tabela de símbolos com escopos.
+
+Lexemas guarda cada lexema distinto (identificadores e palavras-chave) uma vez e o identifica
+por um inteiro. A mesma tabela é usada pelo léxico, que passa a devolver sempre o mesmo objeto
+str para o mesmo identificador (em vez de uma fatia nova do código por token), e pelo
+TokenStream e pela análise semântica, que trabalham com os ids.
+
+TabelaSimbolos é a tabela de escopos da análise semântica: em vez de uma pilha de conjuntos
+procurada do escopo atual para fora, guarda só o que está visível agora, indexado pelo id, e
+um registro do que cada escopo declarou para desfazer ao fechá-lo. Procurar um nome é uma
+consulta só, qualquer que seja a profundidade dos escopos.
+"""
+
+
+class Lexemas:
+    """
+    Tabela de internação de lexemas.
+
+    Atributos:
+        ids (dict): Lexema -> id.
+        textos (list): Lexema de cada id (o objeto str guardado, compartilhado pelos tokens).
+    """
+    __slots__ = ('ids', 'textos')
+
+    def __init__(self):
+        self.ids = {}
+        self.textos = []
+
+    def __len__(self):
+        return len(self.textos)
+
+    def internar(self, lexema):
+        """Id do lexema, criado se ele ainda não estiver na tabela."""
+        simbolo = self.ids.get(lexema)
+        if simbolo is None:
+            simbolo = self.ids[lexema] = len(self.textos)
+            self.textos.append(lexema)
+        return simbolo
+
+    def texto(self, simbolo):
+        return self.textos[simbolo]
+
+
+# Valor anterior de uma função que não estava visível (None já quer dizer "não definida")
+_AUSENTE = object()
+
+
+class TabelaSimbolos:
+    """
+    Variáveis e funções visíveis, por id de lexema, com escopos aninhados.
+
+    Atributos:
+        variaveis (set): Ids das variáveis visíveis (declaradas em algum escopo aberto).
+        funcoes (dict): Id -> quantidade de parâmetros da função visível (None: chamada sem
+                        definição, já apontada).
+    """
+    __slots__ = ('variaveis', 'funcoes', '_desfazer', '_marcas')
+
+    def __init__(self):
+        self.variaveis = set()
+        self.funcoes = {}
+        # (é função, id, valor anterior) de cada mudança, e onde começa o registro de cada escopo
+        self._desfazer = []
+        self._marcas = []
+
+    def abrir_escopo(self):
+        self._marcas.append(len(self._desfazer))
+
+    def fechar_escopo(self):
+        """Desfaz o que foi declarado desde o último abrir_escopo."""
+        marca = self._marcas.pop()
+        desfazer = self._desfazer
+        while len(desfazer) > marca:
+            funcao, simbolo, anterior = desfazer.pop()
+            if not funcao:
+                self.variaveis.discard(simbolo)
+            elif anterior is _AUSENTE:
+                del self.funcoes[simbolo]
+            else:
+                self.funcoes[simbolo] = anterior
+
+    def declarar_variavel(self, simbolo):
+        # Já visível (de um escopo de fora) não muda nada: continua visível depois deste escopo
+        if simbolo not in self.variaveis:
+            self.variaveis.add(simbolo)
+            self._desfazer.append((False, simbolo, None))
+
+    def declarar_funcao(self, simbolo, parametros):
+        self._desfazer.append((True, simbolo, self.funcoes.get(simbolo, _AUSENTE)))
+        self.funcoes[simbolo] = parametros
@@ -1,347 +1,772 @@
 # sintatico.py
+"""
+Analisador sintático da linguagem BIRL!.
+
+A gramática está em GRAMATICA; os conjuntos PRIMEIROS (FIRST) e SEGUINTES (FOLLOW) são
+calculados dela ao carregar o módulo e dão as tabelas de decisão do Parser (qual comando
+começa com cada token, o que pode seguir uma expressão...).
+
+O Parser é iterativo: em vez de uma função por regra chamando as outras, ele mantém uma
+pilha explícita de estados de continuação, então o aninhamento do programa (blocos dentro de
+blocos, 'Coloca anilha' dentro de 'Coloca anilha') não esbarra no limite de recursão do Python.
+A recuperação de erros e as mensagens são as mesmas do parser de descida recursiva que ele
+substituiu (benchmarks/sintatico_recursivo.py).
+
+Os erros são guardados como diagnosticos.Diagnostico, com a linha e a coluna do token onde
+foram detectados; o texto das mensagens só é montado por quem serializa o resultado.
+
+O Parser vê os tokens pela tabela TIPO_SINTATICO: espaços, quebras de linha e comentários
+ficam de fora, e os tokens de erro léxico são trocados pelo token que deveriam ser (um número
+ou uma string grande demais, ou uma string sem fechar, ainda é um termo) ou ignorados (um
+caractere desconhecido), para que um erro já apontado pelo léxico não vire uma cascata de
+erros sintáticos. Os tokens podem vir prontos (um TokenStream) ou ser puxados aos poucos de
+um gerador, à medida que o Parser avança (veja Parser.__init__).
+
+Enquanto analisa, o Parser monta a árvore sintática do programa (arvore.Arvore) em
+Parser.arvore; a análise semântica (semantico.py) é feita sobre ela.
+"""
+import sys
+from array import array
+
+import arvore as nos
+from analisador import CODIGO_TIPO, TIPOS_TOKEN
+from arvore import Arvore
+from diagnosticos import Diagnostico, renderizar
+from fluxo_tokens import TokenStream
+from metricas import NULO
+
+# Códigos inteiros dos tipos usados pela gramática (comparar ints é mais barato que strings)
+INICIO_PROGRAMA = CODIGO_TIPO['INICIO_PROGRAMA']
+FIM_PROGRAMA = CODIGO_TIPO['FIM_PROGRAMA']
+VARIAVEL = CODIGO_TIPO['VARIAVEL']
+ATRIBUICAO = CODIGO_TIPO['ATRIBUICAO']
+PRINT = CODIGO_TIPO['PRINT']
+IF = CODIGO_TIPO['IF']
+ELIF = CODIGO_TIPO['ELIF']
+ELSE = CODIGO_TIPO['ELSE']
+WHILE = CODIGO_TIPO['WHILE']
+FUNC = CODIGO_TIPO['FUNC']
+CALL = CODIGO_TIPO['CALL']
+OP_ATRIBUICAO_COMPOSTA = CODIGO_TIPO['OP_ATRIBUICAO_COMPOSTA']
+PARENTESES_ABRE = CODIGO_TIPO['PARENTESES_ABRE']
+PARENTESES_FECHA = CODIGO_TIPO['PARENTESES_FECHA']
+VIRGULA = CODIGO_TIPO['VIRGULA']
+DOIS_PONTOS = CODIGO_TIPO['DOIS_PONTOS']
+ID = CODIGO_TIPO['ID']
+
+SEM_TOKEN = -1 # Código "do token atual" quando os tokens acabaram (EOF)
+
+# Tipo de cada token para o Parser, por código de tipo; IGNORADO sai dos tokens do sintático
+IGNORADO = 255
+_TROCADOS = {
+    'SKIP': None, 'NEWLINE': None, 'COMENTARIO': None,
+    'ERRO LÉXICO': None,                        # Caractere não reconhecido
+    'ERRO LÉXICO - CARACTERE INVÁLIDO': None,   # Parêntese solto
+    'NUM_EXCESSIVO_ERRO': 'NUM',
+    'STRING_MUITO_LONGA_ERRO': 'STRING',
+    'ERRO LÉXICO - ASPAS NÃO FECHADAS': 'STRING', # Termina no fim da linha, como se fechasse ali
+}
+TIPO_SINTATICO = bytes(
+    codigo if tipo not in _TROCADOS else IGNORADO if _TROCADOS[tipo] is None else CODIGO_TIPO[_TROCADOS[tipo]]
+    for codigo, tipo in enumerate(TIPOS_TOKEN)
+).ljust(256, bytes([IGNORADO]))
+
+# Gramática: não-terminal -> produções (tuplas de símbolos; () é a produção vazia).
+# Terminais são códigos de tipo (int); não-terminais são strings.
+GRAMATICA = {
+    'Programa': [(INICIO_PROGRAMA, 'ListaComandos', FIM_PROGRAMA)],
+    'ListaComandos': [('Comando', 'ListaComandos'), ()],
+    'Comando': [
+        ('DeclaracaoVar',), ('Atribuicao',), ('Impressao',), ('Condicional',),
+        ('Loop',), ('DeclaracaoFuncao',), ('ChamadaFuncao',),
+    ],
+    'DeclaracaoVar': [(VARIAVEL, ID, ATRIBUICAO, 'Expressao')],
+    'Atribuicao': [(ID, 'OperadorAtribuicao', 'Expressao')],
+    'OperadorAtribuicao': [(ATRIBUICAO,), (OP_ATRIBUICAO_COMPOSTA,)],
+    'Impressao': [(PRINT, PARENTESES_ABRE, 'ListaExpressoes', PARENTESES_FECHA)],
+    'ListaExpressoes': [('Expressao', 'RestoListaExpressoes')],
+    'RestoListaExpressoes': [(VIRGULA, 'Expressao', 'RestoListaExpressoes'), ()],
+    'Expressao': [('Termo', 'RestoExpressao')],
+    'RestoExpressao': [('Operador', 'Termo', 'RestoExpressao'), ()],
+    'Operador': [(CODIGO_TIPO['OP_ARITMETICO'],), (CODIGO_TIPO['OP_LOGICO'],), (CODIGO_TIPO['OP_RELACIONAL_OU_IGUALDADE'],)],
+    'Termo': [
+        (CODIGO_TIPO['NUM'],), (CODIGO_TIPO['NUM_DECIMAL'],), (CODIGO_TIPO['STRING'],),
+        (CODIGO_TIPO['BOOLEAN_VERDADEIRO'],), (CODIGO_TIPO['BOOLEAN_FALSO'],), (ID,),
+        (PARENTESES_ABRE, 'Expressao', PARENTESES_FECHA),
+    ],
+    'Condicional': [(IF, 'Expressao', DOIS_PONTOS, 'ListaComandos', 'ListaElif', 'Senao')],
+    'ListaElif': [(ELIF, 'Expressao', DOIS_PONTOS, 'ListaComandos', 'ListaElif'), ()],
+    'Senao': [(ELSE, DOIS_PONTOS, 'ListaComandos'), ()],
+    'Loop': [(WHILE, 'Expressao', DOIS_PONTOS, 'ListaComandos')],
+    'DeclaracaoFuncao': [(FUNC, ID, PARENTESES_ABRE, 'Parametros', PARENTESES_FECHA, DOIS_PONTOS, 'ListaComandos')],
+    'Parametros': [(ID, 'RestoParametros'), ()],
+    'RestoParametros': [(VIRGULA, ID, 'RestoParametros'), ()],
+    'ChamadaFuncao': [(CALL, ID, PARENTESES_ABRE, 'Argumentos', PARENTESES_FECHA)],
+    'Argumentos': [('ListaExpressoes',), ()],
+}
+
+VAZIO = None # Marca, nos conjuntos PRIMEIROS, que o não-terminal deriva a cadeia vazia
+
+
+def _primeiros_da_sequencia(simbolos, primeiros):
+    resultado = set()
+    for simbolo in simbolos:
+        if isinstance(simbolo, int):
+            resultado.add(simbolo)
+            return resultado
+        resultado |= primeiros[simbolo] - {VAZIO}
+        if VAZIO not in primeiros[simbolo]:
+            return resultado
+    resultado.add(VAZIO)
+    return resultado
+
+
+def calcular_primeiros(gramatica):
+    """Conjuntos FIRST de cada não-terminal (ponto fixo); VAZIO indica que deriva ε."""
+    primeiros = {nao_terminal: set() for nao_terminal in gramatica}
+    mudou = True
+    while mudou:
+        mudou = False
+        for nao_terminal, producoes in gramatica.items():
+            for producao in producoes:
+                novos = _primeiros_da_sequencia(producao, primeiros) - primeiros[nao_terminal]
+                if novos:
+                    primeiros[nao_terminal] |= novos
+                    mudou = True
+    return primeiros
+
+
+def calcular_seguintes(gramatica, primeiros, inicial='Programa'):
+    """Conjuntos FOLLOW de cada não-terminal (ponto fixo); SEM_TOKEN faz o papel do fim de entrada."""
+    seguintes = {nao_terminal: set() for nao_terminal in gramatica}
+    seguintes[inicial].add(SEM_TOKEN)
+    mudou = True
+    while mudou:
+        mudou = False
+        for nao_terminal, producoes in gramatica.items():
+            for producao in producoes:
+                for posicao, simbolo in enumerate(producao):
+                    if isinstance(simbolo, int):
+                        continue
+                    resto = _primeiros_da_sequencia(producao[posicao + 1:], primeiros)
+                    novos = resto - {VAZIO}
+                    if VAZIO in resto:
+                        novos |= seguintes[nao_terminal]
+                    novos -= seguintes[simbolo]
+                    if novos:
+                        seguintes[simbolo] |= novos
+                        mudou = True
+    return seguintes
+
+
+PRIMEIROS = {nao_terminal: frozenset(conjunto) for nao_terminal, conjunto in calcular_primeiros(GRAMATICA).items()}
+SEGUINTES = {nao_terminal: frozenset(conjunto) for nao_terminal, conjunto in calcular_seguintes(GRAMATICA, PRIMEIROS).items()}
+
+OPERADORES_ATRIBUICAO = PRIMEIROS['OperadorAtribuicao']
+OPERADORES_EXPRESSAO = PRIMEIROS['Operador']
+TERMOS_SIMPLES = PRIMEIROS['Termo'] - {PARENTESES_ABRE}
+# Tokens que encerram uma lista de comandos (inclui 'Tira anilha', para a recuperação de erros)
+COMANDO_STOP_TOKENS = frozenset([FIM_PROGRAMA, ELIF, ELSE, PARENTESES_FECHA])
+
+# Tokens que podem seguir uma expressão: FOLLOW(Expressao) mais o fim dos tokens, já que um
+# programa truncado também encerra a expressão
+EXPRESSION_END_DELIMITERS = SEGUINTES['Expressao'] | {SEM_TOKEN}
+
+
+# Estados do Parser. Cada regra começa em um estado e, quando chama outra, empilha o estado
+# em que deve continuar; o retorno da regra chamada fica em 'ok'. Uma regra que abre um nó da
+# árvore empilha _FECHA_NO, que fecha o nó quando a regra termina (com ou sem erro).
+(
+    _FIM, _PROGRAMA_FIM,
+    _EXPRESSAO, _EXPRESSAO_RESTO, _EXPRESSAO_APOS_TERMO, _EXPRESSAO_APOS_OPERADOR,
+    _TERMO, _TERMO_APOS_PARENTESES,
+    _LISTA_COMANDOS, _LISTA_COMANDOS_APOS_COMANDO, _COMANDO_INVALIDO,
+    _DECLARACAO_VAR, _ATRIBUICAO, _IMPRESSAO, _IMPRESSAO_APOS_LISTA,
+    _LISTA_EXPRESSOES_APOS_PRIMEIRA, _LISTA_EXPRESSOES_APOS_VIRGULA,
+    _CONDICIONAL, _CONDICIONAL_APOS_CONDICAO, _CONDICIONAL_APOS_BLOCO, _CONDICIONAL_APOS_ELIF,
+    _LISTA_ELIF, _LISTA_ELIF_APOS_CONDICAO, _SENAO,
+    _LOOP, _LOOP_APOS_CONDICAO, _DECLARACAO_FUNCAO,
+    _CHAMADA_FUNCAO, _CHAMADA_FUNCAO_APOS_ARGUMENTOS, _ARGUMENTOS_APOS_PRIMEIRO, _ARGUMENTOS_APOS_VIRGULA,
+    _RETORNA_VERDADEIRO, _FECHA_NO,
+) = range(33)
+
+# Tabela LL(1) de <Comando>: token inicial -> estado da regra (ID ainda olha o token seguinte)
+_ESTADO_DA_REGRA = {
+    'DeclaracaoVar': _DECLARACAO_VAR, 'Atribuicao': _ATRIBUICAO, 'Impressao': _IMPRESSAO,
+    'Condicional': _CONDICIONAL, 'Loop': _LOOP, 'DeclaracaoFuncao': _DECLARACAO_FUNCAO,
+    'ChamadaFuncao': _CHAMADA_FUNCAO,
+}
+TABELA_COMANDO = {
+    token: _ESTADO_DA_REGRA[regra]
+    for (regra,) in GRAMATICA['Comando']
+    for token in PRIMEIROS[regra]
+}
+
+# Tipo do nó folha da árvore de cada termo simples e operador, por código de tipo
+TIPO_FOLHA = bytes(
+    nos.NOME if codigo == ID else nos.LITERAL if codigo in TERMOS_SIMPLES else nos.OPERADOR
+    for codigo in range(256)
+)
+
+
+# Tokens puxados da entrada de cada vez, e quantos deles precisam estar carregados à frente
+# do token atual (o maior lookahead de um estado é de 3 tokens)
+_LOTE = 512
+_FOLGA = 8
+_SEM_LIMITE = sys.maxsize
+
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, orcamento=None, entrada=None, cronometro=NULO):
+        """
+        Args:
+            tokens: TokenStream (ou a lista [linha, lexema, tipo(, coluna)] usada antes dele)
+                    de onde saem a linha, a coluna e o lexema dos erros.
+            orcamento (limites.Orcamento): Limites de erros e de tempo; ao atingir um, a análise para.
+            entrada: Sem ela, o Parser analisa todos os tokens de 'tokens'. Com ela, um iterador
+                     de pares (índice em 'tokens', código de TIPO_SINTATICO) que vai sendo consumido
+                     só quando o Parser precisa de mais tokens; 'tokens' pode estar sendo preenchido
+                     pelo próprio iterador (veja analise.analisar_em_uma_passada).
+            cronometro (metricas.Cronometro): Recebe como 'lexico' o tempo gasto puxando tokens
+                                              da entrada.
+        """
+        self.tokens = tokens if isinstance(tokens, TokenStream) else TokenStream.de_lista(tokens)
         self.current_token_index = 0
-        self.errors = [] # Agora vai armazenar tuplas: [linha, mensagem_limpa]
-
-    def current_token(self):
-        # Retorna o token atual, ou None se chegamos ao fim dos tokens
-        if self.current_token_index < len(self.tokens):
-            return self.tokens[self.current_token_index]
-        return None # Representa o End Of File (EOF) ou fim dos tokens
-
-    def advance(self):
-        # Avança para o próximo token
-        self.current_token_index += 1
-        return self.current_token()
-
-    def add_error(self, message, line=None):
-  
-        error_line = line 
-        if error_line is None: 
-            if self.current_token(): 
-                error_line = self.current_token()[0]
-            elif self.tokens: 
-                error_line = self.tokens[-1][0]
-            else: 
-                error_line = "N/A"
-
-        
-        error_entry = (error_line, message)
-        
-        
-        if not self.errors or self.errors[-1] != error_entry:
-            self.errors.append(error_entry)
-
-    def match(self, expected_type):
-   
-        token = self.current_token()
-        if token and token[2] == expected_type:
-            self.advance()
-            return True
-        
-       
-        if token:
-            self.add_error(f"Token inesperado '{token[1]}'. Esperava '{expected_type}'.", token[0]) # Passa a linha do token real
+        self.errors = [] # Diagnósticos, na ordem em que foram encontrados
+        self.orcamento = orcamento
+        self._max_erros = orcamento.limites.diagnosticos if orcamento is not None else None
+
+        # Tipos dos tokens vistos pelo Parser, com SEM_TOKEN no fim depois que eles acabam (olhar o
+        # token atual ou o seguinte dispensa checar o tamanho), e a posição de cada um em
+        # self.tokens (None: a mesma)
+        self._entrada = entrada
+        self._cronometro = cronometro
+        if entrada is None:
+            codigos = self.tokens.tipos.tobytes().translate(TIPO_SINTATICO)
+            if IGNORADO in codigos:
+                self._posicoes = array('I', [indice for indice, codigo in enumerate(codigos) if codigo != IGNORADO])
+                codigos = codigos.replace(bytes([IGNORADO]), b'')
+            else:
+                self._posicoes = None
+            self._tipos = list(codigos)
+            self._tipos.append(SEM_TOKEN)
+            self._total = len(codigos)
+        else:
+            self._posicoes = array('I')
+            self._tipos = []
+            self._total = None
+        self.arvore = Arvore(self.tokens, self._posicoes)
+
+    def _carregar(self, indice):
+        # Puxa tokens da entrada até ter _LOTE tokens a partir do índice (ou até ela acabar).
+        # Devolve até onde o token atual pode ir sem carregar mais (com _FOLGA tokens à frente)
+        if self._entrada is None:
+            return _SEM_LIMITE
+        tipos, posicoes = self._tipos, self._posicoes
+        alvo = indice + _LOTE
+        with self._cronometro.fase('lexico'):
+            for posicao, tipo in self._entrada:
+                posicoes.append(posicao)
+                tipos.append(tipo)
+                if len(tipos) >= alvo:
+                    return alvo - _FOLGA
+        self._entrada = None
+        self._total = len(tipos)
+        tipos.append(SEM_TOKEN)
+        return _SEM_LIMITE
+
+    def _olhar(self, indice):
+        # Tipo do token no índice (SEM_TOKEN depois do último), carregando-o se preciso
+        if indice >= len(self._tipos):
+            self._carregar(indice)
+            if indice >= len(self._tipos):
+                return SEM_TOKEN
+        return self._tipos[indice]
+
+    def _posicao(self, indice):
+        return indice if self._posicoes is None else self._posicoes[indice]
+
+    def _lexema(self, indice):
+        return self.tokens.lexema(self._posicao(indice))
+
+    def add_error(self, diagnostico):
+        # Repetições seguidas do mesmo erro na mesma linha contam uma vez só (mesmo em outra coluna)
+        errors = self.errors
+        if self._max_erros is not None and len(errors) >= self._max_erros:
+            self.orcamento.estourar('diagnosticos')
+            return
+        if errors:
+            ultimo = errors[-1]
+            if ultimo.codigo == diagnostico.codigo and ultimo.linha == diagnostico.linha and ultimo.args == diagnostico.args:
+                return
+        errors.append(diagnostico)
+
+    def _erro(self, codigo, indice, *args):
+        # Erro na posição do token no índice (linha/coluna None no fim dos tokens)
+        if self._olhar(indice) != SEM_TOKEN:
+            posicao = self._posicao(indice)
+            self.add_error(Diagnostico(codigo, self.tokens.linha(posicao), self.tokens.coluna(posicao), args))
         else:
-            self.add_error(f"Fim de arquivo inesperado. Esperava '{expected_type}'.") # add_error vai pegar a linha "N/A" ou do último token
-        return False
+            self.add_error(Diagnostico(codigo, None, None, args))
+
+    def _erro_ou_ultimo(self, codigo, indice, *args):
+        # Como _erro, mas no fim dos tokens usa a posição do último token (se houver)
+        if self._olhar(indice) == SEM_TOKEN and self._total:
+            indice = self._total - 1
+        self._erro(codigo, indice, *args)
+
+    def _esperava(self, indice, esperado):
+        # Erro de um token obrigatório que não veio
+        if self._olhar(indice) != SEM_TOKEN:
+            self._erro('TOKEN_INESPERADO', indice, self._lexema(indice), TIPOS_TOKEN[esperado])
+        else:
+            self._erro_ou_ultimo('FIM_INESPERADO', indice, TIPOS_TOKEN[esperado])
+
+    def _casar(self, indice, *esperados):
+        # Casa uma sequência de tokens obrigatórios; para no primeiro que falta (com erro).
+        # Devolve (novo índice, se casou todos)
+        olhar = self._olhar
+        for esperado in esperados:
+            if olhar(indice) == esperado:
+                indice += 1
+            else:
+                self._esperava(indice, esperado)
+                return indice, False
+        return indice, True
+
+    def _folha(self, tipo, indice):
+        # Nó sem filhos na árvore
+        arvore = self.arvore
+        arvore.tipos.append(tipo)
+        arvore.tokens.append(indice)
+        arvore.fins.append(len(arvore.fins) + 1)
+
+    def _parametros(self, i):
+        # <Parametros>: sem recursão, então resolvido direto
+        olhar = self._olhar
+        if olhar(i) == ID:
+            self._folha(nos.PARAMETRO, i)
+            i += 1
+            while olhar(i) == VIRGULA:
+                i += 1
+                if olhar(i) == ID:
+                    self._folha(nos.PARAMETRO, i)
+                    i += 1
+                else:
+                    self._esperava(i, ID)
+                    self._erro('PARAMETRO_AUSENTE_APOS_VIRGULA', i)
+                    break
+        return i
 
+    def parse(self):
+        """
+        Analisa os tokens.
+
+        Returns:
+            list[tuple]: (linha ou "N/A", mensagem) de cada erro. Para os erros estruturados
+                         (com coluna e código) use analisar().
+        """
+        return [
+            ("N/A" if diagnostico.linha is None else diagnostico.linha, renderizar(diagnostico))
+            for diagnostico in self.analisar()
+        ]
 
-    def parse_program(self):
-        
-        if self.match('INICIO_PROGRAMA'): # Espera o token 'BORA'
-            self.parse_command_list() # Tenta analisar a lista de comandos
-            if not self.match('FIM_PROGRAMA'): # Espera o token 'BIRL!'
-                self.add_error("Comando 'BIRL!' ausente ou mal posicionado no final do programa.")
+    def analisar(self):
+        """
+        Analisa os tokens e devolve a lista de diagnosticos.Diagnostico encontrados.
+
+        Com um orçamento, para ao atingir o limite de erros ou de tempo (conferidos a cada
+        alguns comandos) e devolve os erros encontrados até ali.
+        """
+        tipos = self._tipos
+        carregar = self._carregar
+        lexema = self._lexema
+        erro = self._erro
+        casar = self._casar
+        tabela_comando = TABELA_COMANDO
+        termos_simples = TERMOS_SIMPLES
+        operadores = OPERADORES_EXPRESSAO
+        fim_de_expressao = EXPRESSION_END_DELIMITERS
+        orcamento = self.orcamento
+        comandos_ate_conferir = 256
+
+        # A árvore: cada nó aberto entra em 'abertos' e sai em _FECHA_NO, quando o fim da
+        # subárvore fica conhecido
+        arvore = self.arvore
+        novo_tipo, novo_token, novo_fim = arvore.tipos.append, arvore.tokens.append, arvore.fins.append
+        fins = arvore.fins
+        abertos = []
+        EXPRESSAO, OPERADOR = nos.EXPRESSAO, nos.OPERADOR
+
+        pilha = [_FIM]
+        valores = [] # Dados guardados pelas regras entre um estado e outro (índices)
+        ok = False   # Retorno da última regra concluída
+        i = 0
+        janela = carregar(i) # O token atual pode ir até aqui sem carregar mais tokens
+
+        # <Programa>
+        i, ok = casar(i, INICIO_PROGRAMA)
+        if ok:
+            abertos.append(len(fins))
+            novo_tipo(nos.PROGRAMA); novo_token(0); novo_fim(0)
+            pilha.append(_FECHA_NO)
+            pilha.append(_PROGRAMA_FIM)
+            estado = _LISTA_COMANDOS
         else:
-            self.add_error("Comando 'BORA' ausente ou mal posicionado no início do programa.")
-        
-        # Verifica se há tokens restantes após o programa ser parseado (indicando lixo no código)
-        if self.current_token():
-            self.add_error(f"Tokens extras após 'BIRL!': '{self.current_token()[1]}'.", self.current_token()[0])
-
+            self._erro_ou_ultimo('BORA_AUSENTE', i)
+            estado = _FIM
+
+        # Os estados mais frequentes vêm primeiro na cadeia de comparações
+        while estado != _FIM:
+            if i >= janela:
+                janela = carregar(i)
+            tipo = tipos[i]
+
+            # --- <Expressao> ::= <Termo> (<Operador> <Termo>)*
+            if estado == _EXPRESSAO:
+                no = len(fins)
+                novo_tipo(EXPRESSAO); novo_token(i); novo_fim(0)
+                if tipo in termos_simples:
+                    # Caminho rápido: termos simples ligados por operadores, sem empilhar nada
+                    novo_tipo(TIPO_FOLHA[tipo]); novo_token(i); novo_fim(no + 2)
+                    i += 1
+                    tipo = tipos[i]
+                    while tipo in operadores and i < janela and tipos[i + 1] in termos_simples:
+                        fim = len(fins)
+                        novo_tipo(OPERADOR); novo_token(i); novo_fim(fim + 1)
+                        novo_tipo(TIPO_FOLHA[tipos[i + 1]]); novo_token(i + 1); novo_fim(fim + 2)
+                        i += 2
+                        tipo = tipos[i]
+                    if tipo in fim_de_expressao:
+                        fins[no] = len(fins)
+                        ok = True
+                        estado = pilha.pop()
+                    else:
+                        abertos.append(no)
+                        pilha.append(_FECHA_NO)
+                        estado = _EXPRESSAO_RESTO
+                else:
+                    abertos.append(no)
+                    pilha.append(_FECHA_NO)
+                    pilha.append(_EXPRESSAO_APOS_TERMO)
+                    estado = _TERMO
+
+            # --- <ListaComandos>: o comando é escolhido pela tabela LL(1)
+            elif estado == _LISTA_COMANDOS:
+                if tipo == SEM_TOKEN or tipo in COMANDO_STOP_TOKENS:
+                    estado = pilha.pop()
+                else:
+                    if orcamento is not None:
+                        comandos_ate_conferir -= 1
+                        if not comandos_ate_conferir:
+                            comandos_ate_conferir = 256
+                            if orcamento.estourado is not None or orcamento.sem_tempo():
+                                break
+                    valores.append(i) # Posição antes do comando, para detectar se o parser avançou
+                    pilha.append(_LISTA_COMANDOS_APOS_COMANDO)
+                    estado = tabela_comando.get(tipo, _COMANDO_INVALIDO)
+
+            elif estado == _FECHA_NO:
+                fins[abertos.pop()] = len(fins)
+                estado = pilha.pop()
+
+            elif estado == _LISTA_COMANDOS_APOS_COMANDO:
+                inicio_comando = valores.pop()
+                estado = _LISTA_COMANDOS
+                if not ok:
+                    if i == inicio_comando and tipo != SEM_TOKEN:
+                        # Adiciona um erro genérico para o comando não processado e força o avanço
+                        erro('COMANDO_NAO_PROCESSADO', i, lexema(i))
+                        i += 1
+                    elif tipo == SEM_TOKEN:
+                        estado = pilha.pop()
+
+            elif estado == _DECLARACAO_VAR:
+                # <DeclaracaoVar> ::= VARIAVEL ID ATRIBUICAO <Expressao>
+                if tipos[i + 1] == ID and tipos[i + 2] == ATRIBUICAO:
+                    abertos.append(len(fins))
+                    novo_tipo(nos.DECLARACAO); novo_token(i + 1); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    i += 3
+                    estado = _EXPRESSAO
+                else:
+                    i, ok = casar(i + 1, ID, ATRIBUICAO)
+                    estado = pilha.pop()
+
+            elif estado == _EXPRESSAO_RESTO:
+                if tipo in operadores:
+                    novo_tipo(OPERADOR); novo_token(i); novo_fim(len(fins) + 1)
+                    i += 1
+                    pilha.append(_EXPRESSAO_APOS_OPERADOR)
+                    estado = _TERMO
+                elif tipo in fim_de_expressao:
+                    ok = True
+                    estado = pilha.pop()
+                else:
+                    # Token que não pode seguir uma expressão
+                    if tipo in termos_simples or tipo == PARENTESES_ABRE:
+                        erro('OPERADOR_AUSENTE', i, lexema(i - 1), lexema(i))
+                    else:
+                        erro('TOKEN_INESPERADO_NA_EXPRESSAO', i, lexema(i), lexema(i - 1))
+                    i += 1 # Avança o token para tentar sincronizar
+                    ok = False
+                    estado = pilha.pop()
+
+            elif estado == _EXPRESSAO_APOS_TERMO:
+                estado = _EXPRESSAO_RESTO if ok else pilha.pop()
+
+            elif estado == _EXPRESSAO_APOS_OPERADOR:
+                if ok:
+                    estado = _EXPRESSAO_RESTO
+                else:
+                    erro('TERMO_AUSENTE_APOS_OPERADOR', i, lexema(i - 1))
+                    estado = pilha.pop()
+
+            elif estado == _TERMO:
+                if tipo in termos_simples:
+                    novo_tipo(TIPO_FOLHA[tipo]); novo_token(i); novo_fim(len(fins) + 1)
+                    i += 1
+                    ok = True
+                    estado = pilha.pop()
+                elif tipo == PARENTESES_ABRE: # Coloca anilha
+                    valores.append(i)
+                    i += 1
+                    pilha.append(_TERMO_APOS_PARENTESES)
+                    estado = _EXPRESSAO
+                else:
+                    if tipo == SEM_TOKEN:
+                        erro('TERMO_NO_FIM_DO_ARQUIVO', i)
+                    else:
+                        erro('TERMO_INESPERADO', i, lexema(i))
+                        i += 1
+                    ok = False
+                    estado = pilha.pop()
+
+            elif estado == _TERMO_APOS_PARENTESES:
+                abertura = valores.pop()
+                if not ok:
+                    erro('PARENTESES_INCOMPLETO', abertura)
+                elif tipo == PARENTESES_FECHA: # Tira anilha
+                    i += 1
+                else:
+                    i, ok = casar(i, PARENTESES_FECHA)
+                estado = pilha.pop()
+
+            # --- <Impressao> ::= PRINT PARENTESES_ABRE <ListaExpressoes> PARENTESES_FECHA
+            elif estado == _IMPRESSAO:
+                if tipos[i + 1] == PARENTESES_ABRE:
+                    abertos.append(len(fins))
+                    novo_tipo(nos.IMPRESSAO); novo_token(i); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    i += 2
+                    pilha.append(_IMPRESSAO_APOS_LISTA)
+                    pilha.append(_LISTA_EXPRESSOES_APOS_PRIMEIRA)
+                    estado = _EXPRESSAO
+                else:
+                    i, ok = casar(i + 1, PARENTESES_ABRE)
+                    erro('COLOCA_ANILHA_AUSENTE', i)
+                    estado = pilha.pop()
+
+            elif estado == _IMPRESSAO_APOS_LISTA:
+                if ok:
+                    i, ok = casar(i, PARENTESES_FECHA)
+                    if not ok:
+                        erro('TIRA_ANILHA_AUSENTE', i)
+                else:
+                    erro('IMPRESSAO_INVALIDA', i)
+                estado = pilha.pop()
+
+            # --- <ListaExpressoes> ::= <Expressao> (VIRGULA <Expressao>)*
+            elif estado == _LISTA_EXPRESSOES_APOS_PRIMEIRA or estado == _LISTA_EXPRESSOES_APOS_VIRGULA:
+                if not ok:
+                    if estado == _LISTA_EXPRESSOES_APOS_VIRGULA:
+                        erro('EXPRESSAO_AUSENTE_APOS_VIRGULA', i)
+                    estado = pilha.pop()
+                elif tipo == VIRGULA:
+                    i += 1
+                    pilha.append(_LISTA_EXPRESSOES_APOS_VIRGULA)
+                    estado = _EXPRESSAO
+                else:
+                    estado = pilha.pop()
+
+            elif estado == _ATRIBUICAO:
+                # ID só começa uma atribuição se o token seguinte for um operador de atribuição
+                if tipos[i + 1] in OPERADORES_ATRIBUICAO:
+                    abertos.append(len(fins))
+                    novo_tipo(nos.ATRIBUICAO if tipos[i + 1] == ATRIBUICAO else nos.ATRIBUICAO_COMPOSTA)
+                    novo_token(i); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    i += 2
+                    estado = _EXPRESSAO
+                else:
+                    erro('COMANDO_INVALIDO', i, lexema(i))
+                    i += 1
+                    ok = False
+                    estado = pilha.pop()
+
+            elif estado == _COMANDO_INVALIDO:
+                # Nenhum comando conhecido inicia com este token
+                erro('COMANDO_NAO_RECONHECIDO', i, lexema(i))
+                i += 1
+                ok = False
+                estado = pilha.pop()
+
+            # --- <Condicional> ::= IF <Expressao> DOIS_PONTOS <ListaComandos> <ListaElif> <Senao>
+            elif estado == _CONDICIONAL:
+                abertos.append(len(fins))
+                novo_tipo(nos.CONDICIONAL); novo_token(i); novo_fim(0)
+                pilha.append(_FECHA_NO)
+                i += 1 # CONFERE_AI
+                pilha.append(_CONDICIONAL_APOS_CONDICAO)
+                estado = _EXPRESSAO
+
+            elif estado == _CONDICIONAL_APOS_CONDICAO:
+                if ok:
+                    i, ok = casar(i, DOIS_PONTOS)
+                    if ok:
+                        pilha.append(_CONDICIONAL_APOS_BLOCO)
+                        estado = _LISTA_COMANDOS
+                        continue
+                    erro('DOIS_PONTOS_AUSENTE', i, "condição 'CONFERE_AI'")
+                estado = pilha.pop()
+
+            elif estado == _CONDICIONAL_APOS_BLOCO:
+                pilha.append(_CONDICIONAL_APOS_ELIF)
+                estado = _LISTA_ELIF
+
+            elif estado == _CONDICIONAL_APOS_ELIF:
+                pilha.append(_RETORNA_VERDADEIRO)
+                estado = _SENAO
+
+            elif estado == _LISTA_ELIF:
+                if tipo == ELIF: # CONFERE_MAIS
+                    abertos.append(len(fins))
+                    novo_tipo(nos.SENAO_SE); novo_token(i); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    i += 1
+                    pilha.append(_LISTA_ELIF_APOS_CONDICAO)
+                    estado = _EXPRESSAO
+                else:
+                    estado = pilha.pop()
+
+            elif estado == _LISTA_ELIF_APOS_CONDICAO:
+                if ok:
+                    i, ok = casar(i, DOIS_PONTOS)
+                    if ok:
+                        # O próximo CONFERE_MAIS é irmão deste: _LISTA_ELIF fica abaixo do _FECHA_NO dele
+                        pilha[-1] = _LISTA_ELIF
+                        pilha.append(_FECHA_NO)
+                        estado = _LISTA_COMANDOS
+                        continue
+                    erro('DOIS_PONTOS_AUSENTE', i, "condição 'CONFERE_MAIS'")
+                else:
+                    erro('CONDICAO_ELIF_INVALIDA', i)
+                estado = pilha.pop()
+
+            elif estado == _SENAO:
+                if tipo == ELSE: # OU_NAO
+                    senao = i
+                    i, ok = casar(i + 1, DOIS_PONTOS)
+                    if ok:
+                        abertos.append(len(fins))
+                        novo_tipo(nos.SENAO); novo_token(senao); novo_fim(0)
+                        pilha.append(_FECHA_NO)
+                        estado = _LISTA_COMANDOS
+                        continue
+                    erro('DOIS_PONTOS_AUSENTE', i, "'OU_NAO'")
+                estado = pilha.pop()
+
+            # --- <Loop> ::= WHILE <Expressao> DOIS_PONTOS <ListaComandos>
+            elif estado == _LOOP:
+                abertos.append(len(fins))
+                novo_tipo(nos.LOOP); novo_token(i); novo_fim(0)
+                pilha.append(_FECHA_NO)
+                i += 1 # TREINA ATÉ
+                pilha.append(_LOOP_APOS_CONDICAO)
+                estado = _EXPRESSAO
+
+            elif estado == _LOOP_APOS_CONDICAO:
+                if ok:
+                    i, ok = casar(i, DOIS_PONTOS)
+                    if ok:
+                        pilha.append(_RETORNA_VERDADEIRO)
+                        estado = _LISTA_COMANDOS
+                        continue
+                    erro('DOIS_PONTOS_AUSENTE', i, "condição 'TREINA ATÉ'")
+                estado = pilha.pop()
+
+            # --- <DeclaracaoFuncao> ::= FUNC ID ( <Parametros> ) DOIS_PONTOS <ListaComandos>
+            elif estado == _DECLARACAO_FUNCAO:
+                nome = i + 1
+                i, ok = casar(nome, ID, PARENTESES_ABRE)
+                if ok:
+                    abertos.append(len(fins))
+                    novo_tipo(nos.FUNCAO); novo_token(nome); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    i = self._parametros(i)
+                    i, ok = casar(i, PARENTESES_FECHA)
+                    if ok:
+                        i, ok = casar(i, DOIS_PONTOS)
+                        if ok:
+                            pilha.append(_RETORNA_VERDADEIRO)
+                            estado = _LISTA_COMANDOS
+                            continue
+                        erro('DOIS_PONTOS_AUSENTE', i, 'declaração da função')
+                estado = pilha.pop()
+
+            # --- <ChamadaFuncao> ::= CALL ID ( <Argumentos> ), com <Argumentos> opcional
+            elif estado == _CHAMADA_FUNCAO:
+                nome = i + 1
+                i, ok = casar(nome, ID, PARENTESES_ABRE)
+                if not ok:
+                    estado = pilha.pop()
+                else:
+                    abertos.append(len(fins))
+                    novo_tipo(nos.CHAMADA); novo_token(nome); novo_fim(0)
+                    pilha.append(_FECHA_NO)
+                    pilha.append(_CHAMADA_FUNCAO_APOS_ARGUMENTOS)
+                    tipo = tipos[i]
+                    if tipo != SEM_TOKEN and tipo != PARENTESES_FECHA:
+                        pilha.append(_ARGUMENTOS_APOS_PRIMEIRO)
+                        estado = _EXPRESSAO
+                    else:
+                        estado = pilha.pop()
+
+            elif estado == _CHAMADA_FUNCAO_APOS_ARGUMENTOS:
+                i, ok = casar(i, PARENTESES_FECHA)
+                estado = pilha.pop()
+
+            elif estado == _ARGUMENTOS_APOS_PRIMEIRO or estado == _ARGUMENTOS_APOS_VIRGULA:
+                if not ok:
+                    if estado == _ARGUMENTOS_APOS_PRIMEIRO:
+                        erro('ARGUMENTO_INVALIDO', i)
+                    else:
+                        erro('ARGUMENTO_AUSENTE_APOS_VIRGULA', i)
+                    estado = pilha.pop()
+                elif tipo == VIRGULA:
+                    i += 1
+                    pilha.append(_ARGUMENTOS_APOS_VIRGULA)
+                    estado = _EXPRESSAO
+                else:
+                    estado = pilha.pop()
 
-    def parse_command_list(self):
-       
-        stop_tokens = ['FIM_PROGRAMA', 'ELIF', 'ELSE', 'PARENTESES_FECHA'] 
+            elif estado == _RETORNA_VERDADEIRO:
+                ok = True
+                estado = pilha.pop()
 
-        while self.current_token() and self.current_token()[2] not in stop_tokens:
-            start_index_before_command = self.current_token_index # Guarda a posição para detectar se o parser avançou
+            elif estado == _PROGRAMA_FIM:
+                i, ok = casar(i, FIM_PROGRAMA) # Espera o token 'BIRL!'
+                if not ok:
+                    self._erro_ou_ultimo('BIRL_AUSENTE', i)
+                estado = pilha.pop()
 
-            if not self.parse_command(): 
-               
-                if self.current_token_index == start_index_before_command and self.current_token():
-                    # Adiciona um erro genérico para o comando não processado e força o avanço
-                    self.add_error(f"Erro: Não foi possível processar o comando '{self.current_token()[1]}'. Tentando sincronizar.", self.current_token()[0])
-                    self.advance() # Força o avanço para evitar loop infinito
-                elif not self.current_token(): # Se não há mais tokens, sai do loop
-                    break
-            # Se parse_command() foi bem-sucedido, ele já avançou o token, o loop recomeça para o próximo.
-
-
-    def parse_command(self):
-        # Regra: <Comando> ::= <DeclaracaoVar> | <Atribuicao> | <Impressao> | <Condicional> | <Loop> | <DeclaracaoFuncao> | <ChamadaFuncao>
-        token = self.current_token()
-        if not token: return False # Se não há token, não há comando para parsear
-
-        # Tenta casar com cada tipo de comando pelo seu token inicial
-        if token[2] == 'VARIAVEL': # MONSTRO
-            return self.parse_declaration_var()
-        elif token[2] == 'PRINT': # GRITA
-            return self.parse_print()
-        elif token[2] == 'IF': # CONFERE_AI
-            return self.parse_conditional()
-        elif token[2] == 'WHILE': # TREINA ATÉ
-            return self.parse_loop()
-        elif token[2] == 'FUNC': # FICA GRANDE
-            return self.parse_declaration_function()
-        elif token[2] == 'CALL': # CHAMA
-            return self.parse_call_function()
-        elif token[2] == 'ID': # Pode ser início de Atribuição
-            if self.current_token_index + 1 < len(self.tokens):
-                next_token_info = self.tokens[self.current_token_index + 1] 
-                if next_token_info[2] in ['ATRIBUICAO', 'OP_ATRIBUICAO_COMPOSTA']:
-                    return self.parse_assignment()
-            
-            self.add_error(f"Comando inválido. Esperava 'MONSTRO', 'GRITA', 'CONFERE_AI', 'TREINA ATÉ', 'FICA GRANDE', 'CHAMA' ou uma atribuição. Encontrou: '{token[1]}'", token[0])
-            self.advance() # Consome o token para tentar continuar e evitar loops
-            return False
-        
-        else: # Nenhum comando conhecido inicia com este token
-            self.add_error(f"Comando não reconhecido ou mal formado: '{token[1]}'", token[0])
-            self.advance() # Força o avanço para evitar loops
-            return False
-
-    def parse_declaration_var(self):
-        # Regra: <DeclaracaoVar> ::= VARIAVEL ID ATRIBUICAO <Expressao>
-        if self.match('VARIAVEL'): # Espera 'MONSTRO'
-            if self.match('ID'): # Espera o nome da variável
-                if self.match('ATRIBUICAO'): # Espera 'TASAINDODAJAULA'
-                    return self.parse_expression() # Espera o valor/expressão a ser atribuído
-        return False # Retorna False se qualquer match falhar (match já adiciona o erro)
-
-    def parse_assignment(self):
-        # Regra: <Atribuicao> ::= ID (ATRIBUICAO | OP_ATRIBUICAO_COMPOSTA) <Expressao>
-        if self.match('ID'): # Espera o nome da variável a ser atribuída
-            if self.current_token() and self.current_token()[2] in ['ATRIBUICAO', 'OP_ATRIBUICAO_COMPOSTA']:
-                self.advance() # Consome o operador de atribuição
-                return self.parse_expression() # Espera a expressão do valor
-        return False
-
-    def parse_print(self):
-        # Regra: <Impressao> ::= PRINT PARENTESES_ABRE <ListaExpressoes> PARENTESES_FECHA
-        if self.match('PRINT'): # Espera 'GRITA'
-            if self.match('PARENTESES_ABRE'): # Espera 'Coloca anilha'
-                # Tenta analisar a lista de expressões dentro dos parênteses
-                if self.parse_expression_list(): 
-                    # Espera 'Tira anilha' para fechar
-                    if self.match('PARENTESES_FECHA'): 
-                        return True # GRITA parseado com sucesso
-                    else: # Erro: Faltou 'Tira anilha'
-                        self.add_error(f"Delimitador 'Tira anilha' ausente após lista de impressão.", self.current_token()[0] if self.current_token() else "N/A")
-                else: # Erro: Expressão inválida/ausente dentro do GRITA(...)
-                    self.add_error(f"Expressão ou lista de expressões inválida dentro de GRITA Coloca anilha ... Tira anilha.", self.current_token()[0] if self.current_token() else "N/A")
-                    return False
-            else: # Erro: Faltou 'Coloca anilha' após GRITA
-                self.add_error(f"Delimitador 'Coloca anilha' ausente após 'GRITA'.", self.current_token()[0] if self.current_token() else "N/A")
-                return False
-        return False 
-
-
-    def parse_expression_list(self):
-        
-        if not self.parse_expression(): # Espera a primeira expressão
-            # Erro já é adicionado em parse_expression(). Aqui, apenas indicamos que falhou.
-            return False
-        
-        while self.current_token() and self.current_token()[2] == 'VIRGULA':
-            self.advance() # Consome a vírgula
-            if not self.parse_expression(): # Espera outra expressão após a vírgula
-                self.add_error(f"Expressão ausente ou mal formada após vírgula na lista de expressões.", self.current_token()[0] if self.current_token() else "N/A")
-                return False
-        return True # Retorna True mesmo se não houver mais vírgulas (lista pode ter apenas 1 item)
-
-    def parse_expression(self):
-        # Regra: <Expressao> ::= <Termo> (<Operador> <Termo>)*
-        if not self.parse_term(): # Uma expressão deve começar com um termo
-            return False
-        
-        
-        while self.current_token() and \
-              self.current_token()[2] in ['OP_ARITMETICO', 'OP_LOGICO', 'OP_RELACIONAL_OU_IGUALDADE']:
-            self.advance() # Consome o operador
-            if not self.parse_term(): # Espera outro termo após o operador
-                self.add_error(f"Expressão incompleta. Esperava um termo após o operador '{self.tokens[self.current_token_index-1][1]}'.", self.current_token()[0] if self.current_token() else "N/A")
-                return False 
-        
-    
-        EXPRESSION_END_DELIMITERS = [
-            'DOIS_PONTOS',       # Fim de condição IF/WHILE/FUNC
-            'PARENTESES_FECHA',  # Fim de (expressão) ou (arg1, arg2)
-            'VIRGULA',           # Separador em lista de expressões/argumentos
-            'FIM_PROGRAMA',      # Fim do programa
-            'ELIF',              # Início de ELIF
-            'ELSE',              # Início de ELSE
-            'VARIAVEL',          # Início de MONSTRO
-            'PRINT',             # Início de GRITA
-            'IF',                # Início de CONFERE_AI
-            'WHILE',             # Início de TREINA ATÉ
-            'FUNC',              # Início de FICA GRANDE
-            'CALL',              # Início de CHAMA
-            'ID',                # Início de ID (que pode ser atribuição)
-            None                 # Fim do arquivo (EOF)
-        ]
-        
-     
-        if self.current_token() and \
-           self.current_token()[2] not in EXPRESSION_END_DELIMITERS:
-            
-            # Se o token atual é outro TERMO (NUM, ID, STRING, etc.) significa que o operador está faltando entre dois termos
-            if self.current_token()[2] in ['NUM', 'NUM_DECIMAL', 'STRING', 'BOOLEAN_VERDADEIRO', 'BOOLEAN_FALSO', 'ID', 'PARENTESES_ABRE']:
-                 self.add_error(f"Expressão mal formada: Operador ausente entre '{self.tokens[self.current_token_index-1][1]}' e '{self.current_token()[1]}'.", self.current_token()[0])
-                 self.advance() # Avança o token para tentar sincronizar
-                 return False 
-            else:
-                 # Outro tipo de token inesperado no meio da expressão
-                 self.add_error(f"Expressão mal formada: Token inesperado '{self.current_token()[1]}' após '{self.tokens[self.current_token_index-1][1]}'.", self.current_token()[0])
-                 self.advance()
-                 return False
-        return True # Se a expressão foi analisada sem erros nesse ponto, retorna True
-
-
-    def parse_term(self):
-        
-        token = self.current_token()
-        if not token: 
-            self.add_error("Termo inesperado: fim de arquivo ou token inválido.", "N/A")
-            return False
-
-        if token[2] in ['NUM', 'NUM_DECIMAL', 'STRING', 'BOOLEAN_VERDADEIRO', 'BOOLEAN_FALSO', 'ID']:
-            self.advance()
-            return True
-        elif token[2] == 'PARENTESES_ABRE': # Coloca anilha
-            self.advance() # Consome PARENTESES_ABRE
-            if not self.parse_expression():
-                self.add_error(f"Expressão incompleta dentro de parênteses.", token[0])
-                return False
-            if not self.match('PARENTESES_FECHA'): # Tira anilha
-                return False 
-            return True
-        else:
-            self.add_error(f"Termo inesperado na expressão: '{token[1]}'", token[0])
-            self.advance()
-            return False
-
-
-    def parse_conditional(self):
-        # <Condicional> ::= IF <Expressao> DOIS_PONTOS <ListaComandos> <ElifOpcional> <ElseOpcional>
-        if self.match('IF'): # CONFERE_AI
-            if self.parse_expression(): # Condição
-                if self.match('DOIS_PONTOS'): # Dois pontos após a condição
-                    self.parse_command_list() # Comandos dentro do IF
-                    self.parse_elif_optional() # Partes opcionais
-                    self.parse_else_optional() # Partes opcionais
-                    return True
-                else: 
-                    self.add_error(f"Dois pontos ':' ausente após condição 'CONFERE_AI'.", self.current_token()[0] if self.current_token() else "N/A")
-            return False 
-        return False
-
-    def parse_elif_optional(self):
-       
-        while self.current_token() and self.current_token()[2] == 'ELIF': # CONFERE_MAIS
-            self.advance() # Consome ELIF
-            if self.parse_expression(): # Condição do ELIF
-                if self.match('DOIS_PONTOS'): # Dois pontos
-                    self.parse_command_list() # Comandos do ELIF
-                else:
-                    self.add_error(f"Dois pontos ':' ausente após condição 'CONFERE_MAIS'.", self.current_token()[0] if self.current_token() else "N/A")
-                    return False
-            else:
-                self.add_error(f"Expressão de condição ausente ou inválida após 'CONFERE_MAIS'.", self.current_token()[0] if self.current_token() else "N/A")
-                return False
-        return True
-
-    def parse_else_optional(self):
-       
-        if self.current_token() and self.current_token()[2] == 'ELSE': # OU_NAO
-            self.advance() # Consome ELSE
-            if self.match('DOIS_PONTOS'): # Dois pontos
-                self.parse_command_list() # Comandos do ELSE
-            else:
-                self.add_error(f"Dois pontos ':' ausente após 'OU_NAO'.", self.current_token()[0] if self.current_token() else "N/A")
-                return False
-        return True
-
-    def parse_loop(self):
-       
-        if self.match('WHILE'): # TREINA ATÉ
-            if self.parse_expression(): # Condição do loop
-                if self.match('DOIS_PONTOS'): # Dois pontos
-                    self.parse_command_list() # Comandos do loop
-                    return True
-                else: # Erro: DOIS_PONTOS faltando
-                    self.add_error(f"Dois pontos ':' ausente após condição 'TREINA ATÉ'.", self.current_token()[0] if self.current_token() else "N/A")
-            return False
-        return False
-
-    def parse_declaration_function(self):
-        
-        if self.match('FUNC'): # FICA GRANDE
-            if self.match('ID'): # Nome da função
-                if self.match('PARENTESES_ABRE'): # Coloca anilha
-                    self.parse_parameters_optional() # Parâmetros opcionais
-                    if self.match('PARENTESES_FECHA'): # Tira anilha
-                        if self.match('DOIS_PONTOS'): # Dois pontos
-                            self.parse_command_list() # Comandos da função
-                            return True
-                        else: # Erro: DOIS_PONTOS faltando
-                            self.add_error(f"Dois pontos ':' ausente após declaração da função.", self.current_token()[0] if self.current_token() else "N/A")
-                    return False
-                return False
-            return False
-        return False
-
-    def parse_parameters_optional(self):
-        # <ListaParametrosOpcional> ::= <ListaParametros> | ε
-        # <ListaParametros> ::= ID | ID VIRGULA <ListaParametros>
-        if self.current_token() and self.current_token()[2] == 'ID':
-            self.match('ID') # Consome o primeiro parâmetro
-            while self.current_token() and self.current_token()[2] == 'VIRGULA':
-                self.advance() # Consome a vírgula
-                if not self.match('ID'): # Espera outro ID
-                    self.add_error(f"Identificador ausente após vírgula na lista de parâmetros.", self.current_token()[0] if self.current_token() else "N/A")
-                    return False
-        return True
-
-    def parse_call_function(self):
-        # <ChamadaFuncao> ::= CALL ID PARENTESES_ABRE <ListaArgumentosOpcional> PARENTESES_FECHA
-        if self.match('CALL'): # CHAMA
-            if self.match('ID'): # Nome da função
-                if self.match('PARENTESES_ABRE'): # Coloca anilha
-                    self.parse_arguments_optional() # Argumentos opcionais
-                    if self.match('PARENTESES_FECHA'): # Tira anilha
-                        return True
-        return False
-
-    def parse_arguments_optional(self):
-        # <ListaArgumentosOpcional> ::= <ListaArgumentos> | ε
-        # <ListaArgumentos> ::= <Expressao> | <Expressao> VIRGULA <ListaArgumentos>
-        if self.current_token() and self.current_token()[2] != 'PARENTESES_FECHA':
-            if not self.parse_expression(): # Espera a primeira expressão
-                self.add_error(f"Expressão de argumento ausente ou mal formada.", self.current_token()[0] if self.current_token() else "N/A")
-                return False
-            while self.current_token() and self.current_token()[2] == 'VIRGULA':
-                self.advance() # Consome a vírgula
-                if not self.parse_expression(): # Espera outra expressão
-                    self.add_error(f"Expressão de argumento ausente ou mal formada após vírgula.", self.current_token()[0] if self.current_token() else "N/A")
-                    return False
-        return True
+        # Nós ainda abertos (análise interrompida pelo orçamento) terminam no fim da árvore
+        for no in abertos:
+            fins[no] = len(fins)
 
+        # Verifica se há tokens restantes após o programa ser parseado (indicando lixo no código)
+        if self._olhar(i) != SEM_TOKEN and (orcamento is None or orcamento.estourado is None):
+            erro('TOKENS_EXTRAS', i, lexema(i))
 
-    def parse(self):
-        self.parse_program()
-        return self.errors
\ No newline at end of file
+        self.current_token_index = i
+        return self.errors
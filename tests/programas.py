@@ -0,0 +1,35 @@
+"""
+Programas BIRL! aleatórios para os testes de equivalência: programas de benchmarks.gerador,
+com e sem erros, e com trechos soltos inseridos ou apagados em posições quaisquer (aspas que
+não fecham, caracteres de vários bytes, outras quebras de linha, delimitadores soltos...).
+"""
+import random
+
+from benchmarks.gerador import gerar_programa
+
+# Trechos inseridos pelas mutações
+_TRECHOS = [
+    '"', 'Coloca anilha ', ' Tira anilha', 'MONSTRO ', 'BORA\n', '\nBIRL!', '@', 'É', 'TREINA ATÉ ',
+    '\n', '\r\n', '\r', ' ', '# comentário', ':', '99999999999999999999', ' ', 'x', '1.5', ' + ',
+    'CONFERE_AI x > 1:\n', 'OU_NAO:\n', 'TASAINDODAJAULA',
+]
+
+
+def mutar(codigo, rng, vezes):
+    """'codigo' com 'vezes' trechos de _TRECHOS inseridos ou pedaços curtos apagados."""
+    for _ in range(vezes):
+        posicao = rng.randint(0, len(codigo))
+        if rng.random() < 0.3:
+            codigo = codigo[:posicao] + codigo[posicao + rng.randint(1, 12):]
+        else:
+            codigo = codigo[:posicao] + rng.choice(_TRECHOS) + codigo[posicao:]
+    return codigo
+
+
+def programas(semente, quantidade, comandos=40):
+    """'quantidade' programas aleatórios (os mesmos para a mesma semente)."""
+    rng = random.Random(semente)
+    for _ in range(quantidade):
+        codigo = gerar_programa(rng.randint(1, comandos), semente=rng.randrange(10 ** 6),
+                                taxa_erros=rng.choice((0.0, 0.1, 0.3)))
+        yield mutar(codigo, rng, rng.randint(0, 8))
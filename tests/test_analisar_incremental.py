@@ -0,0 +1,37 @@
+"""Rota /analisar/incremental: abertura sob o prazo da requisição e edições."""
+import app as modulo_app
+from limites import Limites, Orcamento
+from lexer_incremental import DocumentoIncremental
+from tests.programas import programas
+
+
+def test_abertura_com_prazo_vencido_corta_e_nao_guarda_o_documento(monkeypatch):
+    # Prazo zero: só o primeiro bloco de linhas é analisado antes de o relógio ser consultado
+    monkeypatch.setattr(modulo_app, 'LIMITES', Limites(None, None, None, 0))
+    cliente = modulo_app.app.test_client()
+    codigo = '\n'.join(['BORA CUMPADE 1;'] * 5000)
+
+    resposta = cliente.post('/analisar/incremental', json={'documento': 'prazo', 'codigo': codigo})
+    assert resposta.status_code == 200
+    assert any(item.get('categoria') == 'aviso' for item in resposta.get_json())
+
+    edicao = {'linha_inicio': 1, 'linha_fim': 1, 'texto': 'BORA CUMPADE 2;'}
+    resposta = cliente.post('/analisar/incremental', json={'documento': 'prazo', 'edicao': edicao})
+    assert resposta.status_code == 409
+
+
+def test_abertura_sem_limites_da_o_mesmo_resultado_que_a_rota_completa():
+    cliente = modulo_app.app.test_client()
+    for indice, codigo in enumerate(programas(60, 10)):
+        incremental = cliente.post('/analisar/incremental', json={'documento': f'doc{indice}', 'codigo': codigo})
+        completa = cliente.post('/analisar', json={'codigo': codigo})
+        assert incremental.get_json() == completa.get_json()
+
+
+def test_abertura_em_blocos_igual_a_abertura_inteira():
+    codigo = '\n'.join(programas(61, 1, comandos=3000))
+    orcamento = Orcamento(Limites(None, None, None, None))
+    em_blocos = DocumentoIncremental(codigo, orcamento)
+    assert orcamento.estourado is None
+    assert em_blocos.texto == codigo
+    assert em_blocos.resultado() == DocumentoIncremental(codigo).resultado()
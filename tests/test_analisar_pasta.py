@@ -0,0 +1,24 @@
+"""analisar_pasta.py analisa sem os limites do servidor, a não ser com --limites."""
+import json
+
+import analisar_pasta
+from limites import Limites
+
+
+def _resultados(pasta, saida, *opcoes):
+    analisar_pasta.main([str(pasta), '-o', str(saida), '--workers', '1', *opcoes])
+    return [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+
+
+def test_sem_limites_por_padrao(tmp_path, monkeypatch):
+    monkeypatch.setattr(analisar_pasta, 'LIMITES', Limites(caracteres=None, tokens=5, diagnosticos=None, segundos=None))
+    pasta = tmp_path / 'programas'
+    pasta.mkdir()
+    (pasta / 'a.birl').write_text('BORA\n' + 'MONSTRO x TASAINDODAJAULA 1\n' * 20 + 'BIRL!\n', encoding='utf-8')
+
+    completo, = _resultados(pasta, tmp_path / 'saida.jsonl')
+    assert not any(item.get('truncado') for item in completo['resultado'])
+    assert sum(item['categoria'] == 'token' for item in completo['resultado']) == 82
+
+    truncado, = _resultados(pasta, tmp_path / 'saida_limites.jsonl', '--limites')
+    assert truncado['resultado'][0]['limite'] == 'tokens'
@@ -0,0 +1,100 @@
+"""Análise ao vivo (ao_vivo.py) e o fluxo SSE de /analisar/ao-vivo."""
+import json
+import queue
+import threading
+
+import pytest
+
+import app as modulo_app
+from analise import analisar_programa
+from ao_vivo import DocumentoDesconhecido, SessaoAoVivo, evento_sse
+from limites import Limites
+
+SEM_LIMITES = Limites(None, None, None, None)
+CODIGO = 'BORA\nMONSTRO x TASAINDODAJAULA 1\nGRITA Coloca anilha x Tira anilha\nBIRL!\n'
+
+
+def _ler_em_thread(sessao, **opcoes):
+    # Consome sessao.resultados() em outra thread; a fila recebe cada item e, no fim, 'fim'
+    fila = queue.Queue()
+    leitor = sessao.abrir_fluxo()
+
+    def ler():
+        for resultado in sessao.resultados(leitor, **opcoes):
+            fila.put(resultado)
+        fila.put('fim')
+    thread = threading.Thread(target=ler, daemon=True)
+    thread.start()
+    return leitor, fila, thread
+
+
+def test_so_a_ultima_revisao_e_analisada():
+    sessao = SessaoAoVivo(espera=0.2, limites=SEM_LIMITES)
+    leitor, fila, thread = _ler_em_thread(sessao)
+    sessao.enviar(1, codigo='BORA\nBIRL!\n')
+    sessao.enviar(2, codigo='BORA\nGRITA Coloca anilha 1 Tira anilha\nBIRL!\n')
+    sessao.enviar(3, codigo=CODIGO)
+    assert fila.get(timeout=10) == (3, analisar_programa(CODIGO, SEM_LIMITES))
+    assert sessao.analises == 1
+    sessao.fechar_fluxo(leitor)
+    assert fila.get(timeout=10) == 'fim'
+    thread.join(10)
+
+
+def test_edicoes_e_revisoes_fora_de_ordem():
+    sessao = SessaoAoVivo(espera=0, limites=SEM_LIMITES)
+    with pytest.raises(DocumentoDesconhecido):
+        sessao.enviar(1, edicao=(1, 1, 'BORA'))
+    assert sessao.enviar(1, codigo=CODIGO)
+    assert sessao.enviar(2, edicao=(3, 3, 'GRITA Coloca anilha x + 1 Tira anilha'))
+    # Uma revisão velha não muda o documento
+    assert not sessao.enviar(2, edicao=(1, 1, ''))
+    _, fila, _ = _ler_em_thread(sessao)
+    editado = CODIGO.replace('anilha x Tira', 'anilha x + 1 Tira')
+    assert fila.get(timeout=10) == (2, analisar_programa(editado, SEM_LIMITES))
+    sessao.encerrar()
+    assert fila.get(timeout=10) == 'fim'
+
+
+def test_novo_fluxo_encerra_o_anterior():
+    sessao = SessaoAoVivo(espera=0, limites=SEM_LIMITES)
+    _, primeira, _ = _ler_em_thread(sessao)
+    _, segunda, _ = _ler_em_thread(sessao)
+    assert primeira.get(timeout=10) == 'fim'
+    sessao.enviar(1, codigo=CODIGO)
+    assert segunda.get(timeout=10)[0] == 1
+    sessao.encerrar()
+
+
+def test_ping_e_fim_por_ociosidade():
+    sessao = SessaoAoVivo(espera=0, limites=SEM_LIMITES)
+    _, fila, _ = _ler_em_thread(sessao, ping=0.05, max_ocioso=0.3)
+    assert fila.get(timeout=10) is None
+    while (item := fila.get(timeout=10)) is None:
+        pass
+    assert item == 'fim'
+
+
+def test_evento_sse():
+    evento = evento_sse(7, [{'linha': 1}])
+    assert evento == 'id: 7\nevent: resultado\ndata: {"resultado":[{"linha":1}],"revisao":7}\n\n'
+
+
+def test_rotas_ao_vivo():
+    cliente = modulo_app.app.test_client()
+    resposta = cliente.post('/analisar/ao-vivo', json={'sessao': 'teste-sse', 'revisao': 1, 'codigo': CODIGO})
+    assert resposta.status_code == 202 and resposta.get_json() == {'revisao': 1, 'aceita': True}
+    edicao = {'linha_inicio': 4, 'linha_fim': 4, 'texto': 'BIRL!'}
+    assert cliente.post('/analisar/ao-vivo', json={'sessao': 'teste-sse', 'revisao': 2, 'edicao': edicao}).status_code == 202
+    assert cliente.post('/analisar/ao-vivo', json={'sessao': 'outra', 'revisao': 1, 'edicao': edicao}).status_code == 409
+    assert cliente.post('/analisar/ao-vivo', json={'sessao': 'teste-sse', 'revisao': 'x'}).status_code == 400
+
+    fluxo = cliente.get('/analisar/ao-vivo/teste-sse', buffered=False)
+    assert fluxo.mimetype == 'text/event-stream'
+    pedacos = iter(fluxo.response)
+    assert next(pedacos) == b'retry: 1000\n\n'
+    evento = next(pedacos).decode('utf-8')
+    fluxo.close()
+    dados = json.loads(evento.split('data: ', 1)[1])
+    assert dados['revisao'] == 2
+    assert dados['resultado'] == modulo_app.app.test_client().post('/analisar', json={'codigo': CODIGO}).get_json()
@@ -0,0 +1,48 @@
+"""Modo ASGI (app_asgi.aplicacao), chamado direto, sem servidor."""
+import asyncio
+import json
+
+import pytest
+
+import app_asgi
+from app import app
+
+
+def _requisicao(metodo, caminho, corpo=b'', cabecalhos=()):
+    # Roda uma requisição até o fim: (status, cabeçalhos, corpo)
+    async def rodar():
+        mensagens = [{'type': 'http.request', 'body': corpo, 'more_body': False}]
+        enviadas = []
+
+        async def receive():
+            if mensagens:
+                return mensagens.pop()
+            await asyncio.sleep(3600)
+
+        async def send(mensagem):
+            enviadas.append(mensagem)
+
+        scope = {
+            'type': 'http', 'method': metodo, 'path': caminho, 'query_string': b'',
+            'headers': [(b'content-type', b'application/json'), *cabecalhos],
+        }
+        await asyncio.wait_for(app_asgi.aplicacao(scope, receive, send), 30)
+        inicio = enviadas[0]
+        return (inicio['status'], dict(inicio['headers']),
+                b''.join(mensagem.get('body', b'') for mensagem in enviadas[1:]))
+    return asyncio.run(rodar())
+
+
+def test_analisar_igual_ao_flask():
+    codigo = 'BORA\nMONSTRO x TASAINDODAJAULA 1\nGRITA Coloca anilha x Tira anilha\nBIRL!\n'
+    status, _, corpo = _requisicao('POST', '/analisar', json.dumps({'codigo': codigo}).encode())
+    assert status == 200
+    assert corpo == app.test_client().post('/analisar', json={'codigo': codigo}).get_data()
+
+
+@pytest.mark.parametrize('corpo', [b'{', b'[1, 2]', b'{"codigo": 123}', b'{"codigo": null}'])
+def test_analisar_corpo_invalido(corpo):
+    status, cabecalhos, resposta = _requisicao('POST', '/analisar', corpo)
+    assert status == 400
+    assert cabecalhos[b'content-type'] == b'application/json'
+    assert 'erro' in json.loads(resposta)
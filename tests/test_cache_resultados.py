@@ -0,0 +1,59 @@
+"""Cache de resultados (cache_resultados.py) e o seu uso em /analisar."""
+import app as modulo_app
+from cache_resultados import CacheResultados
+from limites import Limites
+
+
+def test_chave_depende_do_codigo_da_variante_e_da_versao():
+    cache = CacheResultados('v1')
+    chave = cache.chave('BORA\nBIRL!\n')
+    assert chave == cache.chave('BORA\nBIRL!\n')
+    assert chave != cache.chave('BORA\nBIRL!')
+    assert chave != cache.chave('BORA\nBIRL!\n', 'application/msgpack')
+    assert chave != CacheResultados('v2').chave('BORA\nBIRL!\n')
+
+
+def test_lru_limitado_por_itens_e_por_bytes():
+    cache = CacheResultados('v', max_itens=2, max_bytes=10)
+    cache.guardar(b'a', b'1234')
+    cache.guardar(b'b', b'1234')
+    assert cache.obter(b'a') == b'1234' # 'a' passa a ser o mais recente
+    cache.guardar(b'c', b'1234')
+    assert cache.obter(b'b') is None
+    cache.guardar(b'd', b'12345678')
+    assert cache.obter(b'a') is None and cache.obter(b'd') == b'12345678'
+    cache.guardar(b'e', b'12345678901') # Maior que o limite inteiro: não entra
+    assert cache.obter(b'e') is None
+    estatisticas = cache.estatisticas()
+    assert estatisticas['bytes'] <= 10 and estatisticas['descartes'] == 3
+
+
+def test_acertos_e_falhas():
+    cache = CacheResultados('v')
+    assert cache.obter(b'x') is None
+    cache.guardar(b'x', b'{}')
+    assert cache.obter(b'x') == b'{}'
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas'], estatisticas['taxa_acerto']) == (1, 1, 0.5)
+
+
+def test_rota_responde_do_cache():
+    cliente = modulo_app.app.test_client()
+    codigo = 'BORA\nMONSTRO teste_cache TASAINDODAJAULA 1\nBIRL!\n'
+    antes = cliente.get('/analisar/cache').get_json()
+    primeira = cliente.post('/analisar', json={'codigo': codigo})
+    segunda = cliente.post('/analisar', json={'codigo': codigo})
+    depois = cliente.get('/analisar/cache').get_json()
+    assert primeira.get_data() == segunda.get_data()
+    assert depois['falhas'] == antes['falhas'] + 1
+    assert depois['acertos'] == antes['acertos'] + 1
+
+
+def test_resultado_cortado_pelo_tempo_nao_vai_para_o_cache(monkeypatch):
+    monkeypatch.setattr(modulo_app, 'LIMITES', Limites(None, None, None, 0))
+    cliente = modulo_app.app.test_client()
+    codigo = 'BORA\n' + 'MONSTRO teste_prazo TASAINDODAJAULA 1\n' * 2000 + 'BIRL!\n'
+    assert cliente.post('/analisar', json={'codigo': codigo}).get_json()[0]['limite'] == 'segundos'
+    antes = cliente.get('/analisar/cache').get_json()
+    cliente.post('/analisar', json={'codigo': codigo})
+    assert cliente.get('/analisar/cache').get_json()['acertos'] == antes['acertos']
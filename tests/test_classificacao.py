@@ -0,0 +1,52 @@
+"""Tipo e categoria de cada item de /analisar: um erro tem o mesmo tipo rode ou não o semântico."""
+import pytest
+
+from analise import analisar_programa, itens_em_fluxo
+
+SEM_DECLARACAO = "Variável 'x' utilizada com atribuição"
+
+
+def _mensagens(codigo):
+    return [(item['tipo'], item['categoria']) for item in analisar_programa(codigo) if item['categoria'] != 'token']
+
+
+def _tipo_do_erro(codigo, trecho):
+    return next(item['tipo'] for item in analisar_programa(codigo) if trecho in item['lexema_ou_mensagem'])
+
+
+def test_atribuicao_sem_declaracao_sempre_semantica():
+    # O semântico roda no primeiro programa; no segundo, com um erro sintático, não
+    assert _tipo_do_erro('BORA\nx TASAINDODAJAULA 1\nBIRL!', SEM_DECLARACAO) == 'ERRO SEMÂNTICO'
+    assert _tipo_do_erro('BORA\nx TASAINDODAJAULA 1\nGRITA Coloca anilha\nBIRL!', SEM_DECLARACAO) == 'ERRO SEMÂNTICO'
+
+
+@pytest.mark.parametrize('codigo, esperado', [
+    # Sem erros: o sucesso das duas fases
+    ('BORA\nMONSTRO x TASAINDODAJAULA 1\nBIRL!', [('SUCESSO SINTÁTICO', 'sucesso'), ('SUCESSO SEMÂNTICO', 'sucesso')]),
+    # Só erros semânticos: a falha do semântico, sem linha de sucesso
+    ('BORA\nx TASAINDODAJAULA 1\nBIRL!', [('FALHA SEMÂNTICA', 'falha'), ('ERRO SEMÂNTICO', 'erro')]),
+    ('BORA\nGRITA Coloca anilha y Tira anilha\nBIRL!', [('FALHA SEMÂNTICA', 'falha'), ('ERRO SEMÂNTICO', 'erro')]),
+    # Um erro léxico: nenhuma linha de situação ao lado dele
+    ('BORA\nMONSTRO x TASAINDODAJAULA 99999999999999999999\nBIRL!', [('ERRO DE ESTRUTURA/LÉXICO', 'erro')]),
+])
+def test_linhas_de_situacao(codigo, esperado):
+    assert _mensagens(codigo) == esperado
+
+
+def test_erro_sintatico_sem_linhas_de_situacao():
+    tipos = {tipo for tipo, _ in _mensagens('BORA\nMONSTRO x TASAINDODAJAULA 1\nGRITA Coloca anilha\nBIRL!')}
+    assert 'ERRO SINTÁTICO' in tipos
+    assert not tipos & {'SUCESSO SINTÁTICO', 'SUCESSO SEMÂNTICO', 'FALHA SEMÂNTICA'}
+
+
+@pytest.mark.parametrize('codigo', [
+    'BORA\nx TASAINDODAJAULA 1\nBIRL!',
+    'BORA\nx TASAINDODAJAULA 1\nGRITA Coloca anilha\nBIRL!',
+    'BORA\nMONSTRO x TASAINDODAJAULA 1\nBIRL!',
+    'BORA\nMONSTRO x TASAINDODAJAULA 99999999999999999999\nBIRL!',
+])
+def test_fluxo_com_os_mesmos_itens(codigo):
+    # O NDJSON (itens_em_fluxo) traz os mesmos itens, em outra ordem
+    completos = [tuple(item[campo] for campo in ('linha', 'coluna', 'lexema_ou_mensagem', 'tipo', 'categoria'))
+                 for item in analisar_programa(codigo)]
+    assert sorted(itens_em_fluxo(codigo), key=repr) == sorted(completos, key=repr)
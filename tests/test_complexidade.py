@@ -0,0 +1,31 @@
+"""
+O tempo da análise cresce linearmente nas entradas adversariais de benchmarks/complexidade.py.
+
+Mede com tempo de parede: numa máquina ocupada uma medida pode sair torta, por isso uma família
+acima do limite é medida de novo antes de falhar.
+"""
+import pytest
+
+from benchmarks.complexidade import FAMILIAS, _medir, expoente_de_crescimento
+
+LIMITE = 1.3 # Expoente máximo aceito (1.0 = linear), o mesmo padrão do script
+
+
+def _expoente(gerar, funcao, tamanhos):
+    tempos = [_medir(funcao, gerar(n), 3) for n in tamanhos]
+    return expoente_de_crescimento(tamanhos, tempos)
+
+
+@pytest.mark.parametrize('nome', FAMILIAS)
+def test_crescimento_linear(nome):
+    gerar, funcao, tamanhos = FAMILIAS[nome]
+    k = _expoente(gerar, funcao, tamanhos)
+    if k > LIMITE:
+        k = min(k, _expoente(gerar, funcao, tamanhos))
+    assert k <= LIMITE, f'{nome}: tempo ~ n^{k:.2f}'
+
+
+def test_expoente_de_crescimento():
+    tamanhos = [1000, 2000, 4000, 8000]
+    assert expoente_de_crescimento(tamanhos, [n * 3e-6 for n in tamanhos]) == pytest.approx(1.0)
+    assert expoente_de_crescimento(tamanhos, [n * n * 1e-9 for n in tamanhos]) == pytest.approx(2.0)
@@ -0,0 +1,45 @@
+"""Diagnósticos estruturados (diagnosticos.py) e o texto gerado a partir deles."""
+import pytest
+
+from analisador import analisar_codigo
+from diagnosticos import CATALOGO, Diagnostico, renderizar
+from fluxo_tokens import analisar_fluxo
+from tests.programas import programas
+
+
+@pytest.mark.parametrize('codigo', sorted(CATALOGO))
+def test_todo_modelo_do_catalogo_renderiza(codigo):
+    # Os modelos usam no máximo quatro argumentos ({0} a {3})
+    texto = renderizar(Diagnostico(codigo, 3, 7, ('a', 'b', 'c', 'd')))
+    assert texto and '{' not in texto
+
+
+def test_renderizar_posicao():
+    diagnostico = Diagnostico('CARACTERE_NAO_RECONHECIDO', 2, 5, ('@',))
+    assert renderizar(diagnostico) == "Erro Léxico na linha 2, coluna 5: Caractere não reconhecido '@'."
+    sem_posicao = Diagnostico('VARIAVEL_NAO_DECLARADA', None, None, ('x',))
+    assert 'linha N/A, coluna N/A' in renderizar(sem_posicao)
+
+
+def test_como_dict():
+    diagnostico = Diagnostico('ASPAS_NAO_FECHADAS', 4, 1, ('"abc',))
+    assert diagnostico.como_dict() == {
+        'codigo': 'ASPAS_NAO_FECHADAS', 'severidade': 'erro', 'categoria': 'lexico',
+        'linha': 4, 'coluna': 1, 'args': ['"abc'],
+    }
+
+
+def test_texto_dos_erros_do_lexico():
+    resultado = analisar_codigo('BORA\n"abc\nx TASAINDODAJAULA 1\nBIRL!\n')
+    assert resultado['erros_estrutura'] == [
+        "Erro Léxico na linha 2, coluna 1: Aspas não fechadas em '\"abc'.",
+        "Erro de Inicialização na linha 3, coluna 1: Variável 'x' utilizada com atribuição "
+        "('TASAINDODAJAULA') sem declaração com 'MONSTRO'.",
+    ]
+
+
+def test_analisar_codigo_renderiza_os_diagnosticos_do_fluxo():
+    for codigo in programas(70, 20):
+        diagnosticos = analisar_fluxo(codigo)['diagnosticos']
+        assert all(isinstance(diagnostico, Diagnostico) for diagnostico in diagnosticos)
+        assert [renderizar(diagnostico) for diagnostico in diagnosticos] == analisar_codigo(codigo)['erros_estrutura']
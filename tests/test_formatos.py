@@ -0,0 +1,63 @@
+"""Negociação do formato (formatos.py) e compressão das respostas de /analisar."""
+import gzip
+import json
+
+import pytest
+
+import app as modulo_app
+from formatos import COLUNAR, MSGPACK
+from tests.programas import programas
+
+CAMPOS = ('linha', 'coluna', 'lexema_ou_mensagem', 'tipo', 'categoria')
+
+
+def _de_colunas(colunas):
+    # Volta das colunas para a lista de objetos de /analisar
+    itens = []
+    for indice in range(len(colunas['linha'])):
+        item = {campo: colunas[campo][indice] for campo in CAMPOS}
+        item['tipo'] = colunas['tipos'][item['tipo']]
+        item['categoria'] = colunas['categorias'][item['categoria']]
+        itens.append(item)
+    if colunas.get('truncado'):
+        itens[0].update(truncado=True, limite=colunas['limite'])
+    return itens
+
+
+def _analisar(codigo, **cabecalhos):
+    return modulo_app.app.test_client().post('/analisar', json={'codigo': codigo}, headers=cabecalhos)
+
+
+def test_colunar_tem_os_mesmos_itens_do_json():
+    for codigo in programas(80, 10):
+        resposta = _analisar(codigo, Accept=COLUNAR)
+        assert resposta.mimetype == COLUNAR
+        assert 'Accept' in resposta.vary
+        assert _de_colunas(json.loads(resposta.get_data())) == _analisar(codigo).get_json()
+
+
+def test_msgpack_tem_as_mesmas_colunas():
+    msgpack = pytest.importorskip('msgpack')
+    codigo = next(iter(programas(81, 1)))
+    resposta = _analisar(codigo, Accept=MSGPACK)
+    assert resposta.mimetype == MSGPACK
+    assert msgpack.unpackb(resposta.get_data(), raw=False) == json.loads(_analisar(codigo, Accept=COLUNAR).get_data())
+
+
+@pytest.mark.parametrize('accept', ['*/*', 'text/html', 'application/json, */*;q=0.5'])
+def test_accept_sem_formato_especifico_recebe_json(accept):
+    resposta = _analisar('BORA\nBIRL!\n', Accept=accept)
+    assert resposta.mimetype == 'application/json'
+
+
+def test_corpo_grande_sai_comprimido():
+    codigo = '\n'.join(programas(82, 3))
+    resposta = _analisar(codigo, **{'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resposta.vary
+    assert json.loads(gzip.decompress(resposta.get_data())) == _analisar(codigo).get_json()
+
+
+def test_corpo_pequeno_nao_e_comprimido():
+    resposta = _analisar('BORA\nBIRL!\n', **{'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in resposta.headers
@@ -0,0 +1,11 @@
+"""O motor 'dfa' (lexer_dfa.py) dá a mesma saída que o motor 'regex'."""
+import pytest
+
+from analisador import analisar_codigo
+from tests.programas import programas
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_dfa_igual_a_regex(semente):
+    for codigo in programas(semente, 25):
+        assert analisar_codigo(codigo, motor='dfa') == analisar_codigo(codigo, motor='regex')
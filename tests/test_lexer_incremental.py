@@ -0,0 +1,59 @@
+"""DocumentoIncremental e /analisar/incremental devolvem o mesmo que a análise do texto completo."""
+import random
+
+import pytest
+
+from analisador import analisar_codigo
+from app import app
+from fluxo_tokens import analisar_fluxo
+from lexer_incremental import DocumentoIncremental
+from tests.programas import _TRECHOS, programas
+
+
+def _edicao_aleatoria(rng, total):
+    # (linha_inicio, linha_fim, texto) válida para um documento de 'total' linhas
+    inicio = rng.randint(1, total + 1)
+    fim = rng.randint(inicio - 1, min(total, inicio + 3))
+    partes = [rng.choice(_TRECHOS + ['MONSTRO y TASAINDODAJAULA 2', 'y TASAINDODAJAULA y + 1', ''])
+              for _ in range(rng.randint(0, 3))]
+    return inicio, fim, ''.join(partes) if partes else None
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_edicoes_aleatorias(semente):
+    rng = random.Random(semente)
+    for codigo in programas(semente, 5):
+        documento = DocumentoIncremental(codigo)
+        assert documento.resultado() == analisar_codigo(codigo)
+        for _ in range(25):
+            documento.editar(*_edicao_aleatoria(rng, len(documento)))
+            texto = documento.texto
+            assert documento.resultado() == analisar_codigo(texto)
+            fluxo, esperado = documento.fluxo(), analisar_fluxo(texto)
+            assert list(fluxo['tokens']) == list(esperado['tokens'])
+            assert fluxo['diagnosticos'] == esperado['diagnosticos']
+
+
+def test_rota_igual_a_analisar():
+    rng = random.Random(0)
+    cliente = app.test_client()
+    for numero, codigo in enumerate(programas(10, 3)):
+        documento = f'teste-{numero}'
+        resposta = cliente.post('/analisar/incremental', json={'documento': documento, 'codigo': codigo})
+        assert resposta.get_json() == cliente.post('/analisar', json={'codigo': codigo}).get_json()
+        espelho = DocumentoIncremental(codigo) # Só para saber o texto depois de cada edição
+        for _ in range(10):
+            inicio, fim, texto = _edicao_aleatoria(rng, len(espelho))
+            espelho.editar(inicio, fim, texto)
+            resposta = cliente.post('/analisar/incremental', json={
+                'documento': documento, 'edicao': {'linha_inicio': inicio, 'linha_fim': fim, 'texto': texto},
+            })
+            assert resposta.status_code == 200
+            assert resposta.get_json() == cliente.post('/analisar', json={'codigo': espelho.texto}).get_json()
+
+
+def test_rota_documento_desconhecido():
+    resposta = app.test_client().post('/analisar/incremental', json={
+        'documento': 'nunca-aberto', 'edicao': {'linha_inicio': 1, 'linha_fim': 1, 'texto': 'BORA'},
+    })
+    assert resposta.status_code == 409
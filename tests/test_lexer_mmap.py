@@ -0,0 +1,27 @@
+"""A análise de arquivos em blocos de bytes (lexer_mmap.py) dá a mesma saída que a análise da str."""
+import pytest
+
+import lexer_mmap
+from analisador import iter_tokens
+from diagnosticos import renderizar
+from tests.programas import programas
+
+
+def _eventos(iteravel):
+    return [(evento, valor if evento == 'token' else renderizar(valor)) for evento, valor in iteravel]
+
+
+@pytest.mark.parametrize('semente', range(3))
+def test_mmap_igual_a_sequencial(semente, tmp_path, monkeypatch):
+    # Blocos pequenos: os programas de teste passam por muitas divisões em blocos
+    monkeypatch.setattr(lexer_mmap, 'BYTES_POR_BLOCO', 64)
+    caminho = tmp_path / 'programa.birl'
+    for codigo in programas(semente, 15):
+        caminho.write_bytes(codigo.encode('utf-8'))
+        assert _eventos(lexer_mmap.iter_tokens_arquivo(caminho)) == _eventos(iter_tokens(codigo))
+
+
+def test_mmap_arquivo_vazio(tmp_path):
+    caminho = tmp_path / 'vazio.birl'
+    caminho.write_bytes(b'')
+    assert _eventos(lexer_mmap.iter_tokens_arquivo(caminho)) == _eventos(iter_tokens(''))
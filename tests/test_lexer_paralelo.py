@@ -0,0 +1,19 @@
+"""A análise em pedaços (lexer_paralelo.py) dá a mesma saída que a análise sequencial."""
+import pytest
+
+from analisador import analisar_codigo
+from lexer_paralelo import analisar_codigo_paralelo
+from tests.programas import programas
+
+
+@pytest.mark.parametrize('semente', range(3))
+def test_paralelo_igual_a_sequencial(semente):
+    for numero, codigo in enumerate(programas(semente, 15)):
+        # Com 1 worker os pedaços são analisados e juntados no próprio processo
+        pedacos = 2 + numero % 7
+        assert analisar_codigo_paralelo(codigo, workers=1, pedacos=pedacos) == analisar_codigo(codigo)
+
+
+def test_paralelo_em_processos():
+    codigo = '\n'.join(programas(99, 10, comandos=200))
+    assert analisar_codigo_paralelo(codigo, workers=2, pedacos=4) == analisar_codigo(codigo)
@@ -0,0 +1,120 @@
+"""Limites de recursos (limites.py): análise truncada, prazo, cancelamento e as respostas 413."""
+import time
+
+import pytest
+
+import app as modulo_app
+from analise import analisar_programa
+from ao_vivo import SessaoAoVivo
+from lexer_incremental import DocumentoGrandeDemais
+from limites import Limites, Orcamento
+
+SEM_LIMITES = Limites(None, None, None, None)
+DECLARACOES = 'BORA\n' + 'MONSTRO x TASAINDODAJAULA 1\n' * 10 + 'BIRL!\n'
+
+
+def _tokens(resultado):
+    return [item for item in resultado if item['categoria'] == 'token']
+
+
+@pytest.mark.parametrize('limites, limite, codigo', [
+    (Limites(40, None, None, None), 'caracteres', DECLARACOES),
+    (Limites(None, 7, None, None), 'tokens', DECLARACOES),
+    (Limites(None, None, 3, None), 'diagnosticos', 'BORA\n' + '@\n' * 10 + 'BIRL!\n'),
+])
+def test_limite_atingido_trunca_com_aviso(limites, limite, codigo):
+    resultado = analisar_programa(codigo, limites)
+    aviso = resultado[0]
+    assert aviso['categoria'] == 'aviso'
+    assert aviso['truncado'] is True and aviso['limite'] == limite
+    assert str(getattr(limites, limite)) in aviso['lexema_ou_mensagem']
+    assert len(_tokens(resultado)) < len(_tokens(analisar_programa(codigo, SEM_LIMITES)))
+
+
+def test_limite_de_caracteres_corta_na_quebra_de_linha():
+    resultado = analisar_programa(DECLARACOES, Limites(40, None, None, None))
+    # 'BORA\n' e a primeira declaração cabem em 40 caracteres; a segunda já não entra inteira
+    assert {item['linha'] for item in _tokens(resultado)} == {1, 2}
+
+
+def test_sem_limites_atingidos_nao_ha_aviso():
+    resultado = analisar_programa(DECLARACOES, Limites(1000, 1000, 1000, 60))
+    assert resultado == analisar_programa(DECLARACOES, None)
+    assert all(item['categoria'] != 'aviso' for item in resultado)
+
+
+def test_prazo_vencido():
+    orcamento = Orcamento(Limites(None, None, None, 0.001))
+    assert not orcamento.sem_tempo()
+    time.sleep(0.01)
+    assert orcamento.sem_tempo()
+    assert orcamento.estourado == 'segundos'
+    assert not Orcamento(SEM_LIMITES).sem_tempo()
+
+
+def test_prazo_vencido_trunca_a_analise():
+    resultado = analisar_programa('BORA\n' + 'MONSTRO x TASAINDODAJAULA 1\n' * 2000 + 'BIRL!\n',
+                                  Limites(None, None, None, 0))
+    assert resultado[0]['limite'] == 'segundos'
+
+
+def test_estouro_fica_so_o_primeiro():
+    orcamento = Orcamento(SEM_LIMITES)
+    orcamento.estourar('tokens')
+    orcamento.estourar('diagnosticos')
+    assert orcamento.estourado == 'tokens'
+
+
+def test_separado_tem_o_mesmo_prazo_e_estouro_proprio():
+    orcamento = Orcamento(Limites(None, None, None, 60))
+    separado = orcamento.separado()
+    assert separado.prazo == orcamento.prazo
+    separado.estourar('diagnosticos')
+    assert orcamento.estourado is None
+
+
+def test_cancelar_alcanca_os_separados():
+    orcamento = Orcamento(SEM_LIMITES)
+    separado = orcamento.separado()
+    orcamento.cancelar()
+    assert orcamento.cancelado and separado.cancelado
+    assert separado.sem_tempo() and separado.estourado == 'segundos'
+
+
+def test_limites_do_ambiente(monkeypatch):
+    monkeypatch.setenv('BIRL_MAX_CARACTERES', '10')
+    monkeypatch.setenv('BIRL_MAX_TOKENS', '0')
+    monkeypatch.setenv('BIRL_MAX_DIAGNOSTICOS', '')
+    monkeypatch.delenv('BIRL_MAX_SEGUNDOS', raising=False)
+    assert Limites.do_ambiente() == Limites(10, None, None, 5.0)
+
+
+def test_rota_analisar_trunca(monkeypatch):
+    monkeypatch.setattr(modulo_app, 'LIMITES', Limites(None, 5, None, None))
+    # Código que nenhum outro teste manda: o resultado não pode vir do cache
+    codigo = 'BORA\n' + 'MONSTRO limite_tokens TASAINDODAJAULA 1\n' * 3 + 'BIRL!\n'
+    resposta = modulo_app.app.test_client().post('/analisar', json={'codigo': codigo})
+    assert resposta.status_code == 200
+    assert resposta.get_json()[0]['limite'] == 'tokens'
+
+
+def test_rota_incremental_responde_413(monkeypatch):
+    monkeypatch.setattr(modulo_app, 'LIMITES', Limites(20, None, None, None))
+    cliente = modulo_app.app.test_client()
+    resposta = cliente.post('/analisar/incremental', json={'documento': 'grande', 'codigo': DECLARACOES})
+    assert resposta.status_code == 413
+
+    resposta = cliente.post('/analisar/incremental', json={'documento': 'grande', 'codigo': 'BORA\nBIRL!\n'})
+    assert resposta.status_code == 200
+    edicao = {'linha_inicio': 2, 'linha_fim': 1, 'texto': DECLARACOES}
+    resposta = cliente.post('/analisar/incremental', json={'documento': 'grande', 'edicao': edicao})
+    assert resposta.status_code == 413
+
+
+def test_sessao_ao_vivo_recusa_documento_grande():
+    sessao = SessaoAoVivo(limites=Limites(20, None, None, None))
+    with pytest.raises(DocumentoGrandeDemais):
+        sessao.enviar(1, codigo=DECLARACOES)
+    assert sessao.enviar(2, codigo='BORA\nBIRL!\n')
+    with pytest.raises(DocumentoGrandeDemais):
+        sessao.enviar(3, edicao=(2, 1, DECLARACOES))
@@ -0,0 +1,65 @@
+"""Tempos por fase (metricas.py), o cabeçalho Server-Timing e /metrics."""
+import re
+import time
+
+import app as modulo_app
+import metricas
+
+
+def test_fase_de_dentro_nao_conta_na_de_fora():
+    cronometro = metricas.Cronometro()
+    with cronometro.fase('sintatico'):
+        time.sleep(0.01)
+        with cronometro.fase('lexico'):
+            time.sleep(0.1)
+    assert cronometro.fases['lexico'] >= 0.1
+    assert 0.01 <= cronometro.fases['sintatico'] < 0.1
+
+
+def test_server_timing_na_ordem_das_fases():
+    cronometro = metricas.Cronometro()
+    cronometro.fases.update(compressao=0.001, lexico=0.002)
+    assert cronometro.server_timing(0.5) == 'lexico;dur=2.000, compressao;dur=1.000, total;dur=500.000'
+
+
+def test_histograma_cumulativo():
+    histograma = metricas.Histograma('teste', 'Teste.', (1, 10), ('rota',))
+    for valor in (0.5, 5, 50):
+        histograma.observar(valor, '/x')
+    texto = histograma.texto()
+    assert 'teste_bucket{rota="/x",le="1"} 1' in texto
+    assert 'teste_bucket{rota="/x",le="10"} 2' in texto
+    assert 'teste_bucket{rota="/x",le="+Inf"} 3' in texto
+    assert 'teste_sum{rota="/x"} 55.5' in texto
+
+
+def test_desligado_nao_mede(monkeypatch):
+    monkeypatch.setattr(metricas, 'ATIVO', False)
+    assert metricas.novo_cronometro() is metricas.NULO
+    cliente = modulo_app.app.test_client()
+    resposta = cliente.post('/analisar', json={'codigo': 'BORA\nBIRL!\n'})
+    assert 'Server-Timing' not in resposta.headers
+    assert cliente.get('/metrics').status_code == 404
+
+
+def _contagem(texto, nome, rota):
+    encontrado = re.search(rf'^{nome}_count{{rota="{re.escape(rota)}"}} (\d+)$', texto, re.M)
+    return int(encontrado.group(1)) if encontrado else 0
+
+
+def test_ligado_mede_as_fases_e_exporta(monkeypatch):
+    monkeypatch.setattr(metricas, 'ATIVO', True)
+    cliente = modulo_app.app.test_client()
+    antes = cliente.get('/metrics').get_data(as_text=True)
+    # Código que nenhum outro teste manda: a análise roda (sem cache) e as fases aparecem
+    resposta = cliente.post('/analisar', json={'codigo': 'BORA\nMONSTRO teste_metricas TASAINDODAJAULA 1\nBIRL!\n'})
+    fases = [parte.split(';')[0] for parte in resposta.headers['Server-Timing'].split(', ')]
+    assert {'lexico', 'sintatico', 'semantico', 'serializacao'} <= set(fases)
+    assert fases[-1] == 'total'
+
+    metricas_texto = cliente.get('/metrics')
+    assert metricas_texto.mimetype == 'text/plain'
+    depois = metricas_texto.get_data(as_text=True)
+    for nome in ('birl_requisicao_segundos', 'birl_requisicao_bytes', 'birl_tokens'):
+        assert _contagem(depois, nome, '/analisar') == _contagem(antes, nome, '/analisar') + 1
+    assert 'birl_cache_acertos_total' in depois
@@ -0,0 +1,38 @@
+"""Resposta de /analisar em fluxo NDJSON (formatos.ndjson e analise.itens_em_fluxo)."""
+import json
+
+import app as modulo_app
+from formatos import NDJSON
+from limites import Limites
+from tests.programas import programas
+
+
+def _chave(item):
+    return json.dumps(item, sort_keys=True)
+
+
+def _analisar(codigo, **cabecalhos):
+    return modulo_app.app.test_client().post('/analisar', json={'codigo': codigo}, headers=cabecalhos)
+
+
+def test_ndjson_tem_os_mesmos_itens_do_json():
+    for codigo in programas(90, 15):
+        resposta = _analisar(codigo, Accept=NDJSON)
+        assert resposta.mimetype == NDJSON
+        itens = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+        # Mesmos itens, em outra ordem (os erros léxicos saem no meio dos tokens)
+        assert sorted(map(_chave, itens)) == sorted(map(_chave, _analisar(codigo).get_json()))
+
+
+def test_ndjson_mantem_a_ordem_das_chaves():
+    linha = _analisar('BORA\nBIRL!\n', Accept=NDJSON).get_data(as_text=True).splitlines()[0]
+    assert list(json.loads(linha)) == ['categoria', 'coluna', 'lexema_ou_mensagem', 'linha', 'tipo']
+
+
+def test_ndjson_truncado_termina_com_o_aviso(monkeypatch):
+    monkeypatch.setattr(modulo_app, 'LIMITES', Limites(None, 5, None, None))
+    codigo = 'BORA\n' + 'MONSTRO x TASAINDODAJAULA 1\n' * 3 + 'BIRL!\n'
+    itens = [json.loads(linha) for linha in _analisar(codigo, Accept=NDJSON).get_data(as_text=True).splitlines()]
+    assert itens[-1]['categoria'] == 'aviso'
+    assert itens[-1]['truncado'] is True and itens[-1]['limite'] == 'tokens'
+    assert sum(item['categoria'] == 'token' for item in itens) == 5
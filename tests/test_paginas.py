@@ -0,0 +1,72 @@
+"""Páginas e estáticos com ETag, 304 e Cache-Control (paginas.py)."""
+import gzip
+
+import pytest
+from flask import url_for
+
+import app as modulo_app
+from analisador import TOKEN_SPEC
+
+
+@pytest.fixture
+def cliente():
+    return modulo_app.app.test_client()
+
+
+@pytest.mark.parametrize('caminho', ['/', '/analisador', '/tabela-tokens'])
+def test_pagina_com_etag_e_304(cliente, caminho):
+    resposta = cliente.get(caminho)
+    assert resposta.status_code == 200
+    assert resposta.content_type == 'text/html; charset=utf-8'
+    assert resposta.headers['Cache-Control'] == 'no-cache'
+    etag = resposta.headers['ETag']
+
+    revalidada = cliente.get(caminho, headers={'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.get_data() == b''
+    assert revalidada.headers['ETag'] == etag
+
+    assert cliente.get(caminho, headers={'If-None-Match': '"outro"'}).status_code == 200
+
+
+def test_pagina_comprimida_tem_etag_propria(cliente):
+    simples = cliente.get('/analisador')
+    comprimida = cliente.get('/analisador', headers={'Accept-Encoding': 'gzip'})
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in comprimida.vary
+    assert gzip.decompress(comprimida.get_data()) == simples.get_data()
+    assert comprimida.headers['ETag'] != simples.headers['ETag']
+    # O ETag da variante sem compressão não vale para a comprimida
+    revalidada = cliente.get('/analisador', headers={'Accept-Encoding': 'gzip', 'If-None-Match': simples.headers['ETag']})
+    assert revalidada.status_code == 200
+
+
+def test_estatico_versionado_fica_no_cache(cliente):
+    versao = modulo_app.arquivos_estaticos.versoes['birl_logo.png']
+    with modulo_app.app.test_request_context():
+        url = url_for('static', filename='birl_logo.png')
+    assert url == f'/static/birl_logo.png?v={versao}'
+
+    resposta = cliente.get(url)
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'image/png'
+    assert resposta.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'Content-Encoding' not in resposta.headers
+
+
+def test_estatico_sem_versao_revalida(cliente):
+    resposta = cliente.get('/static/birl_logo.png', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Cache-Control'] == 'no-cache'
+    assert cliente.get('/static/birl_logo.png', headers={'If-None-Match': resposta.headers['ETag']}).status_code == 304
+    assert cliente.get('/static/birl_logo.png?v=antiga').headers['Cache-Control'] == 'no-cache'
+
+
+def test_estatico_inexistente(cliente):
+    assert cliente.get('/static/nao_existe.css').status_code == 404
+
+
+def test_tabela_de_tokens_segue_o_token_spec(cliente):
+    html = cliente.get('/tabela-tokens').get_data(as_text=True)
+    for linha in modulo_app.TABELA_TOKENS:
+        assert linha.nome in html
+    assert [linha.nome for linha in modulo_app.TABELA_TOKENS] == [nome for nome, _ in TOKEN_SPEC]
@@ -0,0 +1,52 @@
+"""Análise semântica (semantico.py): escopos, funções e a quantidade de argumentos."""
+import pytest
+
+from analise import analisar_em_uma_passada
+from semantico import analisar_semantica
+
+
+def _erros(codigo):
+    resultado = analisar_em_uma_passada(codigo)
+    assert resultado['sintaticos'] == []
+    return [(diagnostico.codigo, diagnostico.linha, diagnostico.args[0])
+            for diagnostico in analisar_semantica(resultado['arvore'])]
+
+
+@pytest.mark.parametrize('codigo', [
+    'BORA\nMONSTRO x TASAINDODAJAULA 1\nGRITA Coloca anilha x Tira anilha\nBIRL!',
+    # Os parâmetros valem no corpo, e a função pode chamar a si mesma
+    'BORA\nFICA GRANDE f Coloca anilha a, b Tira anilha:\n    MONSTRO r TASAINDODAJAULA a + b\n'
+    '    CHAMA f Coloca anilha r, 1 Tira anilha\nBIRL!',
+    # CONFERE_AI não abre escopo
+    'BORA\nMONSTRO x TASAINDODAJAULA 1\nCONFERE_AI x > 0:\n    MONSTRO y TASAINDODAJAULA 2\n'
+    'GRITA Coloca anilha y Tira anilha\nBIRL!',
+])
+def test_programas_sem_erros(codigo):
+    assert _erros(codigo) == []
+
+
+def test_variavel_nao_declarada_sai_uma_vez():
+    codigo = 'BORA\nGRITA Coloca anilha y Tira anilha\nGRITA Coloca anilha y Tira anilha\nBIRL!'
+    assert _erros(codigo) == [('VARIAVEL_NAO_DECLARADA', 2, 'y')]
+
+
+def test_parametro_nao_vale_fora_da_funcao():
+    codigo = ('BORA\nGRITA Coloca anilha a Tira anilha\n'
+              'FICA GRANDE f Coloca anilha a Tira anilha:\n    GRITA Coloca anilha a Tira anilha\nBIRL!')
+    assert _erros(codigo) == [('VARIAVEL_NAO_DECLARADA', 2, 'a')]
+
+
+def test_atribuicao_sem_declaracao():
+    assert _erros('BORA\nx TASAINDODAJAULA 1\nBIRL!') == [('ATRIBUICAO_SEM_DECLARACAO', 2, 'x')]
+
+
+def test_funcao_chamada_antes_de_definida():
+    codigo = ('BORA\nCHAMA f Coloca anilha Tira anilha\nCHAMA f Coloca anilha Tira anilha\n'
+              'FICA GRANDE f Coloca anilha Tira anilha:\n    GRITA Coloca anilha 1 Tira anilha\nBIRL!')
+    assert _erros(codigo) == [('FUNCAO_NAO_DEFINIDA', 2, 'f')]
+
+
+def test_quantidade_de_argumentos():
+    codigo = ('BORA\nFICA GRANDE f Coloca anilha a Tira anilha:\n    GRITA Coloca anilha a Tira anilha\n'
+              'CHAMA f Coloca anilha 1, 2 Tira anilha\nBIRL!')
+    assert _erros(codigo) == [('QUANTIDADE_DE_ARGUMENTOS', 4, 'f')]
@@ -0,0 +1,24 @@
+"""
+O Parser iterativo (sintatico.Parser) devolve os mesmos erros que o de descida recursiva, sobre
+os tokens como o Parser os vê (veja benchmarks.sintatico.como_o_parser_ve).
+"""
+import random
+
+import pytest
+
+from benchmarks.sintatico import _tokens, _tokens_embaralhados, como_o_parser_ve
+from benchmarks.sintatico_recursivo import ParserRecursivo
+from sintatico import Parser
+from tests.programas import programas
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_iterativo_igual_a_recursivo(semente):
+    rng = random.Random(semente)
+    for codigo in programas(semente, 20):
+        tokens = _tokens(codigo)
+        assert Parser(tokens).parse() == ParserRecursivo(tokens).parse()
+        # Os mesmos tokens com trechos apagados, trocados e repetidos
+        for embaralhados in _tokens_embaralhados(tokens, rng, 5):
+            embaralhados = como_o_parser_ve(embaralhados)
+            assert Parser(embaralhados).parse() == ParserRecursivo(embaralhados).parse()